@@ -0,0 +1,84 @@
+"""Compare stream event encoding throughput.
+
+Encodes a representative chat stream (mostly one- or two-token text deltas,
+a tool call and its output, the completed response and done) the way
+AgentLoop used to (`json.dumps` plus a newline, encoded to UTF-8 by
+StreamingResponse) and with the stream event encoders, and reports events
+encoded per second and bytes per stream.
+
+    uv run python -m benchmarks.bench_event_encoding
+"""
+
+import json
+import time
+
+from src.core.event_encoder import EventEncoder, OrjsonEventEncoder, orjson
+
+ROUNDS = 200
+
+
+def build_stream() -> list:
+    words = (
+        "Apple shares rose 2.1% to $227.48 today, after services revenue "
+        "beat estimates — analysts in 東京 and Zürich raised targets."
+    ).split(" ")
+    deltas = [{"type": "text_delta", "data": f" {word}"} for word in words] * 8
+    tool_events = [
+        {
+            "type": "tool_call",
+            "call_id": "call_1",
+            "data": {
+                "tool_name": "get_stock_info_yfinance",
+                "arguments": {"symbol": "AAPL"},
+                "message": "Calling get_stock_info_yfinance",
+            },
+        },
+        {
+            "type": "tool_output",
+            "data": {
+                "call_id": "call_1",
+                "output": json.dumps(
+                    {"symbol": "AAPL", "price": 227.48}
+                    | {f"metric_{index}": index * 1.5 for index in range(40)}
+                ),
+            },
+        },
+    ]
+    return (
+        tool_events
+        + deltas
+        + [{"type": "response_completed", "data": {"usage": {"total_tokens": 812}}}]
+        + [{"type": "done", "data": None}]
+    )
+
+
+def stdlib_baseline(event: dict) -> bytes:
+    return f"{json.dumps(event)}\n".encode()
+
+
+def measure(name: str, encode, events: list) -> None:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for event in events:
+            encode(event)
+    elapsed = time.perf_counter() - start
+    size = sum(len(encode(event)) for event in events)
+    rate = ROUNDS * len(events) / elapsed
+    print(f"{name:<22}{rate:>14,.0f}{size:>12}")
+
+
+def main() -> None:
+    events = build_stream()
+    print(f"{len(events)} events per stream, {ROUNDS} rounds\n")
+    print(f"{'encoder':<22}{'events/s':>14}{'bytes':>12}")
+
+    measure("json.dumps (before)", stdlib_baseline, events)
+    measure("json", EventEncoder().encode, events)
+    if orjson is not None:
+        measure("orjson", OrjsonEventEncoder().encode, events)
+    else:
+        print('orjson                (not installed: pip install "actors[orjson]")')
+
+
+if __name__ == "__main__":
+    main()
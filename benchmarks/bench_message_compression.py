@@ -0,0 +1,113 @@
+"""Measure bytes transferred per get_items call with message compression.
+
+Builds a representative conversation (short chat turns, a large stock info
+tool output, an MCP-style document and long assistant answers), encodes it
+the way SupabaseSession stores it and reports the size of the PostgREST
+response body for a full history fetch, plus encode/decode time.
+
+    uv run python -m benchmarks.bench_message_compression
+"""
+
+import json
+import random
+import time
+
+from src.openai_agents_extensions.message_codec import (
+    decode_message_data,
+    encode_message_data,
+    zstandard,
+)
+
+THRESHOLDS = [0, 256, 1024, 4096]
+
+
+def _stock_info() -> dict:
+    random.seed(7)
+    info = {
+        "symbol": "AAPL",
+        "longName": "Apple Inc.",
+        "sector": "Technology",
+        "longBusinessSummary": "Apple Inc. designs, manufactures, and markets "
+        "smartphones, personal computers, tablets, wearables, and accessories "
+        "worldwide. " * 8,
+    }
+    for index in range(120):
+        info[f"metric_{index}"] = round(random.uniform(0, 1000), 4)
+    return info
+
+
+def build_history() -> list:
+    history = []
+    for turn in range(10):
+        history.append({"role": "user", "content": f"Question {turn}: how is AAPL?"})
+        history.append(
+            {
+                "type": "function_call",
+                "call_id": f"call_{turn}",
+                "name": "get_stock_info_yfinance",
+                "arguments": '{"symbol": "AAPL"}',
+            }
+        )
+        history.append(
+            {
+                "type": "function_call_output",
+                "call_id": f"call_{turn}",
+                "output": json.dumps(_stock_info()),
+            }
+        )
+        history.append(
+            {
+                "role": "assistant",
+                "content": "## Summary\n\n"
+                + "Apple shares traded higher on strong services revenue. " * 40,
+            }
+        )
+    history.append(
+        {
+            "type": "function_call_output",
+            "call_id": "mcp_docs",
+            "output": "\n".join(
+                f"def function_{i}(x): return x * {i}" for i in range(300)
+            ),
+        }
+    )
+    return history
+
+
+def response_bytes(stored: list) -> int:
+    """Size of the PostgREST JSON body for `select message_data`."""
+    return len(json.dumps([{"message_data": data} for data in stored]).encode())
+
+
+def main() -> None:
+    serialized = [json.dumps(item) for item in build_history()]
+    algorithms = ["zlib"] + (["zstd"] if zstandard is not None else [])
+    baseline = response_bytes(serialized)
+    print(f"{len(serialized)} items, uncompressed response {baseline} bytes\n")
+    print(
+        f"{'algorithm':<10}{'threshold':>10}{'bytes':>10}{'ratio':>8}"
+        f"{'encode ms':>11}{'decode ms':>11}"
+    )
+
+    for algorithm in algorithms:
+        for threshold in THRESHOLDS:
+            start = time.perf_counter()
+            stored = [
+                encode_message_data(data, threshold, algorithm) for data in serialized
+            ]
+            encode_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            decoded = [decode_message_data(data) for data in stored]
+            decode_ms = (time.perf_counter() - start) * 1000
+            assert decoded == serialized
+
+            size = response_bytes(stored)
+            print(
+                f"{algorithm:<10}{threshold:>10}{size:>10}{size / baseline:>8.2f}"
+                f"{encode_ms:>11.2f}{decode_ms:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ from src.api.routers import messages_router, agents_router, health_router, tools
 from src.config import get_config
 from src.core.mcp_manager import MCPManager
 from src.logging_config import setup_logging, get_logger
+from src.openai_agents_extensions import close_session_factory
+from src.supabase_clients import close_supabase_clients, init_supabase_clients
 
 # Initialize logging first
 setup_logging()
@@ -29,7 +31,9 @@ app = FastAPI(title=config.api_title, version=config.api_version)
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize MCP manager on application startup."""
+    """Initialize shared Supabase clients and MCP manager on application startup."""
+    await init_supabase_clients()
+
     try:
         logger.info("Initializing MCP connections...")
         await MCPManager.get_instance()
@@ -41,7 +45,7 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Cleanup MCP connections on application shutdown."""
+    """Cleanup MCP and database connections on application shutdown."""
     try:
         logger.info("Shutting down MCP connections...")
         await MCPManager.shutdown()
@@ -49,6 +53,12 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Error during MCP shutdown: {e}", exc_info=True)
 
+    try:
+        await close_session_factory()
+        await close_supabase_clients()
+    except Exception as e:
+        logger.error(f"Error closing database connections: {e}", exc_info=True)
+
 
 # Include routers
 app.include_router(health_router)
@@ -2,9 +2,10 @@ from abc import ABC, abstractmethod
 from typing import Optional
 
 import bcrypt
-from supabase import acreate_client, AsyncClient
+from supabase import AsyncClient
 
 from src.logging_config import get_logger
+from src.supabase_clients import get_supabase_client
 from .models import UserModel, UserCreate
 
 logger = get_logger(__name__)
@@ -77,9 +78,11 @@ class SupabaseAuthDatabase(AuthDatabase):
         self.supabase: Optional[AsyncClient] = None
 
     async def _get_client(self) -> AsyncClient:
-        """Get or create Supabase client"""
+        """Get the shared Supabase client"""
         if self.supabase is None:
-            self.supabase = await acreate_client(self.supabase_url, self.supabase_key)
+            self.supabase = await get_supabase_client(
+                self.supabase_url, self.supabase_key
+            )
         return self.supabase
 
     async def get_user_by_email(self, email: str) -> Optional[UserModel]:
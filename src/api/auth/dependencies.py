@@ -19,9 +19,17 @@ security = HTTPBearer()
 # Format: {token: (user_id, expiration_timestamp)}
 _token_cache: Dict[str, Tuple[Optional[str], float]] = {}
 
+# Shared auth database (its Supabase client comes from the app-wide registry)
+_auth_database: Optional[AuthDatabase] = None
+
 
 def get_auth_database() -> AuthDatabase:
     """Get auth database instance (cached)"""
+    global _auth_database
+
+    if _auth_database is not None:
+        return _auth_database
+
     app_config = get_config()
 
     supabase_url = app_config.auth_supabase_url
@@ -32,7 +40,8 @@ def get_auth_database() -> AuthDatabase:
             "SUPABASE_URL and SUPABASE_KEY environment variables must be set"
         )
 
-    return SupabaseAuthDatabase(supabase_url, supabase_key)
+    _auth_database = SupabaseAuthDatabase(supabase_url, supabase_key)
+    return _auth_database
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -235,3 +235,21 @@ class ClientToolResultRequest(BaseModel):
             ]
         ],
     )
+
+
+class BatchConversationRequest(BaseModel):
+    """Request model for applying one operation to many conversations."""
+
+    session_ids: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Session IDs of the conversations to change (at most 100)",
+        examples=[["session_123456", "session_654321"]],
+    )
+
+    operation: Literal["archive", "star", "delete"] = Field(
+        ...,
+        description="Operation to apply to every listed conversation",
+        examples=["archive"],
+    )
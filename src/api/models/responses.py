@@ -125,6 +125,11 @@ class ConversationListResponse(BaseModel):
 
     total: int = Field(..., description="Total number of conversations", examples=[1])
 
+    next_cursor: str | None = Field(
+        None,
+        description="Cursor for the next page (pass as `cursor`), null on the last page",
+    )
+
 
 class DeleteConversationResponse(BaseModel):
     """Response model for deleting a specific conversation."""
@@ -149,6 +154,72 @@ class DeleteAllConversationsResponse(BaseModel):
     )
 
 
+class BatchConversationResult(BaseModel):
+    """Outcome of a batch operation for one conversation."""
+
+    session_id: str = Field(
+        ..., description="Session ID of the conversation", examples=["session_123456"]
+    )
+    success: bool = Field(
+        ..., description="Whether the operation was applied", examples=[True]
+    )
+    error: str | None = Field(
+        None,
+        description="Why the operation was not applied",
+        examples=["Conversation not found or access denied"],
+    )
+
+
+class BatchConversationResponse(BaseModel):
+    """Response model for batch conversation operations."""
+
+    results: List[BatchConversationResult] = Field(
+        ..., description="One result per requested session ID, in request order"
+    )
+    succeeded: int = Field(
+        ...,
+        description="Number of conversations the operation applied to",
+        examples=[2],
+    )
+
+
+class MessageSearchHitResponse(BaseModel):
+    """A message matching a search query."""
+
+    id: str = Field(..., description="Message ID")
+    session_id: str = Field(
+        ...,
+        description="Session ID of the conversation the message belongs to",
+        examples=["session_123456"],
+    )
+    title: str = Field(
+        ..., description="Title of the conversation", examples=["Apple stock"]
+    )
+    seq: int | None = Field(
+        None, description="Position of the message in its conversation"
+    )
+    role: str | None = Field(None, description="Message role", examples=["user"])
+    created_at: datetime = Field(..., description="When the message was stored")
+    snippet: str = Field(
+        ...,
+        description="Excerpt of the message with the matches wrapped in **",
+        examples=["How did **Apple** stock trade today?"],
+    )
+    rank: float = Field(..., description="Relevance, higher is better")
+
+
+class SearchMessagesResponse(BaseModel):
+    """Response model for message search."""
+
+    results: List[MessageSearchHitResponse] = Field(
+        ..., description="Matching messages, best match first"
+    )
+    next_cursor: str | None = Field(
+        None,
+        description="Cursor for the next page (pass as `cursor`), null on the last page",
+    )
+
+
 class ChatMessageResponse(BaseModel):
     """Response model for chat message."""
 
@@ -170,9 +241,9 @@ class ChatMessageResponse(BaseModel):
         examples=['{"role": "user", "content": "Hello, how can I help you today?"}'],
     )
 
-    content: dict = Field(
-        ...,
-        description="The parsed message content as JSON object",
+    content: dict | None = Field(
+        None,
+        description="The parsed message content as JSON object (omitted when include_content=false)",
         examples=[{"role": "user", "content": "Hello, how can I help you today?"}],
     )
 
@@ -182,6 +253,12 @@ class ChatMessageResponse(BaseModel):
         examples=["user", "assistant"],
     )
 
+    item_type: str | None = Field(
+        None,
+        description="The stored item type (message, function_call, function_call_output, ...)",
+        examples=["message", "function_call"],
+    )
+
     user_id: str = Field(
         ...,
         description="User identifier who sent the message",
@@ -190,6 +267,12 @@ class ChatMessageResponse(BaseModel):
 
     created_at: datetime = Field(..., description="When the message was created")
 
+    seq: int | None = Field(
+        None,
+        description="Position of the message within its conversation",
+        examples=[42],
+    )
+
 
 class GetConversationResponse(BaseModel):
     """Response model for getting a specific conversation."""
@@ -204,9 +287,10 @@ class GetConversationResponse(BaseModel):
         description="List of messages in the conversation",
     )
 
-    total_messages: int = Field(
-        ...,
-        description="Total number of messages in the conversation",
+    total_messages: int | None = Field(
+        None,
+        description="Total number of messages in the conversation "
+        "(null when include_total is false)",
         examples=[10],
     )
 
@@ -215,3 +299,9 @@ class GetConversationResponse(BaseModel):
         description="Whether there are more messages (for pagination)",
         examples=[False],
     )
+
+    next_cursor: str | None = Field(
+        None,
+        description="Cursor for the next page of older messages (pass as `cursor`), "
+        "null on the last page",
+    )
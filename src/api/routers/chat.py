@@ -1,6 +1,12 @@
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
 from agents import Agent
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
+from fastapi.responses import Response, StreamingResponse
 
 from src.api.auth.dependencies import get_user_id
 from src.api.docs.api_docs import SEND_MESSAGE_RESPONSES
@@ -8,12 +14,21 @@ from src.api.models import (
     MessageRequest,
     ConversationListResponse,
 )
+from src.api.models.requests import BatchConversationRequest
 from src.api.models.responses import (
+    BatchConversationResponse,
     DeleteConversationResponse,
     DeleteAllConversationsResponse,
     GetConversationResponse,
+    SearchMessagesResponse,
+)
+from src.config import get_config
+from src.services.chat_service import (
+    CountMode,
+    ListVersion,
+    SearchUnavailableError,
+    get_chat_service,
 )
-from src.services.chat_service import ChatService
 from src.core.agent_factory import get_agent_by_key
 from src.core.agent_key import AgentKey
 from src.core.agent_loop import AgentLoop
@@ -24,6 +39,13 @@ from src.openai_agents_extensions.session_factory import (
     SessionFactory,
 )
 from src.services.conversation_context_manager import ConversationContextManager
+from src.services.conversation_export import (
+    NDJSON_MEDIA_TYPE,
+    export_all_conversations,
+    export_conversation,
+)
+from src.services.history_compactor import HistoryCompactor
+from src.services.pagination import InvalidCursorError
 from src.services.title_renamer import ChatTitleRenamer
 
 logger = get_logger(__name__)
@@ -33,6 +55,47 @@ router = APIRouter()
 # Chat service will be created per request for proper isolation
 
 
+def _etag(*parts) -> str:
+    """Weak ETag over the values that determine a response body"""
+    normalized = [
+        part.astimezone(timezone.utc).isoformat()
+        if isinstance(part, datetime)
+        else part
+        for part in parts
+    ]
+    digest = hashlib.sha256(json.dumps(normalized, default=str).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match lists `etag` (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag for tag in header.split(",")
+    )
+
+
+def _cache_headers(etag: str) -> dict:
+    # Clients may keep the response but must revalidate it before reuse
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _parse_message_data(message_data: str) -> dict:
+    """Parse stored message JSON, falling back to a basic structure"""
+    try:
+        parsed_content = json.loads(message_data)
+        if isinstance(parsed_content, dict):
+            return parsed_content
+    except (json.JSONDecodeError, TypeError):
+        pass
+    return {"content": str(message_data)}
+
+
 @router.post(
     "/chat/send_message",
     response_model=None,
@@ -122,6 +185,14 @@ async def send_message(
             user_id,
         )
 
+        # Fold older turns into the stored summary once the history is long
+        if get_config().sessions_compaction_enabled:
+            background_tasks.add_task(
+                HistoryCompactor.compact_in_background,
+                request.session_id,
+                user_id,
+            )
+
         # Determine if this is a continuation (has tool results)
         is_continuation = bool(request.tool_results)
 
@@ -163,10 +234,14 @@ async def send_message(
     tags=["chat"],
 )
 async def list_conversations(
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_user_id),
     is_archived: bool = False,
     limit: int = 20,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    count: Optional[CountMode] = None,
 ):
     """
     Retrieve a list of conversations from Supabase.
@@ -177,18 +252,62 @@ async def list_conversations(
     **Query Parameters:**
     - `is_archived`: Filter by archived status (default: False)
     - `limit`: Maximum number of conversations to return (default: 20)
-    - `offset`: Number of conversations to skip (default: 0)
+    - `offset`: Number of conversations to skip (default: 0, kept for
+      compatibility; prefer `cursor`)
+    - `cursor`: `next_cursor` from the previous page
+    - `count`: How to compute `total`: `exact`, `planned` (query planner
+      estimate) or `estimated` (exact for small results, planned otherwise).
+      Without it, `total` is the number of conversations in this page
 
     **Response:**
     - `conversations`: List of conversation summaries with metadata
     - `total`: Total number of conversations found
+    - `next_cursor`: Cursor for the next page, null on the last page
+
+    The response carries an `ETag`. Send it back in `If-None-Match` to get
+    `304 Not Modified` instead of the list when nothing changed. The ETag
+    follows the latest conversation update and the number of conversations
+    in the list, so adding, updating, deleting, archiving or unarchiving
+    conversations changes it.
     """
     try:
         # Create request-scoped chat service for proper isolation
-        chat_service = ChatService()
-        result = await chat_service.list_conversations(
-            user_id, is_archived, limit, offset
+        chat_service = get_chat_service()
+
+        def list_etag(version: ListVersion) -> str:
+            return _etag(
+                "conversations",
+                user_id,
+                *version,
+                is_archived,
+                limit,
+                offset,
+                cursor,
+                count,
+            )
+
+        etag = None
+        if request.headers.get("if-none-match"):
+            # Answer conditional requests from the list version alone
+            etag = list_etag(
+                await chat_service.get_conversation_list_version(user_id, is_archived)
+            )
+            if _etag_matches(request, etag):
+                return Response(status_code=304, headers=_cache_headers(etag))
+
+        result = await chat_service.list_conversations_cached(
+            user_id, is_archived, limit, offset, cursor, count
         )
+        page = result.conversations
+        if not cursor and not offset and len(page) < limit:
+            # A short first page is the whole list, so it is its own version
+            # (cached or not) and the ETag never runs ahead of the body
+            etag = list_etag((page[0].updated_at if page else None, len(page)))
+        elif etag is None:
+            etag = list_etag(
+                await chat_service.get_conversation_list_version(user_id, is_archived)
+            )
+        response.headers.update(_cache_headers(etag))
 
         # Convert to API response format
         conversations = []
@@ -205,8 +324,14 @@ async def list_conversations(
                 }
             )
 
-        return ConversationListResponse(conversations=conversations, total=result.total)
+        return ConversationListResponse(
+            conversations=conversations,
+            total=result.total,
+            next_cursor=result.next_cursor,
+        )
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch conversations: {str(e)}"
@@ -236,7 +361,7 @@ async def delete_conversation(session_id: str, user_id: str = Depends(get_user_i
     """
     try:
         # Create request-scoped chat service for proper isolation
-        chat_service = ChatService()
+        chat_service = get_chat_service()
         result = await chat_service.delete_conversation(session_id, user_id)
         return DeleteConversationResponse(message=result.message)
 
@@ -268,7 +393,7 @@ async def delete_all_conversations(user_id: str = Depends(get_user_id)):
     """
     try:
         # Create request-scoped chat service for proper isolation
-        chat_service = ChatService()
+        chat_service = get_chat_service()
         result = await chat_service.delete_all_conversations(user_id)
         return DeleteAllConversationsResponse(
             message=result.message, deleted_count=result.deleted_count
@@ -280,6 +405,185 @@ async def delete_all_conversations(user_id: str = Depends(get_user_id)):
         )
 
 
+@router.post(
+    "/chat/batch",
+    response_model=BatchConversationResponse,
+    summary="Batch Conversation Operation",
+    description="Archive, star or delete many conversations in one request",
+    response_description="Per-conversation results",
+    tags=["chat"],
+)
+async def batch_conversations(
+    request: BatchConversationRequest, user_id: str = Depends(get_user_id)
+):
+    """
+    Apply one operation to many conversations at once.
+
+    The operation runs as a single database statement filtered on the
+    authenticated user, instead of one request per conversation. Only the
+    conversation owner can change their conversations.
+
+    **Request Body:**
+    - `session_ids`: Session IDs of the conversations to change (1-100)
+    - `operation`: `archive`, `star` or `delete`
+
+    **Response:**
+    - `results`: One entry per session ID with `success` and, if it was not
+      applied, an `error`
+    - `succeeded`: Number of conversations changed
+    """
+    try:
+        # Duplicates would get a result each but only change the row once
+        session_ids = list(dict.fromkeys(request.session_ids))
+
+        # Create request-scoped chat service for proper isolation
+        chat_service = get_chat_service()
+        applied = set(
+            await chat_service.run_batch_operation(
+                user_id, session_ids, request.operation
+            )
+        )
+
+        results = [
+            {"session_id": session_id, "success": True}
+            if session_id in applied
+            else {
+                "session_id": session_id,
+                "success": False,
+                "error": "Conversation not found or access denied",
+            }
+            for session_id in session_ids
+        ]
+        return BatchConversationResponse(results=results, succeeded=len(applied))
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to {request.operation} conversations: {str(e)}",
+        )
+
+
+@router.get(
+    "/chat/search",
+    response_model=SearchMessagesResponse,
+    summary="Search Messages",
+    description="Full-text search over the messages of all of the user's conversations",
+    response_description="Matching messages with highlighted snippets",
+    tags=["chat"],
+)
+async def search_messages(
+    q: str,
+    user_id: str = Depends(get_user_id),
+    limit: int = 20,
+    cursor: Optional[str] = None,
+):
+    """
+    Search the text of the user's and assistant's messages.
+
+    Matches are ranked by relevance and returned with a snippet of the
+    message, so clients don't have to page through every conversation to
+    find an old chat.
+
+    **Query Parameters:**
+    - `q`: Search text; all words must match. On Postgres, "quoted phrases"
+      and -excluded words are supported too
+    - `limit`: Maximum number of results to return (default: 20)
+    - `cursor`: `next_cursor` from the previous page
+
+    **Response:**
+    - `results`: Matching messages with their session ID, conversation
+      title, snippet and rank, best match first
+    - `next_cursor`: Cursor for the next page, null on the last page
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query is empty")
+
+    try:
+        # Create request-scoped chat service for proper isolation
+        chat_service = get_chat_service()
+        result = await chat_service.search_messages(user_id, q, limit, cursor)
+
+        return SearchMessagesResponse(
+            results=[hit.model_dump() for hit in result.hits],
+            next_cursor=result.next_cursor,
+        )
+
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SearchUnavailableError as e:
+        raise HTTPException(
+            status_code=501, detail=f"Message search is not available: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to search messages: {str(e)}"
+        )
+
+
+@router.get(
+    "/chat/export",
+    summary="Export All Conversations",
+    description="Stream all of the user's conversations and messages as NDJSON",
+    response_description="NDJSON stream of conversation and message records",
+    tags=["chat"],
+)
+async def export_all_chats(user_id: str = Depends(get_user_id)):
+    """
+    Export all of the user's conversations, archived ones included.
+
+    The response is streamed as newline-delimited JSON: a `conversation`
+    record followed by its `message` records in order, for each
+    conversation. Messages are read in chunks, so exports of any size use
+    bounded memory on the server.
+    """
+    # Create request-scoped chat service for proper isolation
+    chat_service = get_chat_service()
+    return StreamingResponse(
+        export_all_conversations(chat_service, user_id),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="conversations.ndjson"'},
+    )
+
+
+@router.get(
+    "/chat/{session_id}/export",
+    summary="Export Conversation",
+    description="Stream a conversation and all of its messages as NDJSON",
+    response_description="NDJSON stream of conversation and message records",
+    tags=["chat"],
+)
+async def export_chat(session_id: str, user_id: str = Depends(get_user_id)):
+    """
+    Export a conversation with all of its messages.
+
+    The response is streamed as newline-delimited JSON: one `conversation`
+    record followed by a `message` record per message, in order. Use this
+    instead of paging through `GET /chat/{session_id}`.
+    Only the conversation owner can export their conversations.
+    """
+    # Create request-scoped chat service for proper isolation
+    chat_service = get_chat_service()
+    try:
+        # Load the conversation row (and check it exists) before the stream
+        # starts; the messages are read by the export itself
+        page = await chat_service.get_conversation(
+            session_id, user_id, limit=1, include_total=False
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to export conversation: {str(e)}"
+        )
+
+    filename = re.sub(r"[^\w.-]", "_", session_id)
+    return StreamingResponse(
+        export_conversation(chat_service, page.conversation),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'},
+    )
+
+
 @router.get(
     "/chat/{session_id}",
     response_model=GetConversationResponse,
@@ -290,9 +594,14 @@ async def delete_all_conversations(user_id: str = Depends(get_user_id)):
 )
 async def get_conversation(
     session_id: str,
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_user_id),
     limit: int = 10,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_content: bool = True,
+    include_total: bool = True,
 ):
     """
     Get a specific conversation by session ID with reverse pagination.
@@ -304,39 +613,74 @@ async def get_conversation(
     **Parameters:**
     - `session_id`: The session ID of the conversation to retrieve
     - `limit`: Maximum number of messages to return (default: 10)
-    - `offset`: Number of messages to skip from the end (default: 0)
+    - `offset`: Number of messages to skip from the end (default: 0, kept for
+      compatibility; prefer `cursor`)
+    - `cursor`: `next_cursor` from the previous page, to load older messages
+    - `include_content`: Also return each message parsed as `content`
+      (default: true). Clients that only use the raw `message_data` can turn
+      this off.
+    - `include_total`: Count all messages for `total_messages` (default:
+      true). Counting scans the whole conversation; use `has_more` and
+      `next_cursor` to paginate without it.
 
     **Response:**
     - Conversation details and messages with pagination info
+
+    The response carries an `ETag`. Send it back in `If-None-Match` to get
+    `304 Not Modified` instead of the messages when nothing changed.
     """
+
+    def conversation_etag(updated_at: datetime) -> str:
+        return _etag(
+            "conversation",
+            user_id,
+            session_id,
+            updated_at,
+            limit,
+            offset,
+            cursor,
+            include_content,
+            include_total,
+        )
+
     try:
         # Create request-scoped chat service for proper isolation
-        chat_service = ChatService()
-        result = await chat_service.get_conversation(session_id, user_id, limit, offset)
+        chat_service = get_chat_service()
+
+        etag = None
+        if request.headers.get("if-none-match"):
+            # Every write to the conversation bumps updated_at, so the check
+            # is a single-row read that doesn't touch the messages
+            updated_at = await chat_service.get_conversation_version(
+                session_id, user_id
+            )
+            if updated_at is not None:
+                etag = conversation_etag(updated_at)
+                if _etag_matches(request, etag):
+                    return Response(status_code=304, headers=_cache_headers(etag))
+
+        result = await chat_service.get_conversation(
+            session_id, user_id, limit, offset, cursor, include_total
+        )
+        if etag is None:
+            etag = conversation_etag(result.conversation.updated_at)
+        response.headers.update(_cache_headers(etag))
 
         # Convert to API response format
         messages = []
         for msg in result.messages:
-            # Parse message_data JSON and extract role
-            parsed_content = {}
-            role = "assistant"  # default
-
-            try:
-                import json
-
-                parsed_content = (
-                    json.loads(msg.message_data)
-                    if isinstance(msg.message_data, str)
-                    else msg.message_data
-                )
-
-                # Extract role from parsed content
+            parsed_content = None
+            if msg.item_type is not None:
+                # Role and type were projected when the message was stored
+                role = msg.role or "assistant"
+                if include_content:
+                    parsed_content = _parse_message_data(msg.message_data)
+            else:
+                # Rows stored before the projection: parse to extract the role
+                parsed_content = _parse_message_data(msg.message_data)
                 role = parsed_content.get("role", "assistant")
-
-            except (json.JSONDecodeError, TypeError, AttributeError):
-                # Fallback: create a basic structure
-                parsed_content = {"content": str(msg.message_data)}
-                role = "assistant"  # default fallback
+                if not include_content:
+                    parsed_content = None
 
             messages.append(
                 {
@@ -345,8 +689,10 @@ async def get_conversation(
                     "message_data": msg.message_data,
                     "content": parsed_content,
                     "role": role,
+                    "item_type": msg.item_type,
                     "user_id": msg.user_id,
                     "created_at": msg.created_at,
+                    "seq": msg.seq,
                 }
             )
 
@@ -365,8 +711,11 @@ async def get_conversation(
             messages=messages,
             total_messages=result.total_messages,
             has_more=result.has_more,
+            next_cursor=result.next_cursor,
         )
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise e
         raise HTTPException(status_code=404, detail=str(e))
@@ -399,7 +748,7 @@ async def archive_conversation(session_id: str, user_id: str = Depends(get_user_
     """
     try:
         # Create request-scoped chat service for proper isolation
-        chat_service = ChatService()
+        chat_service = get_chat_service()
         result = await chat_service.archive_conversation(session_id, user_id)
         return DeleteConversationResponse(message=result.message)
 
@@ -434,7 +783,7 @@ async def star_conversation(session_id: str, user_id: str = Depends(get_user_id)
     """
     try:
         # Create request-scoped chat service for proper isolation
-        chat_service = ChatService()
+        chat_service = get_chat_service()
         result = await chat_service.star_conversation(session_id, user_id)
         return DeleteConversationResponse(message=result.message)
 
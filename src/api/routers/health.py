@@ -1,5 +1,9 @@
 from fastapi import APIRouter
 from src.__version__ import __version__
+from src.openai_agents_extensions.conversation_list_cache import (
+    get_conversation_list_cache,
+)
+from src.openai_agents_extensions.history_cache import get_history_cache
 
 router = APIRouter()
 
@@ -9,6 +13,17 @@ def health():
     return {"status": "ok"}
 
 
+@router.get("/health/cache")
+def cache_stats():
+    """Hit/miss counters of the in-process caches, for tuning their sizes."""
+    history_cache = get_history_cache()
+    list_cache = get_conversation_list_cache()
+    return {
+        "history": history_cache.stats() if history_cache else None,
+        "conversation_lists": list_cache.stats() if list_cache else None,
+    }
+
+
 @router.get("/version")
 def version():
     return {"version": __version__}
@@ -35,6 +35,40 @@ class Config(BaseSettings):
     sessions_supabase_url: Optional[str] = None
     sessions_supabase_key: Optional[str] = None
 
+    # Session storage backend: "supabase", "sqlite" (local file) or "postgres"
+    sessions_backend: str = "supabase"
+    sessions_sqlite_path: str = "data/sessions.db"
+    sessions_postgres_dsn: Optional[str] = None  # Direct connection for "postgres"
+    sessions_postgres_pool_min_size: int = 1
+    sessions_postgres_pool_max_size: int = 10
+
+    # Session storage tuning
+    sessions_use_rpc: bool = True  # Combined read/write functions from schema.sql
+    sessions_history_cache_bytes: int = 0  # In-process history cache, 0 disables
+    sessions_lazy_create: bool = False  # Create conversation rows on first write
+
+    # Rolling history compaction: once the unsummarized history passes either
+    # threshold, older items are folded into a stored summary (0 disables)
+    sessions_compaction_max_items: int = 0
+    sessions_compaction_max_tokens: int = 0
+    sessions_compaction_keep_items: int = 20  # Recent items kept verbatim
+
+    # Compress stored messages of at least this many bytes (0 disables)
+    sessions_compression_threshold: int = 0
+    sessions_compression_algorithm: str = "zlib"  # "zlib" or "zstd"
+
+    # In-process cache of GET /chat pages per user (TTL 0 disables)
+    chat_list_cache_ttl_seconds: float = 0
+    chat_list_cache_max_entries: int = 1000
+
+    # Merge consecutive text_delta stream events arriving within this window
+    # into one frame, up to the byte budget (0 disables)
+    stream_delta_window_ms: float = 0
+    stream_delta_max_bytes: int = 1024
+
+    # "orjson", "json" or "auto" (orjson if installed)
+    stream_json_encoder: str = "auto"
+
     # OpenAI configuration (if needed)
     openai_api_key: Optional[str] = None
 
@@ -70,6 +104,26 @@ class Config(BaseSettings):
             raise ValueError(f"Invalid log level: {v}. Must be one of {valid_levels}")
         return v.upper()
 
+    @field_validator("sessions_backend")
+    def validate_sessions_backend(cls, v):
+        """Validate session storage backend"""
+        valid_backends = ["supabase", "sqlite", "postgres"]
+        if v.lower() not in valid_backends:
+            raise ValueError(
+                f"Invalid sessions backend: {v}. Must be one of {valid_backends}"
+            )
+        return v.lower()
+
+    @field_validator("sessions_compression_algorithm")
+    def validate_sessions_compression_algorithm(cls, v):
+        """Validate message compression algorithm"""
+        valid_algorithms = ["zlib", "zstd"]
+        if v.lower() not in valid_algorithms:
+            raise ValueError(
+                f"Invalid compression algorithm: {v}. Must be one of {valid_algorithms}"
+            )
+        return v.lower()
+
     @field_validator("debug", mode="before")
     def validate_debug(cls, v):
         """Convert string boolean to actual boolean"""
@@ -100,6 +154,14 @@ class Config(BaseSettings):
         """Get Supabase key for auth (fallback to main key)"""
         return self.supabase_auth_key or self.supabase_key
 
+    @property
+    def sessions_compaction_enabled(self) -> bool:
+        """Whether rolling history compaction is configured"""
+        return (
+            self.sessions_compaction_max_items > 0
+            or self.sessions_compaction_max_tokens > 0
+        )
+
     @property
     def sessions_url(self) -> str:
         """Get Supabase URL for sessions (fallback to main URL)"""
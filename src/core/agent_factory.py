@@ -30,6 +30,23 @@ async def _create_chat_title_renamer():
     )
 
 
+async def _create_history_compactor():
+    """Create history compactor agent."""
+    model = create_model_by_key("cheap_model")
+
+    return Agent(
+        name="History compactor",
+        instructions=(
+            "You summarize conversations between a user and an AI assistant. "
+            "Keep every fact, decision, user preference, tool result and open "
+            "question that later turns may rely on. Be concise and write plain text."
+        ),
+        model=model,
+        tools=[],
+        model_settings=ModelSettings(temperature=0.2, max_tokens=3000),
+    )
+
+
 async def _create_history_tutor():
     """Create history tutor agent."""
     model = create_model_by_key("default")
@@ -131,6 +148,7 @@ async def _create_triage_agent():
 # Agent factory functions
 AGENT_FACTORIES = {
     AgentKey.CHAT_TITLE_RENAMER: _create_chat_title_renamer,
+    AgentKey.HISTORY_COMPACTOR: _create_history_compactor,
     AgentKey.HISTORY_TUTOR: _create_history_tutor,
     AgentKey.MATH_TUTOR: _create_math_tutor,
     AgentKey.TRIAGE_AGENT: _create_triage_agent,
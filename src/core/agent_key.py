@@ -5,6 +5,7 @@ class AgentKey(str, Enum):
     """Enum for agent keys."""
 
     CHAT_TITLE_RENAMER = "chat_title_renamer"
+    HISTORY_COMPACTOR = "history_compactor"
     HISTORY_TUTOR = "history_tutor"
     MATH_TUTOR = "math_tutor"
     TRIAGE_AGENT = "triage_agent"
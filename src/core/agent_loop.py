@@ -1,11 +1,14 @@
 import json
-from typing import AsyncGenerator, List, Optional
+import logging
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
 
-from agents import Agent, Runner
+from agents import Agent, Runner, StreamEvent
 
 from src.api.models.requests import ClientToolDefinition, ClientToolResult
 from src.core.client_tools import convert_client_tools_to_function_tools
+from src.core.event_encoder import get_event_encoder
 from src.core.event_handlers import EventProcessor
+from src.core.stream_coalescer import get_text_delta_coalescer
 from src.logging_config import get_logger
 from src.services.conversation_context_manager import ConversationContextManager
 
@@ -20,7 +23,7 @@ class AgentLoop:
         conversation_manager: ConversationContextManager,
         message: str,
         client_tools: Optional[List[ClientToolDefinition]] = None,
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Single method to handle both initial and continuation execution."""
 
         # Add client tools if provided and configure to stop at client tools
@@ -45,19 +48,19 @@ class AgentLoop:
             )
 
         # Use SDK's native streaming
-        async for event in Runner.run_streamed(
+        result = Runner.run_streamed(
             agent_with_tools,
             input=message,
             session=conversation_manager.session,
             context=await conversation_manager.get_message_with_context(message),
             max_turns=5,
-        ).stream_events():
-            print(event)
+        )
 
-            # Process and yield events - SDK will automatically stop at client tools
-            processed_event = await event_processor.process_event(event)
-            if processed_event:
-                yield f"{json.dumps(processed_event)}\n"
+        # Process and yield events - SDK will automatically stop at client tools
+        async for line in AgentLoop._stream_lines(
+            result.stream_events(), event_processor
+        ):
+            yield line
 
     @staticmethod
     async def continue_after_client_tools(
@@ -66,73 +69,70 @@ class AgentLoop:
         conversation_manager: ConversationContextManager,
         tool_results: List[ClientToolResult],
         client_tools: Optional[List[ClientToolDefinition]] = None,
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Continue execution after client tool results."""
 
         if not conversation_manager.session:
             raise ValueError("Session required for continuation")
 
-        # Get the current conversation history
-        session_items = await conversation_manager.session.get_items()
-        logger.info(f"Retrieved {len(session_items)} items from session")
         for tool_result in tool_results:
             logger.info(tool_result)
-        # Find and replace the pending tool results
-        updated_items = []
-        for item in session_items:
-            # Convert session item to dict if needed
-            if isinstance(item, str):
-                item_dict = json.loads(item)
-            else:
-                item_dict = item
-
-            # Check if this is a tool result with PENDING_CLIENT_EXECUTION
-            if (
-                item_dict.get("role") == "tool"
-                and isinstance(item_dict.get("content"), str)
-                and "PENDING_CLIENT_EXECUTION" in item_dict.get("content", "")
-            ):
-                # Replace with actual tool result
-                for tool_result in tool_results:
-                    if item_dict.get("tool_call_id") == tool_result.tool_call_id:
-                        updated_items.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_result.tool_call_id,
-                                "content": tool_result.result
-                                or f"Tool {tool_result.tool_name} executed successfully",
-                            }
-                        )
-                        logger.info(
-                            f"Replaced pending result for tool {tool_result.tool_name}"
-                        )
-                        break
-            else:
-                updated_items.append(item_dict)
-
-        # Update session with the tool results BEFORE continuing
-        await conversation_manager.session.clear_session()
-        await conversation_manager.session.add_items(updated_items)
+
+        # Replace the pending tool outputs in place, BEFORE continuing
+        results = {
+            tool_result.tool_call_id: tool_result.result
+            or f"Tool {tool_result.tool_name} executed successfully"
+            for tool_result in tool_results
+        }
+        patched = await conversation_manager.session.update_tool_results(results)
         logger.info(
-            f"Updated session with {len(updated_items)} items including actual tool results"
+            f"Updated {patched} pending tool result(s) in session "
+            f"for {len(results)} client tool call(s)"
         )
 
         # Now continue with the agent using the session (like in run_agent_stream)
         continue_agent = agent.clone()
 
         # Use SDK's native streaming with session - this will automatically persist all messages
-        async for event in Runner.run_streamed(
+        result = Runner.run_streamed(
             continue_agent,
             input="",  # Empty input since we're continuing from session
             session=conversation_manager.session,  # Pass session for automatic persistence
             max_turns=5,
-        ).stream_events():
-            print(event)
+        )
+
+        # Process and yield events - SDK will automatically handle persistence
+        async for line in AgentLoop._stream_lines(
+            result.stream_events(), event_processor
+        ):
+            yield line
 
-            # Process and yield events - SDK will automatically handle persistence
-            processed_event = await event_processor.process_event(event)
-            if processed_event:
-                yield f"{json.dumps(processed_event)}\n"
+    @staticmethod
+    async def _stream_lines(
+        stream_events: AsyncIterator[StreamEvent], event_processor: EventProcessor
+    ) -> AsyncGenerator[bytes, None]:
+        """Turn SDK stream events into encoded NDJSON lines, coalescing text
+        deltas when configured."""
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        async def processed_events() -> AsyncIterator[Dict[str, Any]]:
+            async for event in stream_events:
+                if debug:
+                    logger.debug(f"Stream event: {event}")
+
+                processed_event = await event_processor.process_event(event)
+                if processed_event:
+                    yield processed_event
+
+        events = processed_events()
+        coalescer = get_text_delta_coalescer()
+        if coalescer is not None:
+            events = coalescer.coalesce(events)
+
+        encoder = get_event_encoder()
+        async for event in events:
+            yield encoder.encode(event)
 
     @staticmethod
     def _create_client_tool_event(tool_call) -> str:
@@ -0,0 +1,92 @@
+import json
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Optional
+
+from src.config import get_config
+from src.logging_config import get_logger
+
+try:
+    import orjson
+except ImportError:  # Optional dependency: pip install "actors[orjson]"
+    orjson = None
+
+logger = get_logger(__name__)
+
+# text_delta is by far the most frequent stream event and always has this
+# shape, so only its text needs encoding
+TEXT_DELTA_PREFIX = b'{"type":"text_delta","data":'
+TEXT_DELTA_SUFFIX = b"}\n"
+
+
+class EventEncoder:
+    """Encodes processed stream events as NDJSON lines, using the stdlib json."""
+
+    name = "json"
+
+    def encode(self, event: Dict[str, Any]) -> bytes:
+        """Encode an event as one NDJSON line."""
+        if len(event) == 2 and event.get("type") == "text_delta":
+            data = event.get("data")
+            if type(data) is str:
+                return TEXT_DELTA_PREFIX + self._encode_string(data) + TEXT_DELTA_SUFFIX
+        return self._encode_line(event)
+
+    def _encode_string(self, value: str) -> bytes:
+        return encode_basestring_ascii(value).encode("ascii")
+
+    def _encode_line(self, event: Dict[str, Any]) -> bytes:
+        return (json.dumps(event, separators=(",", ":")) + "\n").encode()
+
+
+class OrjsonEventEncoder(EventEncoder):
+    """Encodes processed stream events with orjson.
+
+    Values orjson rejects (such as strings with lone surrogates) fall back
+    to the stdlib encoder.
+    """
+
+    name = "orjson"
+
+    def _encode_string(self, value: str) -> bytes:
+        try:
+            return orjson.dumps(value)
+        except orjson.JSONEncodeError:
+            return super()._encode_string(value)
+
+    def _encode_line(self, event: Dict[str, Any]) -> bytes:
+        try:
+            return orjson.dumps(
+                event, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+            )
+        except orjson.JSONEncodeError:
+            return super()._encode_line(event)
+
+
+# Global event encoder instance
+_event_encoder: Optional[EventEncoder] = None
+
+
+def create_event_encoder(name: str = "auto") -> EventEncoder:
+    """Create the encoder called `name`: "orjson", "json" or "auto" (orjson
+    when it is installed)."""
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+
+    if name == "orjson":
+        if orjson is None:
+            raise RuntimeError(
+                'The orjson stream encoder requires orjson (install with: pip install "actors[orjson]")'
+            )
+        return OrjsonEventEncoder()
+    return EventEncoder()
+
+
+def get_event_encoder() -> EventEncoder:
+    """Get the configured stream event encoder."""
+    global _event_encoder
+
+    if _event_encoder is None:
+        _event_encoder = create_event_encoder(get_config().stream_json_encoder)
+        logger.info(f"Encoding stream events with {_event_encoder.name}")
+
+    return _event_encoder
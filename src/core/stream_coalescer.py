@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.config import get_config
+
+# Marks the end of the source stream in the coalescer's queue
+_END = object()
+
+
+class TextDeltaCoalescer:
+    """Merges consecutive text_delta events into fewer, larger frames.
+
+    A delta is held for at most `window_seconds` after the first delta of
+    its frame, or until the frame reaches `max_bytes`. Any other event
+    flushes the pending text first, so events keep their order.
+    """
+
+    def __init__(self, window_seconds: float, max_bytes: int):
+        self.window_seconds = window_seconds
+        self.max_bytes = max_bytes
+
+    async def coalesce(
+        self, events: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield `events` with runs of text_delta events merged."""
+        # The source is read by a separate task, so the window can expire
+        # while the model is still producing the next event
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump() -> None:
+            try:
+                async for event in events:
+                    queue.put_nowait(event)
+            except Exception as e:
+                queue.put_nowait(e)
+            else:
+                queue.put_nowait(_END)
+
+        pump_task = asyncio.create_task(pump())
+        loop = asyncio.get_running_loop()
+        pending: List[str] = []
+        pending_bytes = 0
+        deadline: Optional[float] = None
+
+        def flush() -> Dict[str, Any]:
+            nonlocal pending_bytes, deadline
+            event = {"type": "text_delta", "data": "".join(pending)}
+            pending.clear()
+            pending_bytes = 0
+            deadline = None
+            return event
+
+        try:
+            while True:
+                if deadline is None:
+                    event = await queue.get()
+                else:
+                    try:
+                        event = await asyncio.wait_for(
+                            queue.get(), max(deadline - loop.time(), 0)
+                        )
+                    except asyncio.TimeoutError:
+                        yield flush()
+                        continue
+
+                if event is _END or isinstance(event, Exception):
+                    if pending:
+                        yield flush()
+                    if event is not _END:
+                        raise event
+                    return
+
+                if event.get("type") == "text_delta":
+                    pending.append(event["data"])
+                    pending_bytes += len(event["data"].encode())
+                    if deadline is None:
+                        deadline = loop.time() + self.window_seconds
+                    if pending_bytes >= self.max_bytes:
+                        yield flush()
+                    continue
+
+                if pending:
+                    yield flush()
+                yield event
+        finally:
+            pump_task.cancel()
+            try:
+                await pump_task
+            except asyncio.CancelledError:
+                pass
+
+
+def get_text_delta_coalescer() -> Optional[TextDeltaCoalescer]:
+    """Get a coalescer for the configured window, or None when it is disabled."""
+    config = get_config()
+    if config.stream_delta_window_ms <= 0:
+        return None
+    return TextDeltaCoalescer(
+        config.stream_delta_window_ms / 1000, config.stream_delta_max_bytes
+    )
@@ -0,0 +1,56 @@
+-- Migration: per-session message sequence numbers and composite indexes
+-- Run once in the Supabase SQL editor on databases created from an older
+-- src/schema.sql, then re-create the session write functions
+-- (add_session_items, pop_session_item, clear_session_items) from src/schema.sql.
+
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS last_seq BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS seq BIGINT;
+
+-- Backfill without touching conversations.updated_at (keeps list order intact)
+ALTER TABLE conversations DISABLE TRIGGER update_conversations_updated_at;
+
+UPDATE messages m
+SET seq = numbered.rn
+FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY created_at, id) AS rn
+    FROM messages
+) numbered
+WHERE m.id = numbered.id AND m.seq IS NULL;
+
+UPDATE conversations c
+SET last_seq = COALESCE(
+    (SELECT MAX(seq) FROM messages m WHERE m.session_id = c.session_id), 0
+);
+
+ALTER TABLE conversations ENABLE TRIGGER update_conversations_updated_at;
+
+ALTER TABLE messages ALTER COLUMN seq SET NOT NULL;
+ALTER TABLE messages
+    ADD CONSTRAINT uq_messages_session_seq UNIQUE (session_id, seq);
+
+CREATE OR REPLACE FUNCTION assign_message_seq()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.seq IS NULL THEN
+        UPDATE conversations
+        SET last_seq = last_seq + 1
+        WHERE session_id = NEW.session_id
+        RETURNING last_seq INTO NEW.seq;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS assign_messages_seq ON messages;
+CREATE TRIGGER assign_messages_seq
+    BEFORE INSERT ON messages
+    FOR EACH ROW
+    EXECUTE FUNCTION assign_message_seq();
+
+-- Composite indexes replace the single-column ones they cover
+CREATE INDEX IF NOT EXISTS idx_messages_session_user_seq
+    ON messages(session_id, user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_conversations_user_archived_updated
+    ON conversations(user_id, is_archived, updated_at DESC);
+DROP INDEX IF EXISTS idx_messages_session_id;
+DROP INDEX IF EXISTS idx_conversations_user_id;
@@ -0,0 +1,7 @@
+-- Migration: persisted history summaries for rolling compaction
+-- Run once in the Supabase SQL editor on databases created from an older
+-- src/schema.sql, then re-create clear_session_items from src/schema.sql
+-- (it now also resets the summary).
+
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summary TEXT;
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summary_seq BIGINT NOT NULL DEFAULT 0;
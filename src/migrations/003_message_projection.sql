@@ -0,0 +1,20 @@
+-- Migration: role/item_type columns projected from message_data
+-- Run once in the Supabase SQL editor on databases created from an older
+-- src/schema.sql, then re-create add_session_items from src/schema.sql
+-- (it now takes the projected fields in p_meta).
+
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS role VARCHAR(32);
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS item_type VARCHAR(64);
+
+-- Backfill plain JSON rows. Compressed rows ("~zlib:"/"~zstd:" prefix) are
+-- left NULL; readers fall back to parsing message_data for those.
+UPDATE messages
+SET
+    role = message_data::jsonb->>'role',
+    item_type = COALESCE(
+        message_data::jsonb->>'type',
+        CASE WHEN message_data::jsonb ? 'role' THEN 'message' END
+    )
+WHERE role IS NULL
+  AND item_type IS NULL
+  AND message_data NOT LIKE '~%';
@@ -0,0 +1,8 @@
+-- Migration: index for cursor pagination of the conversation list
+-- Run once in the Supabase SQL editor on databases created from an older
+-- src/schema.sql. The list is ordered by (updated_at, id), so the index
+-- includes id to resolve ties and seek directly to the next page.
+
+CREATE INDEX IF NOT EXISTS idx_conversations_user_archived_updated_id
+    ON conversations(user_id, is_archived, updated_at DESC, id DESC);
+DROP INDEX IF EXISTS idx_conversations_user_archived_updated;
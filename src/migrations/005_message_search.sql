@@ -0,0 +1,48 @@
+-- Migration: full-text search over message text
+-- Run once in the Supabase SQL editor on databases created from an older
+-- src/schema.sql, then re-create add_session_items (it now stores
+-- content_text from p_meta) and create search_messages from src/schema.sql.
+
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS content_text TEXT;
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS content_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(content_text, ''))) STORED;
+
+-- Backfill plain JSON user and assistant messages. Compressed rows
+-- ("~zlib:"/"~zstd:" prefix) are left NULL and are not searchable. The cast
+-- is guarded by CASE, as Postgres may evaluate WHERE conditions in any
+-- order and compressed values are not JSON.
+WITH plain AS (
+    SELECT id, item
+    FROM (
+        SELECT id, CASE
+            WHEN message_data NOT LIKE '~%' THEN message_data::jsonb
+        END AS item
+        FROM messages
+        WHERE content_text IS NULL
+    ) AS decoded
+    WHERE item IS NOT NULL
+),
+extracted AS (
+    SELECT id, NULLIF(
+        CASE jsonb_typeof(item->'content')
+            WHEN 'string' THEN item->>'content'
+            WHEN 'array' THEN (
+                SELECT string_agg(part->>'text', ' ')
+                FROM jsonb_array_elements(item->'content') AS part
+                WHERE jsonb_typeof(part->'text') = 'string'
+            )
+        END,
+        ''
+    ) AS content_text
+    FROM plain
+    WHERE item->>'role' IN ('user', 'assistant')
+      AND COALESCE(item->>'type', 'message') = 'message'
+)
+UPDATE messages
+SET content_text = extracted.content_text
+FROM extracted
+WHERE messages.id = extracted.id
+  AND extracted.content_text IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_messages_content_tsv
+    ON messages USING GIN (content_tsv);
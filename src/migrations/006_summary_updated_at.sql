@@ -0,0 +1,23 @@
+-- Migration: saving a history summary no longer bumps updated_at
+-- Run once in the Supabase SQL editor on databases created from an older
+-- src/schema.sql.
+
+CREATE OR REPLACE FUNCTION update_conversation_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (NEW.summary, NEW.summary_seq) IS DISTINCT FROM (OLD.summary, OLD.summary_seq)
+       AND to_jsonb(NEW) - 'summary' - 'summary_seq' - 'updated_at'
+           = to_jsonb(OLD) - 'summary' - 'summary_seq' - 'updated_at' THEN
+        NEW.updated_at = OLD.updated_at;
+        RETURN NEW;
+    END IF;
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_conversations_updated_at ON conversations;
+CREATE TRIGGER update_conversations_updated_at
+    BEFORE UPDATE ON conversations
+    FOR EACH ROW
+    EXECUTE FUNCTION update_conversation_updated_at_column();
@@ -0,0 +1,96 @@
+"""Compress existing large message_data rows in place.
+
+New rows are compressed on write once SESSIONS_COMPRESSION_THRESHOLD is set;
+this script applies the same encoding to rows stored before that:
+
+    uv run python -m src.migrations.compress_message_data --dry-run
+    uv run python -m src.migrations.compress_message_data
+
+Rows are processed in id order in pages, so the script can be interrupted
+and re-run. Reads decode both forms, so it is safe to run while the app is
+serving traffic. Disabling compression later needs no migration.
+"""
+
+import argparse
+import asyncio
+
+from supabase import acreate_client
+
+from src.config import get_config
+from src.openai_agents_extensions.message_codec import (
+    encode_message_data,
+    is_compressed,
+)
+from src.openai_agents_extensions.session_utils import PENDING_CLIENT_EXECUTION
+from src.openai_agents_extensions.sessions_config import get_sessions_config
+
+
+async def compress_messages(threshold: int, algorithm: str, dry_run: bool) -> None:
+    session_config = get_sessions_config()
+    client = await acreate_client(
+        session_config.supabase_url, session_config.supabase_key
+    )
+
+    last_id = None
+    scanned = compressed = bytes_before = bytes_after = 0
+    while True:
+        query = client.table("messages").select("id, message_data").order("id")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        result = await query.limit(500).execute()
+        if not result.data:
+            break
+
+        for row in result.data:
+            scanned += 1
+            data = row["message_data"]
+            # Pending tool outputs must stay plain text (patched in place)
+            if is_compressed(data) or PENDING_CLIENT_EXECUTION in data:
+                continue
+
+            encoded = encode_message_data(data, threshold, algorithm)
+            if encoded == data:
+                continue
+
+            compressed += 1
+            bytes_before += len(data)
+            bytes_after += len(encoded)
+            if not dry_run:
+                await (
+                    client.table("messages")
+                    .update({"message_data": encoded})
+                    .eq("id", row["id"])
+                    .execute()
+                )
+
+        last_id = result.data[-1]["id"]
+
+    action = "Would compress" if dry_run else "Compressed"
+    print(
+        f"{action} {compressed} of {scanned} messages: "
+        f"{bytes_before} -> {bytes_after} bytes"
+    )
+
+
+def main() -> None:
+    config = get_config()
+    parser = argparse.ArgumentParser(description="Compress large stored messages")
+    parser.add_argument(
+        "--threshold",
+        type=int,
+        default=config.sessions_compression_threshold or 1024,
+        help="Minimum size in bytes (defaults to SESSIONS_COMPRESSION_THRESHOLD)",
+    )
+    parser.add_argument(
+        "--algorithm",
+        choices=["zlib", "zstd"],
+        default=config.sessions_compression_algorithm,
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(compress_messages(args.threshold, args.algorithm, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
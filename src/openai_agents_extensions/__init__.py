@@ -4,7 +4,12 @@ from .session_factory import (
     get_session_factory_dependency,
     close_session_factory,
     SessionFactory,
+    SupabaseSessionFactory,
+    SqliteSessionFactory,
+    PostgresSessionFactory,
 )
+from .postgres_session import PostgresSession
+from .sqlite_session import SqliteSession
 from .supabase_session import SupabaseSession
 
 __all__ = [
@@ -12,5 +17,10 @@ __all__ = [
     "get_session_factory_dependency",
     "close_session_factory",
     "SessionFactory",
+    "SupabaseSessionFactory",
+    "SqliteSessionFactory",
+    "PostgresSessionFactory",
+    "SqliteSession",
+    "PostgresSession",
     "SupabaseSession",
 ]
@@ -0,0 +1,122 @@
+"""History compaction helpers shared by the session backends.
+
+Once a conversation grows past the configured threshold, older items are
+folded into a summary stored on the conversation row (`summary`), together
+with the seq of the last folded message (`summary_seq`). Sessions created
+with `use_summary=True` then return the summary followed by the messages
+after `summary_seq`. The raw message rows are never deleted.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from agents import TResponseInputItem
+
+from .session_utils import message_content_text
+
+# Rough characters-per-token ratio used to estimate history size
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class CompactionState:
+    """The stored summary of a conversation and the messages it does not cover."""
+
+    summary: Optional[str] = None
+    summary_seq: int = 0
+    # (seq, item) pairs of the messages after summary_seq, in order
+    items: List[Tuple[int, TResponseInputItem]] = field(default_factory=list)
+
+
+def summary_item(summary: str) -> TResponseInputItem:
+    """Wrap a stored summary as the input item placed before the recent tail."""
+    return {
+        "role": "system",
+        "content": f"Summary of the earlier conversation:\n{summary}",
+    }
+
+
+def with_summary(
+    summary: Optional[str], items: List[TResponseInputItem]
+) -> List[TResponseInputItem]:
+    """Prepend the summary item to `items` when there is a summary."""
+    if not summary:
+        return items
+    return [summary_item(summary), *items]
+
+
+def estimate_tokens(items: List[TResponseInputItem]) -> int:
+    """Estimate the number of tokens the items take in a model request."""
+    return sum(len(json.dumps(item)) for item in items) // CHARS_PER_TOKEN
+
+
+def may_need_compaction(
+    unsummarized: int, max_items: int, max_tokens: int, keep_items: int
+) -> bool:
+    """Whether select_compaction_seq could fold anything, from an item count.
+
+    `unsummarized` is an upper bound on the items after summary_seq, which the
+    sessions read from the conversation row without loading the items. Only
+    the token threshold needs the items themselves.
+    """
+    if unsummarized <= max(keep_items, 0):
+        # The last keep_items items are never folded
+        return False
+    if max_tokens > 0:
+        return True
+    return max_items > 0 and unsummarized > max_items
+
+
+def select_compaction_seq(
+    items: List[Tuple[int, TResponseInputItem]],
+    max_items: int,
+    max_tokens: int,
+    keep_items: int,
+) -> Optional[int]:
+    """Pick the seq up to which the items should be folded into the summary.
+
+    Args:
+        items: (seq, item) pairs not yet covered by the summary, in order
+        max_items: Compact once there are more items than this (0 disables)
+        max_tokens: Compact once the items exceed this many estimated tokens
+            (0 disables)
+        keep_items: Number of recent items to keep verbatim
+
+    Returns:
+        The new summary_seq, or None if no compaction is needed.
+    """
+    history = [item for _, item in items]
+    over_items = max_items > 0 and len(history) > max_items
+    over_tokens = max_tokens > 0 and estimate_tokens(history) > max_tokens
+    if not (over_items or over_tokens):
+        return None
+
+    boundary = len(items) - max(keep_items, 0)
+    # Never separate a tool output from the call it answers
+    while 0 < boundary < len(items) and _is_tool_output(items[boundary][1]):
+        boundary -= 1
+
+    if boundary <= 0:
+        return None
+    return items[boundary - 1][0]
+
+
+def _is_tool_output(item: TResponseInputItem) -> bool:
+    return item.get("type") == "function_call_output" or item.get("role") == "tool"
+
+
+def render_items_for_summary(items: List[TResponseInputItem]) -> str:
+    """Render items as a plain-text transcript for the summarizing model."""
+    lines = []
+    for item in items:
+        item_type = item.get("type")
+        if item_type == "function_call":
+            lines.append(f"tool call: {item.get('name')}({item.get('arguments')})")
+        elif item_type == "function_call_output":
+            lines.append(f"tool result: {item.get('output')}")
+        elif "role" in item:
+            text = message_content_text(item.get("content"))
+            if text:
+                lines.append(f"{item['role']}: {text}")
+    return "\n".join(lines)
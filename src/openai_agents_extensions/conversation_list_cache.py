@@ -0,0 +1,145 @@
+"""Process-local TTL cache of conversation list pages."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from src.config import get_config
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, Hashable]
+
+
+class ConversationListCache:
+    """Entry-bounded LRU cache of conversation list results with a short TTL.
+
+    Entries are keyed by user and by the list query (archived filter, cursor,
+    page size, ...). Writes that change a user's conversations, or their
+    order, drop all of that user's entries; the TTL bounds how stale a page
+    can get through writes made by other processes. Cached results are
+    shared with callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Upper bound on the number of cached pages
+            ttl_seconds: How long a cached page may be served
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._user_keys: Dict[str, Set[CacheKey]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.evictions = 0
+        # Bumped by every invalidation, so a page read while a write was in
+        # flight is not stored after the write dropped the user's entries
+        self.generation = 0
+
+    def get(self, user_id: str, query: Hashable) -> Optional[Any]:
+        """Return the cached result of a list query if it has not expired."""
+        key = (user_id, query)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, user_id: str, query: Hashable, result: Any, generation: int) -> None:
+        """Store the result of a list query.
+
+        `generation` is the value of ``self.generation`` from before the
+        query ran; the result is dropped if anything was invalidated since.
+        """
+        if generation != self.generation:
+            return
+
+        key = (user_id, query)
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._user_keys.setdefault(user_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Forget every cached list page of a user."""
+        self.generation += 1
+        keys = self._user_keys.pop(user_id, None)
+        if not keys:
+            return
+        for key in keys:
+            self._entries.pop(key, None)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return counters for tuning the cache size and TTL."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _remove(self, key: CacheKey) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        user_keys = self._user_keys.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._user_keys[key[0]]
+
+
+# Global conversation list cache instance
+_conversation_list_cache: Optional[ConversationListCache] = None
+
+
+def get_conversation_list_cache() -> Optional[ConversationListCache]:
+    """Get the global conversation list cache, or None when it is disabled."""
+    global _conversation_list_cache
+
+    if _conversation_list_cache is None:
+        config = get_config()
+        if config.chat_list_cache_ttl_seconds <= 0:
+            return None
+        _conversation_list_cache = ConversationListCache(
+            config.chat_list_cache_max_entries, config.chat_list_cache_ttl_seconds
+        )
+        logger.info(
+            f"Conversation list cache enabled "
+            f"({config.chat_list_cache_ttl_seconds}s TTL)"
+        )
+
+    return _conversation_list_cache
+
+
+def invalidate_conversation_lists(user_id: str) -> None:
+    """Drop a user's cached conversation lists after a write (no-op if disabled)."""
+    cache = get_conversation_list_cache()
+    if cache is not None:
+        cache.invalidate_user(user_id)
@@ -0,0 +1,210 @@
+"""Process-local LRU cache of session histories."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from agents import TResponseInputItem
+
+from src.config import get_config
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+@dataclass
+class _CacheEntry:
+    """Cached history of one conversation."""
+
+    version: str
+    items: List[TResponseInputItem]
+    sizes: List[int]
+    size: int
+
+
+class HistoryCache:
+    """Byte-bounded LRU cache of parsed session histories.
+
+    Entries are keyed by (user_id, session_id) and stamped with the version of
+    the conversation they were read at (its ``updated_at``). A lookup only hits
+    when the caller's current version matches the stamp, so an entry that was
+    changed elsewhere is never served. Cached items are shared with callers
+    and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the serialized size of all cached items
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(
+        self, user_id: str, session_id: str, version: Optional[str]
+    ) -> Optional[List[TResponseInputItem]]:
+        """Return the cached history if it is still at `version`."""
+        key = (user_id, session_id)
+        entry = self._entries.get(key)
+        if entry is None or version is None or entry.version != version:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return list(entry.items)
+
+    def put(
+        self,
+        user_id: str,
+        session_id: str,
+        version: Optional[str],
+        items: List[TResponseInputItem],
+        sizes: List[int],
+    ) -> None:
+        """Store a full history read at `version`.
+
+        Args:
+            user_id: Owner of the conversation
+            session_id: Conversation identifier
+            version: Conversation version the items were read at
+            items: Parsed history items in chronological order
+            sizes: Serialized size of each item in bytes
+        """
+        key = (user_id, session_id)
+        self._remove(key)
+        if version is None:
+            return
+
+        entry = _CacheEntry(
+            version=version, items=list(items), sizes=list(sizes), size=sum(sizes)
+        )
+        if entry.size > self.max_bytes:
+            return
+
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def append(
+        self,
+        user_id: str,
+        session_id: str,
+        expected_version: Optional[str],
+        new_version: Optional[str],
+        items: List[TResponseInputItem],
+        sizes: List[int],
+    ) -> None:
+        """Append items written by this process to a cached history."""
+        entry = self._current_entry(user_id, session_id, expected_version, new_version)
+        if entry is None:
+            return
+
+        entry.items.extend(items)
+        entry.sizes.extend(sizes)
+        entry.size += sum(sizes)
+        entry.version = new_version
+        self._bytes += sum(sizes)
+        self._entries.move_to_end((user_id, session_id))
+        self._evict()
+
+    def pop(
+        self,
+        user_id: str,
+        session_id: str,
+        expected_version: Optional[str],
+        new_version: Optional[str],
+        count: int = 1,
+    ) -> None:
+        """Drop the newest `count` items of a cached history after they were deleted."""
+        entry = self._current_entry(user_id, session_id, expected_version, new_version)
+        if entry is None:
+            return
+        if len(entry.items) < count:
+            self._remove((user_id, session_id))
+            return
+
+        for _ in range(count):
+            entry.items.pop()
+            size = entry.sizes.pop()
+            entry.size -= size
+            self._bytes -= size
+        entry.version = new_version
+
+    def reset(self, user_id: str, session_id: str, new_version: Optional[str]) -> None:
+        """Record that a history was cleared."""
+        self.put(user_id, session_id, new_version, [], [])
+
+    def invalidate(self, user_id: str, session_id: str) -> None:
+        """Forget the cached history of a conversation."""
+        self._remove((user_id, session_id))
+
+    def stats(self) -> Dict[str, float]:
+        """Return counters for tuning the cache size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _current_entry(
+        self,
+        user_id: str,
+        session_id: str,
+        expected_version: Optional[str],
+        new_version: Optional[str],
+    ) -> Optional[_CacheEntry]:
+        """Return the entry if it is at `expected_version`, else drop it."""
+        key = (user_id, session_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if (
+            expected_version is None
+            or new_version is None
+            or entry.version != expected_version
+        ):
+            self._remove(key)
+            return None
+        return entry
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+
+# Global history cache instance
+_history_cache: Optional[HistoryCache] = None
+
+
+def get_history_cache() -> Optional[HistoryCache]:
+    """Get the global history cache, or None when it is disabled."""
+    global _history_cache
+
+    if _history_cache is None:
+        max_bytes = get_config().sessions_history_cache_bytes
+        if max_bytes <= 0:
+            return None
+        _history_cache = HistoryCache(max_bytes)
+        logger.info(f"Session history cache enabled ({max_bytes} bytes)")
+
+    return _history_cache
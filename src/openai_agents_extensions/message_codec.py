@@ -0,0 +1,76 @@
+"""Transparent compression of large message_data payloads.
+
+Compressed values are stored as a marker prefix followed by the base64 of the
+compressed JSON text, e.g. ``~zlib:eJzLSM3JyVcozy/KSQEAGgQEXQ==``. Serialized
+items are JSON and can never start with ``~``, so plain and compressed rows
+can live side by side and are told apart on read.
+"""
+
+import base64
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency: pip install "actors[zstd]"
+    zstandard = None
+
+ZLIB_MARKER = "~zlib:"
+ZSTD_MARKER = "~zstd:"
+
+# Errors raised by base64/zlib/zstd for corrupted values (binascii.Error and
+# UnicodeDecodeError are ValueErrors)
+_DECODE_ERRORS = (zlib.error, ValueError) + (
+    (zstandard.ZstdError,) if zstandard is not None else ()
+)
+
+
+def is_compressed(stored: str) -> bool:
+    """Check whether a stored message_data value is compressed."""
+    return stored.startswith((ZLIB_MARKER, ZSTD_MARKER))
+
+
+def encode_message_data(data: str, threshold: int, algorithm: str = "zlib") -> str:
+    """Compress `data` if it is at least `threshold` bytes (0 disables).
+
+    The plain text is kept when compression does not make it smaller.
+    """
+    raw = data.encode()
+    if threshold <= 0 or len(raw) < threshold:
+        return data
+
+    if algorithm == "zstd":
+        if zstandard is None:
+            raise RuntimeError(
+                "zstd message compression requires zstandard "
+                '(install with: pip install "actors[zstd]")'
+            )
+        marker, compressed = ZSTD_MARKER, zstandard.ZstdCompressor().compress(raw)
+    else:
+        marker, compressed = ZLIB_MARKER, zlib.compress(raw)
+
+    encoded = marker + base64.b64encode(compressed).decode("ascii")
+    return encoded if len(encoded) < len(raw) else data
+
+
+def decode_message_data(stored: str) -> str:
+    """Return the JSON text of a stored message_data value.
+
+    Raises ValueError if a compressed value is corrupted.
+    """
+    try:
+        if stored.startswith(ZLIB_MARKER):
+            compressed = base64.b64decode(stored[len(ZLIB_MARKER) :])
+            return zlib.decompress(compressed).decode()
+
+        if stored.startswith(ZSTD_MARKER):
+            if zstandard is None:
+                raise RuntimeError(
+                    "Reading zstd-compressed messages requires zstandard "
+                    '(install with: pip install "actors[zstd]")'
+                )
+            compressed = base64.b64decode(stored[len(ZSTD_MARKER) :])
+            return zstandard.ZstdDecompressor().decompress(compressed).decode()
+    except _DECODE_ERRORS as e:
+        raise ValueError(f"Corrupted compressed message_data: {e}") from e
+
+    return stored
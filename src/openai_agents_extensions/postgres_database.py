@@ -0,0 +1,57 @@
+"""Pooled direct Postgres connections for the asyncpg session backend."""
+
+from typing import Dict, Optional
+
+try:
+    import asyncpg
+except ImportError:  # Optional dependency: pip install "actors[postgres]"
+    asyncpg = None
+
+from src.config import get_config
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Open pools, one per DSN
+_pools: Dict[str, "asyncpg.Pool"] = {}
+
+
+async def get_postgres_pool(dsn: Optional[str] = None) -> "asyncpg.Pool":
+    """Get the shared connection pool for `dsn` (defaults to the configured DSN).
+
+    asyncpg prepares and caches every statement per connection, so repeated
+    session queries skip parsing and planning after their first use.
+    """
+    if asyncpg is None:
+        raise RuntimeError(
+            "The postgres sessions backend requires asyncpg "
+            '(install with: pip install "actors[postgres]")'
+        )
+
+    config = get_config()
+    dsn = dsn or config.sessions_postgres_dsn
+    if not dsn:
+        raise ValueError("SESSIONS_POSTGRES_DSN environment variable is required")
+
+    if dsn not in _pools:
+        _pools[dsn] = await asyncpg.create_pool(
+            dsn,
+            min_size=config.sessions_postgres_pool_min_size,
+            max_size=config.sessions_postgres_pool_max_size,
+        )
+        logger.info(
+            f"Postgres session pool created "
+            f"(max {config.sessions_postgres_pool_max_size} connections)"
+        )
+
+    return _pools[dsn]
+
+
+async def close_postgres_pools() -> None:
+    """Close all Postgres pools (for cleanup during app shutdown)."""
+    for pool in _pools.values():
+        try:
+            await pool.close()
+        except Exception as e:
+            logger.warning(f"Error closing Postgres pool: {e}")
+    _pools.clear()
@@ -0,0 +1,306 @@
+import json
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from agents import TResponseInputItem
+from agents.memory.session import SessionABC, Session
+
+from src.logging_config import get_logger
+from src.services.pagination import decode_seq_cursor
+from .compaction import CompactionState, with_summary
+from .conversation_list_cache import invalidate_conversation_lists
+from .session_utils import (
+    compress_message_data,
+    filter_empty_user_messages,
+    item_projection,
+    load_message_data,
+)
+
+if TYPE_CHECKING:
+    import asyncpg
+
+logger = get_logger(__name__)
+
+
+class PostgresSession(SessionABC, Session):
+    """Direct Postgres session implementation following the Session protocol.
+
+    Talks to the Supabase database over a pooled asyncpg connection instead of
+    PostgREST, and writes through the combined session functions from
+    schema.sql, so every operation is a single prepared statement. Creating a
+    session does no I/O; the conversation row is created on the first write.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: str,
+        pool: "asyncpg.Pool",
+        use_summary: bool = False,
+    ):
+        """Initialize the Postgres session.
+
+        Args:
+            session_id: Unique identifier for the conversation session
+            user_id: User identifier owning the conversation
+            pool: Shared asyncpg connection pool
+            use_summary: Return the stored history summary followed by the
+                messages it does not cover. Defaults to False
+        """
+        self.session_id = session_id
+        self.user_id = user_id
+        self.pool = pool
+        self.use_summary = use_summary
+
+    @staticmethod
+    def _parse_rows(rows: List["asyncpg.Record"]) -> List[TResponseInputItem]:
+        """Parse stored JSON rows back to TResponseInputItem format."""
+        items = []
+        for row in rows:
+            try:
+                items.append(load_message_data(row["message_data"]))
+            except (ValueError, TypeError):
+                # Skip invalid JSON entries
+                continue
+        return items
+
+    async def get_title(self) -> str:
+        """Return the conversation title."""
+        title = await self.pool.fetchval(
+            "SELECT title FROM conversations WHERE session_id = $1 AND user_id = $2",
+            self.session_id,
+            self.user_id,
+        )
+        return title or "New Chat"
+
+    async def _fetch_summary(self, connection) -> Tuple[Optional[str], int]:
+        row = await connection.fetchrow(
+            "SELECT summary, summary_seq FROM conversations "
+            "WHERE session_id = $1 AND user_id = $2",
+            self.session_id,
+            self.user_id,
+        )
+        if row is None:
+            return None, 0
+        return row["summary"], row["summary_seq"]
+
+    async def get_items(self, limit: int | None = None) -> List[TResponseInputItem]:
+        """Retrieve conversation history for this session."""
+        try:
+            async with self.pool.acquire() as connection:
+                summary, summary_seq = (
+                    await self._fetch_summary(connection)
+                    if self.use_summary
+                    else (None, 0)
+                )
+                if limit is None:
+                    rows = await connection.fetch(
+                        "SELECT message_data FROM messages "
+                        "WHERE session_id = $1 AND user_id = $2 AND seq > $3 "
+                        "ORDER BY seq ASC",
+                        self.session_id,
+                        self.user_id,
+                        summary_seq,
+                    )
+                else:
+                    # Fetch the latest N items in reverse order, then reverse
+                    rows = await connection.fetch(
+                        "SELECT message_data FROM messages "
+                        "WHERE session_id = $1 AND user_id = $2 AND seq > $3 "
+                        "ORDER BY seq DESC LIMIT $4",
+                        self.session_id,
+                        self.user_id,
+                        summary_seq,
+                        limit,
+                    )
+                    rows = list(reversed(rows))
+
+            items = self._parse_rows(rows)
+            if limit is None or len(items) < limit:
+                items = with_summary(summary, items)
+            return items
+        except Exception as e:
+            logger.error(f"Error getting items: {e}", exc_info=True)
+            return []
+
+    async def get_items_since(
+        self, cursor: Optional[str] = None, limit: int | None = None
+    ) -> Tuple[List[TResponseInputItem], Optional[str]]:
+        """Retrieve only the items stored after `cursor`.
+
+        See SupabaseSession.get_items_since; the cursor is the last seen seq.
+        """
+        after_seq = decode_seq_cursor(cursor)
+        try:
+            rows = await self.pool.fetch(
+                "SELECT seq, message_data FROM messages "
+                "WHERE session_id = $1 AND user_id = $2 AND seq > $3 "
+                "ORDER BY seq ASC LIMIT $4",
+                self.session_id,
+                self.user_id,
+                after_seq,
+                limit,  # LIMIT NULL means no limit
+            )
+            if rows:
+                cursor = str(rows[-1]["seq"])
+            return self._parse_rows(rows), cursor
+        except Exception as e:
+            logger.error(f"Error getting items since cursor: {e}", exc_info=True)
+            return [], cursor
+
+    async def add_items(self, items: List[TResponseInputItem]) -> None:
+        """Store new items for this session."""
+        if not items:
+            return
+
+        # Filter out empty user messages
+        filtered_items = filter_empty_user_messages(items, self.session_id)
+
+        try:
+            if not filtered_items:
+                await self.pool.execute(
+                    "UPDATE conversations SET updated_at = NOW() "
+                    "WHERE session_id = $1 AND user_id = $2",
+                    self.session_id,
+                    self.user_id,
+                )
+                invalidate_conversation_lists(self.user_id)
+                return
+
+            # Items are stored as JSON strings, passed as a JSONB array of strings
+            serialized_items = [
+                compress_message_data(json.dumps(item)) for item in filtered_items
+            ]
+            projections = [item_projection(item) for item in filtered_items]
+            await self.pool.execute(
+                "SELECT add_session_items($1, $2, $3::jsonb, $4::jsonb)",
+                self.session_id,
+                self.user_id,
+                json.dumps(serialized_items),
+                json.dumps(projections),
+            )
+            invalidate_conversation_lists(self.user_id)
+        except Exception as e:
+            logger.error(f"Error adding items: {e}", exc_info=True)
+
+    async def pop_item(self) -> dict | None:
+        """Remove and return the most recent item from this session."""
+        items = await self.pop_items(1)
+        return items[0] if items else None
+
+    async def pop_items(self, count: int) -> List[TResponseInputItem]:
+        """Remove and return the `count` most recent items, newest first.
+
+        See SupabaseSession.pop_items.
+        """
+        if count <= 0:
+            return []
+
+        try:
+            popped = await self.pool.fetchval(
+                "SELECT pop_session_items($1, $2, $3)",
+                self.session_id,
+                self.user_id,
+                count,
+            )
+            if popped is None:
+                return []
+            invalidate_conversation_lists(self.user_id)
+
+            items = []
+            for message_data in json.loads(popped)["message_data"]:
+                try:
+                    items.append(load_message_data(message_data))
+                except (ValueError, TypeError):
+                    # Skip corrupted JSON entries
+                    continue
+            return items
+        except Exception as e:
+            logger.error(f"Error popping items: {e}", exc_info=True)
+            return []
+
+    async def clear_session(self) -> None:
+        """Clear all items for this session."""
+        try:
+            await self.pool.execute(
+                "SELECT clear_session_items($1, $2)", self.session_id, self.user_id
+            )
+            invalidate_conversation_lists(self.user_id)
+        except Exception as e:
+            logger.error(f"Error clearing session: {e}", exc_info=True)
+
+    async def update_tool_results(self, results: Dict[str, str]) -> int:
+        """Replace pending client tool outputs in place.
+
+        See SupabaseSession.update_tool_results.
+        """
+        if not results:
+            return 0
+
+        try:
+            response = await self.pool.fetchval(
+                "SELECT patch_tool_results($1, $2, $3::jsonb)",
+                self.session_id,
+                self.user_id,
+                json.dumps(results),
+            )
+            patched = json.loads(response)["patched"]
+            if patched:
+                invalidate_conversation_lists(self.user_id)
+            return patched
+        except Exception as e:
+            logger.error(f"Error updating tool results: {e}", exc_info=True)
+            return 0
+
+    async def get_unsummarized_count(self) -> int:
+        """Upper bound on the number of items not covered by the summary.
+
+        See SupabaseSession.get_unsummarized_count.
+        """
+        count = await self.pool.fetchval(
+            "SELECT last_seq - summary_seq FROM conversations "
+            "WHERE session_id = $1 AND user_id = $2",
+            self.session_id,
+            self.user_id,
+        )
+        return count or 0
+
+    async def get_compaction_state(self) -> CompactionState:
+        """Return the stored summary and the raw items it does not cover yet."""
+        async with self.pool.acquire() as connection:
+            summary, summary_seq = await self._fetch_summary(connection)
+            rows = await connection.fetch(
+                "SELECT seq, message_data FROM messages "
+                "WHERE session_id = $1 AND user_id = $2 AND seq > $3 "
+                "ORDER BY seq ASC",
+                self.session_id,
+                self.user_id,
+                summary_seq,
+            )
+
+        items = []
+        for row in rows:
+            try:
+                items.append((row["seq"], load_message_data(row["message_data"])))
+            except (ValueError, TypeError):
+                # Skip invalid JSON entries
+                continue
+        return CompactionState(summary=summary, summary_seq=summary_seq, items=items)
+
+    async def store_summary(
+        self, summary: Optional[str], summary_seq: int, expected_summary_seq: int
+    ) -> bool:
+        """Store a new history summary covering messages up to `summary_seq`.
+
+        See SupabaseSession.store_summary.
+        """
+        stored = await self.pool.fetchval(
+            "UPDATE conversations SET summary = $3, summary_seq = $4 "
+            "WHERE session_id = $1 AND user_id = $2 AND summary_seq = $5 "
+            "RETURNING 1",
+            self.session_id,
+            self.user_id,
+            summary,
+            summary_seq,
+            expected_summary_seq,
+        )
+        return stored is not None
@@ -1,27 +1,63 @@
-"""Session factory dependency for creating Supabase sessions."""
+"""Session factory dependency for creating agent sessions."""
 
+from abc import ABC, abstractmethod
 from typing import Optional
 
+from agents.memory.session import Session
+
+from src.config import get_config
 from src.logging_config import get_logger
+from .postgres_database import close_postgres_pools, get_postgres_pool
+from .postgres_session import PostgresSession
 from .sessions_config import get_sessions_config
+from .sqlite_database import SqliteDatabase, close_sqlite_databases, get_sqlite_database
+from .sqlite_session import SqliteSession
 from .supabase_session import SupabaseSession
 
 logger = get_logger(__name__)
 
 
-class SessionFactory:
+class SessionFactory(ABC):
+    """Factory for creating sessions of the configured storage backend."""
+
+    @abstractmethod
+    async def create_session(self, session_id: str, user_id: str) -> Session:
+        """Create a session for a conversation.
+
+        Args:
+            session_id: Unique identifier for the conversation session
+            user_id: User identifier owning the conversation
+        """
+        pass
+
+
+class SupabaseSessionFactory(SessionFactory):
     """Factory for creating Supabase sessions with pre-configured settings."""
 
-    def __init__(self, supabase_url: str, supabase_key: str):
+    def __init__(
+        self,
+        supabase_url: str,
+        supabase_key: str,
+        use_rpc: bool = True,
+        lazy_create: bool = False,
+        use_summary: bool = False,
+    ):
         """Initialize the session factory with Supabase configuration.
 
         Args:
             supabase_url: Supabase project URL
             supabase_key: Supabase API key
+            use_rpc: Use the combined write functions from schema.sql
+            lazy_create: Create conversation rows on first write instead of
+                when the session is created
+            use_summary: Return compacted history (summary + recent items)
         """
         self.supabase_url = supabase_url
         self.supabase_key = supabase_key
-        logger.debug("SessionFactory initialized")
+        self.use_rpc = use_rpc
+        self.lazy_create = lazy_create
+        self.use_summary = use_summary
+        logger.debug("SupabaseSessionFactory initialized")
 
     async def create_session(self, session_id: str, user_id: str) -> SupabaseSession:
         """Create a new Supabase session.
@@ -38,6 +74,53 @@ class SessionFactory:
             supabase_url=self.supabase_url,
             supabase_key=self.supabase_key,
             user_id=user_id,
+            use_rpc=self.use_rpc,
+            lazy_create=self.lazy_create,
+            use_summary=self.use_summary,
+        )
+
+
+class SqliteSessionFactory(SessionFactory):
+    """Factory for creating sessions stored in a local SQLite database."""
+
+    def __init__(self, database: SqliteDatabase, use_summary: bool = False):
+        """Initialize the session factory with a shared SQLite database."""
+        self.database = database
+        self.use_summary = use_summary
+        logger.debug("SqliteSessionFactory initialized")
+
+    async def create_session(self, session_id: str, user_id: str) -> SqliteSession:
+        """Create a new SQLite session (no I/O until first use)."""
+        return SqliteSession(
+            session_id=session_id,
+            user_id=user_id,
+            database=self.database,
+            use_summary=self.use_summary,
+        )
+
+
+class PostgresSessionFactory(SessionFactory):
+    """Factory for creating sessions over a direct Postgres connection pool."""
+
+    def __init__(self, dsn: Optional[str] = None, use_summary: bool = False):
+        """Initialize the session factory.
+
+        Args:
+            dsn: Postgres connection string (defaults to SESSIONS_POSTGRES_DSN)
+            use_summary: Return compacted history (summary + recent items)
+        """
+        self.dsn = dsn
+        self.use_summary = use_summary
+        logger.debug("PostgresSessionFactory initialized")
+
+    async def create_session(self, session_id: str, user_id: str) -> PostgresSession:
+        """Create a new Postgres session (no queries until first use)."""
+        pool = await get_postgres_pool(self.dsn)
+        return PostgresSession(
+            session_id=session_id,
+            user_id=user_id,
+            pool=pool,
+            use_summary=self.use_summary,
         )
 
 
@@ -50,12 +133,26 @@ def get_session_factory() -> SessionFactory:
     global _session_factory
 
     if _session_factory is None:
-        config = get_sessions_config()
-        _session_factory = SessionFactory(
-            supabase_url=config.supabase_url,
-            supabase_key=config.supabase_key,
+        app_config = get_config()
+        use_summary = app_config.sessions_compaction_enabled
+        if app_config.sessions_backend == "sqlite":
+            _session_factory = SqliteSessionFactory(
+                get_sqlite_database(), use_summary=use_summary
+            )
+        elif app_config.sessions_backend == "postgres":
+            _session_factory = PostgresSessionFactory(use_summary=use_summary)
+        else:
+            config = get_sessions_config()
+            _session_factory = SupabaseSessionFactory(
+                supabase_url=config.supabase_url,
+                supabase_key=config.supabase_key,
+                use_rpc=app_config.sessions_use_rpc,
+                lazy_create=app_config.sessions_lazy_create,
+                use_summary=use_summary,
+            )
+        logger.info(
+            f"Global session factory created ({app_config.sessions_backend} backend)"
         )
-        logger.info("Global session factory created")
 
     return _session_factory
 
@@ -70,7 +167,9 @@ async def close_session_factory():
     global _session_factory
 
     if _session_factory is not None:
-        # Close the connection pool used by SupabaseSession
-        await SupabaseSession.close_connection_pool()
+        # Close the connection pools used by the session backends (shared
+        # Supabase clients are closed by close_supabase_clients)
+        close_sqlite_databases()
+        await close_postgres_pools()
         _session_factory = None
         logger.info("Session factory closed")
@@ -0,0 +1,152 @@
+"""Helpers shared by the session backends."""
+
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from agents import TResponseInputItem
+
+from src.config import get_config
+from src.logging_config import get_logger
+from .message_codec import decode_message_data, encode_message_data
+
+logger = get_logger(__name__)
+
+# Marker in the placeholder output stored for a client tool call until the
+# client posts the actual result (see src/core/client_tools.py)
+PENDING_CLIENT_EXECUTION = "PENDING_CLIENT_EXECUTION"
+
+# Roles whose message text is indexed for search (see search_messages)
+SEARCHABLE_ROLES = ("user", "assistant")
+
+
+def get_current_time() -> str:
+    """Get current UTC time in ISO format"""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def is_empty_user_message(item: TResponseInputItem) -> bool:
+    """Check if an item is an empty user message that should be filtered out."""
+    if not isinstance(item, dict):
+        return False
+
+    # Only filter user messages
+    if item.get("role") != "user":
+        return False
+
+    # Check if content is empty or whitespace-only
+    content = item.get("content", "")
+    if isinstance(content, str):
+        return not content.strip()
+    elif isinstance(content, list):
+        # For list content, check if all text items are empty
+        text_content = ""
+        for content_item in content:
+            if isinstance(content_item, dict) and content_item.get("type") == "text":
+                text_content += content_item.get("text", "")
+        return not text_content.strip()
+
+    return False
+
+
+def filter_empty_user_messages(
+    items: List[TResponseInputItem], session_id: str
+) -> List[TResponseInputItem]:
+    """Drop empty user messages from a batch of items about to be stored."""
+    filtered_items = []
+    filtered_count = 0
+
+    for item in items:
+        if is_empty_user_message(item):
+            filtered_count += 1
+            logger.debug(f"Filtered out empty user message for session {session_id}")
+        else:
+            filtered_items.append(item)
+
+    if filtered_count > 0:
+        logger.info(
+            f"Filtered out {filtered_count} empty user message(s) from session {session_id}"
+        )
+
+    return filtered_items
+
+
+def patch_pending_tool_result(
+    item: TResponseInputItem, results: Dict[str, str]
+) -> Optional[TResponseInputItem]:
+    """Return `item` with its pending client tool output replaced, if it has one.
+
+    Handles both tool output shapes: Responses API `function_call_output`
+    items (`call_id`/`output`) and chat completion `tool` messages
+    (`tool_call_id`/`content`). Returns None when the item is not a pending
+    tool output for any of the call ids in `results`.
+    """
+    if not isinstance(item, dict):
+        return None
+
+    if item.get("type") == "function_call_output":
+        call_id, field = item.get("call_id"), "output"
+    elif item.get("role") == "tool":
+        call_id, field = item.get("tool_call_id"), "content"
+    else:
+        return None
+
+    output = item.get(field)
+    if (
+        call_id not in results
+        or not isinstance(output, str)
+        or PENDING_CLIENT_EXECUTION not in output
+    ):
+        return None
+
+    return {**item, field: results[call_id]}
+
+
+def compress_message_data(data: str) -> str:
+    """Prepare serialized item JSON for storage, compressing it if it is large.
+
+    Pending client tool outputs stay plain text so the database can patch them
+    in place (see patch_tool_results in schema.sql). The function cannot
+    compress, so every backend also writes patched outputs back plain.
+    """
+    if PENDING_CLIENT_EXECUTION in data:
+        return data
+    config = get_config()
+    return encode_message_data(
+        data,
+        config.sessions_compression_threshold,
+        config.sessions_compression_algorithm,
+    )
+
+
+def load_message_data(stored: str) -> TResponseInputItem:
+    """Parse a stored message_data value, compressed or not, into an item."""
+    return json.loads(decode_message_data(stored))
+
+
+def message_content_text(content) -> str:
+    """Plain text of a message's `content`, a string or a list of parts."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "")
+            for part in content
+            if isinstance(part, dict) and isinstance(part.get("text"), str)
+        )
+    return ""
+
+
+def item_projection(item: TResponseInputItem) -> Dict[str, Optional[str]]:
+    """Fields stored next to message_data so readers need not parse it.
+
+    `item_type` is the item's `type`, or "message" for easy input messages
+    that only carry a role. `content_text` is the searchable text of user
+    and assistant messages (None for other items).
+    """
+    role = item.get("role")
+    item_type = item.get("type") or ("message" if role else None)
+    content_text = None
+    if item_type == "message" and role in SEARCHABLE_ROLES:
+        content_text = message_content_text(item.get("content")) or None
+    return {"role": role, "item_type": item_type, "content_text": content_text}
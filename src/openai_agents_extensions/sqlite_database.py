@@ -0,0 +1,211 @@
+"""Shared SQLite database used by the local session backend and chat service."""
+
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, TypeVar
+
+from src.config import get_config
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Same table shape as src/schema.sql, in SQLite types
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    session_id TEXT UNIQUE NOT NULL,
+    title TEXT DEFAULT 'New Conversation',
+    user_id TEXT NOT NULL,
+    is_archived INTEGER NOT NULL DEFAULT 0,
+    is_starred INTEGER NOT NULL DEFAULT 0,
+    last_seq INTEGER NOT NULL DEFAULT 0,
+    summary TEXT,
+    summary_seq INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL
+        REFERENCES conversations(session_id) ON DELETE CASCADE,
+    message_data TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT,
+    item_type TEXT,
+    content_text TEXT,
+    created_at TEXT NOT NULL,
+    UNIQUE (session_id, seq)
+);
+
+CREATE INDEX IF NOT EXISTS idx_messages_session_user_seq
+    ON messages(session_id, user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_conversations_user_archived_updated_id
+    ON conversations(user_id, is_archived, updated_at DESC, id DESC);
+DROP INDEX IF EXISTS idx_conversations_user_archived_updated;
+"""
+
+# Columns added after the first release, as (table, column, definition), so
+# database files created by older versions can be upgraded in place
+SQLITE_ADDED_COLUMNS = [
+    ("conversations", "summary", "TEXT"),
+    ("conversations", "summary_seq", "INTEGER NOT NULL DEFAULT 0"),
+    ("messages", "role", "TEXT"),
+    ("messages", "item_type", "TEXT"),
+    ("messages", "content_text", "TEXT"),
+]
+
+# Full-text index over messages.content_text, kept in step by triggers (the
+# SQLite counterpart of the content_tsv GIN index in src/schema.sql)
+SQLITE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content_text, content='messages', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages
+WHEN new.content_text IS NOT NULL BEGIN
+    INSERT INTO messages_fts(rowid, content_text)
+    VALUES (new.rowid, new.content_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages
+WHEN old.content_text IS NOT NULL BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content_text)
+    VALUES ('delete', old.rowid, old.content_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_update
+AFTER UPDATE OF content_text ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content_text)
+    SELECT 'delete', old.rowid, old.content_text
+    WHERE old.content_text IS NOT NULL;
+    INSERT INTO messages_fts(rowid, content_text)
+    SELECT new.rowid, new.content_text
+    WHERE new.content_text IS NOT NULL;
+END;
+"""
+
+
+class SqliteDatabase:
+    """A single SQLite connection in WAL mode, driven from worker threads.
+
+    Statements run through `asyncio.to_thread` so the event loop never blocks
+    on disk I/O. Access is serialized with a lock; SQLite allows one writer at
+    a time anyway, and the connection's statement cache keeps prepared
+    statements across calls.
+    """
+
+    def __init__(self, path: str):
+        """Open (and if needed create) the database at `path`."""
+        self.path = path
+        self._lock = threading.Lock()
+        # False when this SQLite build has no FTS5 (message search disabled)
+        self.has_fts = False
+        self._connection = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,  # Transactions are managed explicitly
+            cached_statements=256,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.execute("PRAGMA busy_timeout=5000")
+        connection.executescript(SQLITE_SCHEMA)
+        self._add_missing_columns(connection)
+        self._create_fts_index(connection)
+        logger.debug(f"SQLite session database opened at {self.path}")
+        return connection
+
+    @staticmethod
+    def _add_missing_columns(connection: sqlite3.Connection) -> None:
+        for table, column, definition in SQLITE_ADDED_COLUMNS:
+            columns = {
+                row["name"] for row in connection.execute(f"PRAGMA table_info({table})")
+            }
+            if column not in columns:
+                connection.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+                )
+
+    def _create_fts_index(self, connection: sqlite3.Connection) -> None:
+        exists = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+        ).fetchone()
+        try:
+            connection.executescript(SQLITE_FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, message search disabled: {e}")
+            return
+        if not exists:
+            # Index the messages stored before the index existed
+            connection.execute(
+                "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')"
+            )
+        self.has_fts = True
+
+    def _run_locked(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        with self._lock:
+            return fn(self._connection)
+
+    def _transaction_locked(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._connection)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            return result
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `fn(connection)` on a worker thread (autocommit)."""
+        return await asyncio.to_thread(self._run_locked, fn)
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `fn(connection)` on a worker thread inside one write transaction."""
+        return await asyncio.to_thread(self._transaction_locked, fn)
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._connection.close()
+
+
+# Open databases, one per path
+_databases: Dict[str, SqliteDatabase] = {}
+
+
+def get_sqlite_database(path: Optional[str] = None) -> SqliteDatabase:
+    """Get the shared database for `path` (defaults to the configured path)."""
+    if path is None:
+        path = get_config().sessions_sqlite_path
+
+    if path not in _databases:
+        _databases[path] = SqliteDatabase(path)
+        logger.info(f"SQLite session backend using {path}")
+
+    return _databases[path]
+
+
+def close_sqlite_databases() -> None:
+    """Close all open SQLite databases (for cleanup during app shutdown)."""
+    for path, database in _databases.items():
+        try:
+            database.close()
+        except Exception as e:
+            logger.warning(f"Error closing SQLite database {path}: {e}")
+    _databases.clear()
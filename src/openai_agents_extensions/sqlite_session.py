@@ -0,0 +1,392 @@
+import json
+import sqlite3
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from agents import TResponseInputItem
+from agents.memory.session import SessionABC, Session
+
+from src.logging_config import get_logger
+from src.services.pagination import decode_seq_cursor
+from .session_utils import (
+    PENDING_CLIENT_EXECUTION,
+    compress_message_data,
+    filter_empty_user_messages,
+    get_current_time,
+    item_projection,
+    load_message_data,
+    patch_pending_tool_result,
+)
+from .compaction import CompactionState, with_summary
+from .conversation_list_cache import invalidate_conversation_lists
+from .sqlite_database import SqliteDatabase
+
+logger = get_logger(__name__)
+
+
+class SqliteSession(SessionABC, Session):
+    """Local SQLite session implementation following the Session protocol.
+
+    Uses the same conversations/messages layout as the Supabase schema, so
+    ChatService can read what the agents write. Creating a session does no
+    I/O; the conversation row is created on the first write.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: str,
+        database: SqliteDatabase,
+        use_summary: bool = False,
+    ):
+        """Initialize the SQLite session.
+
+        Args:
+            session_id: Unique identifier for the conversation session
+            user_id: User identifier owning the conversation
+            database: Shared SQLite database
+            use_summary: Return the stored history summary followed by the
+                messages it does not cover. Defaults to False
+        """
+        self.session_id = session_id
+        self.user_id = user_id
+        self.database = database
+        self.use_summary = use_summary
+
+    @staticmethod
+    def _parse_rows(rows: List[sqlite3.Row]) -> List[TResponseInputItem]:
+        """Parse stored JSON rows back to TResponseInputItem format."""
+        items = []
+        for row in rows:
+            try:
+                items.append(load_message_data(row["message_data"]))
+            except (ValueError, TypeError):
+                # Skip invalid JSON entries
+                continue
+        return items
+
+    def _touch(self, connection: sqlite3.Connection, now: str) -> None:
+        connection.execute(
+            "UPDATE conversations SET updated_at = ? "
+            "WHERE session_id = ? AND user_id = ?",
+            (now, self.session_id, self.user_id),
+        )
+
+    async def get_title(self) -> str:
+        """Return the conversation title."""
+
+        def _select(connection: sqlite3.Connection) -> Optional[sqlite3.Row]:
+            return connection.execute(
+                "SELECT title FROM conversations WHERE session_id = ? AND user_id = ?",
+                (self.session_id, self.user_id),
+            ).fetchone()
+
+        row = await self.database.run(_select)
+        return row["title"] if row and row["title"] else "New Chat"
+
+    def _select_summary(
+        self, connection: sqlite3.Connection
+    ) -> Tuple[Optional[str], int]:
+        row = connection.execute(
+            "SELECT summary, summary_seq FROM conversations "
+            "WHERE session_id = ? AND user_id = ?",
+            (self.session_id, self.user_id),
+        ).fetchone()
+        if row is None:
+            return None, 0
+        return row["summary"], row["summary_seq"]
+
+    async def get_items(self, limit: int | None = None) -> List[TResponseInputItem]:
+        """Retrieve conversation history for this session."""
+
+        def _select(connection: sqlite3.Connection):
+            summary, summary_seq = (
+                self._select_summary(connection) if self.use_summary else (None, 0)
+            )
+            if limit is None:
+                rows = connection.execute(
+                    "SELECT message_data FROM messages "
+                    "WHERE session_id = ? AND user_id = ? AND seq > ? "
+                    "ORDER BY seq ASC",
+                    (self.session_id, self.user_id, summary_seq),
+                ).fetchall()
+                return summary, rows
+
+            # Fetch the latest N items in reverse order, then reverse
+            rows = connection.execute(
+                "SELECT message_data FROM messages "
+                "WHERE session_id = ? AND user_id = ? AND seq > ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (self.session_id, self.user_id, summary_seq, limit),
+            ).fetchall()
+            return summary, list(reversed(rows))
+
+        try:
+            summary, rows = await self.database.run(_select)
+            items = self._parse_rows(rows)
+            if limit is None or len(items) < limit:
+                items = with_summary(summary, items)
+            return items
+        except Exception as e:
+            logger.error(f"Error getting items: {e}", exc_info=True)
+            return []
+
+    async def get_items_since(
+        self, cursor: Optional[str] = None, limit: int | None = None
+    ) -> Tuple[List[TResponseInputItem], Optional[str]]:
+        """Retrieve only the items stored after `cursor`.
+
+        See SupabaseSession.get_items_since; the cursor is the last seen seq.
+        """
+        after_seq = decode_seq_cursor(cursor)
+
+        def _select(connection: sqlite3.Connection) -> List[sqlite3.Row]:
+            return connection.execute(
+                "SELECT seq, message_data FROM messages "
+                "WHERE session_id = ? AND user_id = ? AND seq > ? "
+                "ORDER BY seq ASC LIMIT ?",
+                (
+                    self.session_id,
+                    self.user_id,
+                    after_seq,
+                    limit if limit is not None else -1,
+                ),
+            ).fetchall()
+
+        try:
+            rows = await self.database.run(_select)
+            if rows:
+                cursor = str(rows[-1]["seq"])
+            return self._parse_rows(rows), cursor
+        except Exception as e:
+            logger.error(f"Error getting items since cursor: {e}", exc_info=True)
+            return [], cursor
+
+    async def add_items(self, items: List[TResponseInputItem]) -> None:
+        """Store new items for this session."""
+        if not items:
+            return
+
+        # Filter out empty user messages
+        filtered_items = filter_empty_user_messages(items, self.session_id)
+        serialized_items = [
+            compress_message_data(json.dumps(item)) for item in filtered_items
+        ]
+        projections = [item_projection(item) for item in filtered_items]
+
+        def _insert(connection: sqlite3.Connection) -> None:
+            now = get_current_time()
+            if not serialized_items:
+                self._touch(connection, now)
+                return
+
+            # Create the conversation on first write
+            connection.execute(
+                "INSERT OR IGNORE INTO conversations "
+                "(id, session_id, title, user_id, created_at, updated_at) "
+                "VALUES (?, ?, 'New Chat', ?, ?, ?)",
+                (str(uuid.uuid4()), self.session_id, self.user_id, now, now),
+            )
+
+            # Reserve a block of sequence numbers and bump the conversation
+            row = connection.execute(
+                "UPDATE conversations SET last_seq = last_seq + ?, updated_at = ? "
+                "WHERE session_id = ? AND user_id = ? RETURNING last_seq",
+                (len(serialized_items), now, self.session_id, self.user_id),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Conversation {self.session_id} not found for user")
+
+            first_seq = row["last_seq"] - len(serialized_items) + 1
+            connection.executemany(
+                "INSERT INTO messages "
+                "(id, session_id, message_data, user_id, seq, created_at, "
+                "role, item_type, content_text) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        str(uuid.uuid4()),
+                        self.session_id,
+                        data,
+                        self.user_id,
+                        first_seq + offset,
+                        now,
+                        projection["role"],
+                        projection["item_type"],
+                        projection["content_text"],
+                    )
+                    for offset, (data, projection) in enumerate(
+                        zip(serialized_items, projections)
+                    )
+                ],
+            )
+
+        try:
+            await self.database.transaction(_insert)
+            invalidate_conversation_lists(self.user_id)
+        except Exception as e:
+            logger.error(f"Error adding items: {e}", exc_info=True)
+
+    async def pop_item(self) -> dict | None:
+        """Remove and return the most recent item from this session."""
+        items = await self.pop_items(1)
+        return items[0] if items else None
+
+    async def pop_items(self, count: int) -> List[TResponseInputItem]:
+        """Remove and return the `count` most recent items, newest first.
+
+        See SupabaseSession.pop_items.
+        """
+        if count <= 0:
+            return []
+
+        def _delete(connection: sqlite3.Connection) -> List[sqlite3.Row]:
+            rows = connection.execute(
+                "DELETE FROM messages WHERE id IN ("
+                "SELECT id FROM messages WHERE session_id = ? AND user_id = ? "
+                "ORDER BY seq DESC LIMIT ?"
+                ") RETURNING seq, message_data",
+                (self.session_id, self.user_id, count),
+            ).fetchall()
+            if rows:
+                self._touch(connection, get_current_time())
+            return rows
+
+        try:
+            rows = await self.database.transaction(_delete)
+            if rows:
+                invalidate_conversation_lists(self.user_id)
+            items = []
+            for row in sorted(rows, key=lambda row: row["seq"], reverse=True):
+                try:
+                    items.append(load_message_data(row["message_data"]))
+                except (ValueError, TypeError):
+                    # Skip corrupted JSON entries
+                    continue
+            return items
+        except Exception as e:
+            logger.error(f"Error popping items: {e}", exc_info=True)
+            return []
+
+    async def clear_session(self) -> None:
+        """Clear all items for this session."""
+
+        def _delete(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "DELETE FROM messages WHERE session_id = ? AND user_id = ?",
+                (self.session_id, self.user_id),
+            )
+            connection.execute(
+                "UPDATE conversations SET summary = NULL, summary_seq = 0, "
+                "updated_at = ? WHERE session_id = ? AND user_id = ?",
+                (get_current_time(), self.session_id, self.user_id),
+            )
+
+        try:
+            await self.database.transaction(_delete)
+            invalidate_conversation_lists(self.user_id)
+        except Exception as e:
+            logger.error(f"Error clearing session: {e}", exc_info=True)
+
+    async def update_tool_results(self, results: Dict[str, str]) -> int:
+        """Replace pending client tool outputs in place.
+
+        See SupabaseSession.update_tool_results.
+        """
+        if not results:
+            return 0
+
+        def _update(connection: sqlite3.Connection) -> int:
+            rows = connection.execute(
+                "SELECT id, message_data FROM messages "
+                "WHERE session_id = ? AND user_id = ? AND message_data LIKE ?",
+                (self.session_id, self.user_id, f"%{PENDING_CLIENT_EXECUTION}%"),
+            ).fetchall()
+
+            updates = []
+            for row in rows:
+                try:
+                    item = patch_pending_tool_result(
+                        json.loads(row["message_data"]), results
+                    )
+                except (json.JSONDecodeError, TypeError):
+                    continue
+                if item is not None:
+                    # Stored plain, like patch_tool_results in schema.sql does
+                    updates.append((json.dumps(item), row["id"]))
+
+            if updates:
+                connection.executemany(
+                    "UPDATE messages SET message_data = ? WHERE id = ?", updates
+                )
+                self._touch(connection, get_current_time())
+            return len(updates)
+
+        try:
+            patched = await self.database.transaction(_update)
+            if patched:
+                invalidate_conversation_lists(self.user_id)
+            return patched
+        except Exception as e:
+            logger.error(f"Error updating tool results: {e}", exc_info=True)
+            return 0
+
+    async def get_unsummarized_count(self) -> int:
+        """Upper bound on the number of items not covered by the summary.
+
+        See SupabaseSession.get_unsummarized_count.
+        """
+
+        def _select(connection: sqlite3.Connection):
+            return connection.execute(
+                "SELECT last_seq - summary_seq FROM conversations "
+                "WHERE session_id = ? AND user_id = ?",
+                (self.session_id, self.user_id),
+            ).fetchone()
+
+        row = await self.database.run(_select)
+        return row[0] if row else 0
+
+    async def get_compaction_state(self) -> CompactionState:
+        """Return the stored summary and the raw items it does not cover yet."""
+
+        def _select(connection: sqlite3.Connection):
+            summary, summary_seq = self._select_summary(connection)
+            rows = connection.execute(
+                "SELECT seq, message_data FROM messages "
+                "WHERE session_id = ? AND user_id = ? AND seq > ? ORDER BY seq ASC",
+                (self.session_id, self.user_id, summary_seq),
+            ).fetchall()
+            return summary, summary_seq, rows
+
+        summary, summary_seq, rows = await self.database.run(_select)
+        items = []
+        for row in rows:
+            try:
+                items.append((row["seq"], load_message_data(row["message_data"])))
+            except (ValueError, TypeError):
+                # Skip invalid JSON entries
+                continue
+        return CompactionState(summary=summary, summary_seq=summary_seq, items=items)
+
+    async def store_summary(
+        self, summary: Optional[str], summary_seq: int, expected_summary_seq: int
+    ) -> bool:
+        """Store a new history summary covering messages up to `summary_seq`.
+
+        See SupabaseSession.store_summary.
+        """
+
+        def _update(connection: sqlite3.Connection) -> int:
+            return connection.execute(
+                "UPDATE conversations SET summary = ?, summary_seq = ? "
+                "WHERE session_id = ? AND user_id = ? AND summary_seq = ?",
+                (
+                    summary,
+                    summary_seq,
+                    self.session_id,
+                    self.user_id,
+                    expected_summary_seq,
+                ),
+            ).rowcount
+
+        return await self.database.run(_update) > 0
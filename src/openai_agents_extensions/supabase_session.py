@@ -1,18 +1,30 @@
 import json
-from datetime import datetime, timezone
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 
 from agents import TResponseInputItem
 from agents.memory.session import SessionABC, Session
-from supabase import acreate_client, AsyncClient
+from postgrest import APIResponse
+from supabase import AsyncClient
 
 from src.logging_config import get_logger
+from src.services.pagination import decode_seq_cursor
+from src.supabase_clients import call_function, get_supabase_client
+from .compaction import CompactionState, with_summary
+from .conversation_list_cache import invalidate_conversation_lists
+from .history_cache import get_history_cache
+from .message_codec import decode_message_data
+from .session_utils import (
+    PENDING_CLIENT_EXECUTION,
+    compress_message_data,
+    filter_empty_user_messages,
+    get_current_time,
+    item_projection,
+    load_message_data,
+    patch_pending_tool_result,
+)
 
 logger = get_logger(__name__)
 
-# Global connection pool for Supabase clients
-_connection_pool: Dict[str, AsyncClient] = {}
-
 
 class SupabaseSession(SessionABC, Session):
     """Supabase-backed session implementation following the Session protocol."""
@@ -25,6 +37,9 @@ class SupabaseSession(SessionABC, Session):
         user_id: str,
         conversations_table: str = "conversations",
         messages_table: str = "messages",
+        use_rpc: bool = True,
+        lazy_create: bool = False,
+        use_summary: bool = False,
     ):
         """Initialize the Supabase session.
 
@@ -35,6 +50,15 @@ class SupabaseSession(SessionABC, Session):
             user_id: User identifier for RLS filtering
             conversations_table: Name of the conversations table. Defaults to 'conversations'
             messages_table: Name of the messages table. Defaults to 'messages'
+            use_rpc: Use the combined write functions from schema.sql so each
+                write is a single round trip. Falls back to separate statements
+                when the functions are not installed. Defaults to True
+            lazy_create: Skip loading/creating the conversation row when the
+                session is created. The row is upserted on the first write and
+                the title is loaded on demand. Defaults to False
+            use_summary: Return the stored history summary followed by the
+                messages it does not cover, instead of the full raw history.
+                Defaults to False
         """
         self.session_id = session_id
         self.supabase_url = supabase_url
@@ -42,45 +66,70 @@ class SupabaseSession(SessionABC, Session):
         self.user_id = user_id
         self.conversations_table = conversations_table
         self.messages_table = messages_table
+        # The write functions in schema.sql operate on the default table names
+        self.use_rpc = (
+            use_rpc
+            and conversations_table == "conversations"
+            and messages_table == "messages"
+        )
+        self.lazy_create = lazy_create
+        self.use_summary = use_summary
+        self.title: Optional[str] = None
         self.supabase: Optional[AsyncClient] = None
         self._initialized = False
-
-    async def _get_or_create_client(self) -> AsyncClient:
-        """Get or create a client from the connection pool."""
-        pool_key = f"{self.supabase_url}:{self.supabase_key}"
-
-        if pool_key not in _connection_pool:
-            logger.debug(f"Creating new Supabase client for pool key: {pool_key}")
-            _connection_pool[pool_key] = await acreate_client(
-                self.supabase_url, self.supabase_key
-            )
-
-        return _connection_pool[pool_key]
-
-    @classmethod
-    async def close_connection_pool(cls):
-        """Close all connections in the pool (for cleanup during app shutdown)."""
-        global _connection_pool
-
-        for pool_key, client in _connection_pool.items():
-            try:
-                logger.debug(f"Closing Supabase client for pool key: {pool_key}")
-                # Call sign_out to properly close connections as per Supabase docs
-                client.auth.sign_out()
-            except Exception as e:
-                logger.warning(f"Error closing client for {pool_key}: {e}")
-
-        _connection_pool.clear()
-        logger.info("Supabase connection pool closed")
+        # Whether the conversation row has been read, and whether it is known
+        # to exist (so writes don't need to upsert it first)
+        self._session_loaded = False
+        self._session_exists = False
+        # Request-scoped snapshot of the full history, shared by every consumer
+        # of this session instance and kept in sync by the write methods
+        self._history: Optional[List[TResponseInputItem]] = None
+        # Conversation updated_at as last seen; used to validate the history cache
+        self._updated_at: Optional[str] = None
+        # Compacted history summary and the seq of the last message it covers
+        self._summary: Optional[str] = None
+        self._summary_seq = 0
 
     async def _ensure_initialized(self):
         """Ensure the async client is initialized."""
         if not self._initialized:
             if self.supabase is None:
-                self.supabase = await self._get_or_create_client()
-            await self._load_or_create_session()
+                self.supabase = await get_supabase_client(
+                    self.supabase_url, self.supabase_key
+                )
+            if not self.lazy_create:
+                await self._load_or_create_session()
             self._initialized = True
 
+    async def _ensure_session_exists(self):
+        """Upsert the conversation row before the first write of a lazy session."""
+        if self._session_exists:
+            return
+        now = self._get_current_time()
+        await (
+            self.supabase.table(self.conversations_table)
+            .upsert(
+                {
+                    "session_id": self.session_id,
+                    "title": "New Chat",
+                    "user_id": self.user_id,
+                    "created_at": now,
+                    "updated_at": now,
+                },
+                on_conflict="session_id",
+                ignore_duplicates=True,
+            )
+            .execute()
+        )
+        self._session_exists = True
+
+    async def get_title(self) -> str:
+        """Return the conversation title, loading it on first use."""
+        await self._ensure_initialized()
+        if not self._session_loaded:
+            await self._load_session()
+        return self.title or "New Chat"
+
     @classmethod
     async def create(
         cls,
@@ -90,8 +139,15 @@ class SupabaseSession(SessionABC, Session):
         user_id: str,
         conversations_table: str = "conversations",
         messages_table: str = "messages",
+        use_rpc: bool = True,
+        lazy_create: bool = False,
+        use_summary: bool = False,
     ):
-        """Async factory method to create a SupabaseSession."""
+        """Async factory method to create a SupabaseSession.
+
+        With `lazy_create` no database call is made here; the conversation row
+        is only touched when the session is first written to.
+        """
         instance = cls(
             session_id=session_id,
             supabase_url=supabase_url,
@@ -99,6 +155,9 @@ class SupabaseSession(SessionABC, Session):
             user_id=user_id,
             conversations_table=conversations_table,
             messages_table=messages_table,
+            use_rpc=use_rpc,
+            lazy_create=lazy_create,
+            use_summary=use_summary,
         )
         await instance._ensure_initialized()
         return instance
@@ -106,7 +165,32 @@ class SupabaseSession(SessionABC, Session):
     @staticmethod
     def _get_current_time():
         """Get current UTC time in ISO format"""
-        return datetime.now(timezone.utc).isoformat()
+        return get_current_time()
+
+    async def _call_rpc(
+        self, function_name: str, params: dict
+    ) -> Optional[APIResponse]:
+        """Call a combined write function from schema.sql.
+
+        Returns the response, or None when the function is not available and the
+        caller should use its multi-statement fallback instead.
+        """
+        if not self.use_rpc:
+            return None
+        return await call_function(
+            self.supabase, self.supabase_url, function_name, params
+        )
+
+    async def _touch_session(self) -> Optional[str]:
+        """Update the conversation's updated_at timestamp and return the new value"""
+        result = await (
+            self.supabase.table(self.conversations_table)
+            .update({"updated_at": self._get_current_time()})
+            .eq("session_id", self.session_id)
+            .eq("user_id", self.user_id)
+            .execute()
+        )
+        return result.data[0].get("updated_at") if result.data else None
 
     async def _load_session(self) -> bool:
         """Load existing session data. Returns True if session exists, False otherwise"""
@@ -119,10 +203,15 @@ class SupabaseSession(SessionABC, Session):
                 .execute()
             )
 
+            self._session_loaded = True
             if existing_session.data:
                 # Load existing session data
                 session_data = existing_session.data[0]
                 self.title = session_data.get("title", "New Chat")
+                self._updated_at = session_data.get("updated_at")
+                self._summary = session_data.get("summary")
+                self._summary_seq = session_data.get("summary_seq") or 0
+                self._session_exists = True
                 return True
 
             return False
@@ -135,7 +224,7 @@ class SupabaseSession(SessionABC, Session):
         try:
             self.title = "New Chat"
             now = self._get_current_time()
-            await (
+            result = await (
                 self.supabase.table(self.conversations_table)
                 .insert(
                     {
@@ -148,6 +237,10 @@ class SupabaseSession(SessionABC, Session):
                 )
                 .execute()
             )
+            if result.data:
+                self._updated_at = result.data[0].get("updated_at")
+            self._session_loaded = True
+            self._session_exists = True
         except Exception as e:
             logger.error(f"Error creating session: {e}", exc_info=True)
             self.title = "New Chat"
@@ -164,75 +257,154 @@ class SupabaseSession(SessionABC, Session):
     async def get_items(self, limit: int | None = None) -> List[TResponseInputItem]:
         """Retrieve conversation history for this session."""
         await self._ensure_initialized()
+
+        # Serve from the snapshot once the full history has been loaded
+        if self._history is not None:
+            return self._history_tail(limit)
+
+        # Lazy sessions read the conversation row only when it is needed: for
+        # the cache version stamp or the history summary
+        cache = get_history_cache()
+        if not self._session_loaded and (cache is not None or self.use_summary):
+            await self._load_session()
+
+        # Reuse a cached history if the conversation hasn't changed since
+        if cache is not None:
+            cached = cache.get(
+                self.user_id, self.session_id, self._cache_version(self._updated_at)
+            )
+            if cached is not None:
+                self._history = cached
+                return self._history_tail(limit)
+
+        summary = self._summary if self.use_summary else None
         try:
+            query = (
+                self.supabase.table(self.messages_table)
+                .select("message_data")
+                .eq("session_id", self.session_id)
+                .eq("user_id", self.user_id)
+            )
+            if summary:
+                # Messages folded into the summary are not sent to the model
+                query = query.gt("seq", self._summary_seq)
+
             if limit is None:
                 # Fetch all items in chronological order
-                query = (
-                    self.supabase.table(self.messages_table)
-                    .select("message_data")
-                    .eq("session_id", self.session_id)
-                    .eq("user_id", self.user_id)
-                    .order("created_at", desc=False)
-                )
+                query = query.order("seq", desc=False)
             else:
                 # Fetch the latest N items in reverse chronological order, then reverse
-                query = (
-                    self.supabase.table(self.messages_table)
-                    .select("message_data")
-                    .eq("session_id", self.session_id)
-                    .eq("user_id", self.user_id)
-                    .order("created_at", desc=True)
-                    .limit(limit)
-                )
+                query = query.order("seq", desc=True).limit(limit)
 
             result = await query.execute()
 
             # Parse the stored JSON data back to TResponseInputItem format
             items = []
+            sizes = []
             for msg in result.data or []:
                 message_data = msg.get("message_data")
                 if isinstance(message_data, str):
                     try:
-                        item = json.loads(message_data)
-                        items.append(item)
-                    except (json.JSONDecodeError, TypeError):
+                        data = decode_message_data(message_data)
+                        items.append(json.loads(data))
+                        sizes.append(len(data))
+                    except (ValueError, TypeError):
                         # Skip invalid JSON entries
                         continue
 
             # Reverse to get chronological order when using DESC
             if limit is not None:
                 items = list(reversed(items))
+                if summary and len(items) < limit:
+                    items = with_summary(summary, items)
+            else:
+                if summary:
+                    items = with_summary(summary, items)
+                    sizes.insert(0, len(summary))
+                self._history = list(items)
+                if cache is not None:
+                    cache.put(
+                        self.user_id,
+                        self.session_id,
+                        self._cache_version(self._updated_at),
+                        items,
+                        sizes,
+                    )
 
             return items
         except Exception as e:
             logger.error(f"Error getting items: {e}", exc_info=True)
             return []
 
-    def _is_empty_user_message(self, item: TResponseInputItem) -> bool:
-        """Check if an item is an empty user message that should be filtered out."""
-        if not isinstance(item, dict):
-            return False
+    async def get_items_since(
+        self, cursor: Optional[str] = None, limit: int | None = None
+    ) -> Tuple[List[TResponseInputItem], Optional[str]]:
+        """Retrieve only the items stored after `cursor`.
 
-        # Only filter user messages
-        if item.get("role") != "user":
-            return False
+        Args:
+            cursor: Cursor returned by a previous call (the last seen message
+                seq), or None to start from the beginning of the conversation
+            limit: Maximum number of items to return. Defaults to all new items
 
-        # Check if content is empty or whitespace-only
-        content = item.get("content", "")
-        if isinstance(content, str):
-            return not content.strip()
-        elif isinstance(content, list):
-            # For list content, check if all text items are empty
-            text_content = ""
-            for content_item in content:
-                if (
-                    isinstance(content_item, dict)
-                    and content_item.get("type") == "text"
-                ):
-                    text_content += content_item.get("text", "")
-            return not text_content.strip()
-
-        return False
+        Returns:
+            The new items in chronological order and the cursor to pass on the
+            next call. The cursor is unchanged when there are no new items.
+
+        Raises:
+            InvalidCursorError: If `cursor` is not a cursor from this method
+        """
+        after_seq = decode_seq_cursor(cursor)
+        await self._ensure_initialized()
+        try:
+            query = (
+                self.supabase.table(self.messages_table)
+                .select("seq, message_data")
+                .eq("session_id", self.session_id)
+                .eq("user_id", self.user_id)
+            )
+            if cursor is not None:
+                query = query.gt("seq", after_seq)
+            query = query.order("seq", desc=False)
+            if limit is not None:
+                query = query.limit(limit)
+
+            result = await query.execute()
+
+            items = []
+            for msg in result.data or []:
+                message_data = msg.get("message_data")
+                if isinstance(message_data, str):
+                    try:
+                        items.append(load_message_data(message_data))
+                    except (ValueError, TypeError):
+                        # Skip invalid JSON entries
+                        pass
+
+            if result.data:
+                cursor = str(result.data[-1]["seq"])
+
+            return items, cursor
+        except Exception as e:
+            logger.error(f"Error getting items since cursor: {e}", exc_info=True)
+            return [], cursor
+
+    def _cache_version(self, updated_at: Optional[str]) -> Optional[str]:
+        """History cache version of the conversation at `updated_at`.
+
+        Storing a summary leaves updated_at alone, so sessions using summaries
+        also version their cached history by the summary it starts with.
+        """
+        if updated_at is None or not self.use_summary:
+            return updated_at
+        return f"{updated_at}#{self._summary_seq}"
+
+    def _history_tail(self, limit: int | None) -> List[TResponseInputItem]:
+        """Return the latest `limit` items (or all of them) from the snapshot."""
+        if limit is None:
+            return list(self._history)
+        if limit <= 0:
+            return []
+        return self._history[-limit:]
 
     async def add_items(self, items: List[TResponseInputItem]) -> None:
         """Store new items for this session."""
@@ -242,136 +414,428 @@ class SupabaseSession(SessionABC, Session):
         await self._ensure_initialized()
         try:
             # Filter out empty user messages
-            filtered_items = []
-            filtered_count = 0
-
-            for item in items:
-                if self._is_empty_user_message(item):
-                    filtered_count += 1
-                    logger.debug(
-                        f"Filtered out empty user message for session {self.session_id}"
-                    )
-                else:
-                    filtered_items.append(item)
-
-            if filtered_count > 0:
-                logger.info(
-                    f"Filtered out {filtered_count} empty user message(s) from session {self.session_id}"
-                )
+            filtered_items = filter_empty_user_messages(items, self.session_id)
 
             # If all items were filtered out, just update timestamp and return
             if not filtered_items:
-                await (
-                    self.supabase.table(self.conversations_table)
-                    .update({"updated_at": self._get_current_time()})
-                    .eq("session_id", self.session_id)
-                    .eq("user_id", self.user_id)
-                    .execute()
-                )
+                updated_at = await self._touch_session()
+                self._record_append(updated_at, [], [])
                 return
 
-            # Serialize each item to JSON string (exactly like SQLiteSession does)
-            message_data = [
-                {
-                    "session_id": self.session_id,
-                    "message_data": json.dumps(item),
-                    "user_id": self.user_id,
-                    "created_at": self._get_current_time(),
-                }
-                for item in filtered_items
-            ]
+            # Serialize each item to JSON string (exactly like SQLiteSession does),
+            # compressing large payloads for storage
+            serialized_items = [json.dumps(item) for item in filtered_items]
+            stored_items = [compress_message_data(data) for data in serialized_items]
+            projections = [item_projection(item) for item in filtered_items]
 
-            # Insert all items at once
-            await (
-                self.supabase.table(self.messages_table).insert(message_data).execute()
+            # Insert the items and bump the session in a single round trip
+            response = await self._call_rpc(
+                "add_session_items",
+                {
+                    "p_session_id": self.session_id,
+                    "p_user_id": self.user_id,
+                    "p_items": stored_items,
+                    "p_meta": projections,
+                },
             )
+            if response is not None:
+                # The function upserts the conversation row itself
+                self._session_exists = True
+                updated_at = response.data
+            else:
+                await self._ensure_session_exists()
+                updated_at = await self._insert_items_fallback(
+                    stored_items, projections
+                )
 
-            # Update session timestamp
-            await (
-                self.supabase.table(self.conversations_table)
-                .update({"updated_at": self._get_current_time()})
-                .eq("session_id", self.session_id)
-                .eq("user_id", self.user_id)
-                .execute()
+            # Keep the snapshot and the cache in step with what was just written
+            if self._history is not None:
+                self._history.extend(filtered_items)
+            self._record_append(
+                updated_at, filtered_items, [len(data) for data in serialized_items]
             )
 
         except Exception as e:
+            # The write may have partially applied, so reload on next read
+            self._forget_history()
             logger.error(f"Error adding items: {e}", exc_info=True)
 
+    def _record_append(
+        self,
+        updated_at: Optional[str],
+        items: List[TResponseInputItem],
+        sizes: List[int],
+    ):
+        """Apply an append to the history cache and remember the new version."""
+        cache = get_history_cache()
+        if cache is not None:
+            cache.append(
+                self.user_id,
+                self.session_id,
+                self._cache_version(self._updated_at),
+                self._cache_version(updated_at),
+                items,
+                sizes,
+            )
+        self._updated_at = updated_at
+        # The conversation moved to the top of the user's list
+        invalidate_conversation_lists(self.user_id)
+
+    def _forget_history(self):
+        """Drop the snapshot and cached history after a failed write."""
+        self._history = None
+        self._updated_at = None
+        cache = get_history_cache()
+        if cache is not None:
+            cache.invalidate(self.user_id, self.session_id)
+        invalidate_conversation_lists(self.user_id)
+
+    async def _insert_items_fallback(
+        self, serialized_items: List[str], projections: List[dict]
+    ) -> Optional[str]:
+        """Insert serialized items and bump the session using separate statements.
+
+        Returns the new updated_at of the conversation.
+        """
+        message_data = [
+            {
+                "session_id": self.session_id,
+                "message_data": data,
+                "user_id": self.user_id,
+                "created_at": self._get_current_time(),
+                **projection,
+            }
+            for data, projection in zip(serialized_items, projections)
+        ]
+
+        # Insert all items at once
+        await self.supabase.table(self.messages_table).insert(message_data).execute()
+
+        # Update session timestamp
+        return await self._touch_session()
+
     async def pop_item(self) -> dict | None:
         """Remove and return the most recent item from this session."""
-        await self._ensure_initialized()
-        try:
-            # Get the most recent message
-            result = await (
-                self.supabase.table(self.messages_table)
-                .select("id, message_data")
-                .eq("session_id", self.session_id)
-                .eq("user_id", self.user_id)
-                .order("created_at", desc=True)
-                .limit(1)
-                .execute()
-            )
+        items = await self.pop_items(1)
+        return items[0] if items else None
 
-            if not result.data:
-                return None
+    async def pop_items(self, count: int) -> List[TResponseInputItem]:
+        """Remove and return the `count` most recent items from this session.
 
-            message = result.data[0]
+        Returns the removed items newest first, as repeated pop_item calls
+        would. Corrupted entries are removed but not returned.
+        """
+        if count <= 0:
+            return []
 
-            # Delete the message
-            await (
-                self.supabase.table(self.messages_table)
-                .delete()
-                .eq("id", message["id"])
-                .execute()
+        await self._ensure_initialized()
+        try:
+            # Delete the newest messages and bump the session in one call
+            response = await self._call_rpc(
+                "pop_session_items",
+                {
+                    "p_session_id": self.session_id,
+                    "p_user_id": self.user_id,
+                    "p_count": count,
+                },
             )
+            if response is not None:
+                popped = response.data or {}
+                stored_items = popped.get("message_data") or []
+                updated_at = popped.get("updated_at")
+            else:
+                stored_items, updated_at = await self._pop_items_fallback(count)
 
-            # Update session timestamp
-            await (
-                self.supabase.table(self.conversations_table)
-                .update({"updated_at": self._get_current_time()})
-                .eq("session_id", self.session_id)
-                .eq("user_id", self.user_id)
-                .execute()
-            )
+            if not stored_items:
+                return []
 
             # Parse the stored JSON data back to TResponseInputItem format
-            message_data = message.get("message_data")
-            if isinstance(message_data, str):
+            items = []
+            for message_data in stored_items:
                 try:
-                    item = json.loads(message_data)
-                    return item
-                except (json.JSONDecodeError, TypeError):
-                    # Return None for corrupted JSON entries
-                    return None
-
-            return None
+                    items.append(load_message_data(message_data))
+                except (ValueError, TypeError):
+                    # Skip invalid JSON entries
+                    continue
+
+            if len(items) < len(stored_items) or (self.use_summary and self._summary):
+                # Corrupted entries are not in the snapshot, and popped rows may
+                # already be folded into the summary; reload rather than guess
+                self._forget_history()
+            else:
+                if self._history is not None:
+                    del self._history[max(len(self._history) - len(items), 0) :]
+                cache = get_history_cache()
+                if cache is not None:
+                    cache.pop(
+                        self.user_id,
+                        self.session_id,
+                        self._cache_version(self._updated_at),
+                        self._cache_version(updated_at),
+                        count=len(items),
+                    )
+            self._updated_at = updated_at
+            invalidate_conversation_lists(self.user_id)
+            return items
 
         except Exception as e:
-            logger.error(f"Error popping item: {e}", exc_info=True)
-            return None
+            self._forget_history()
+            logger.error(f"Error popping items: {e}", exc_info=True)
+            return []
+
+    async def _pop_items_fallback(self, count: int) -> Tuple[List[str], Optional[str]]:
+        """Pop the most recent items using separate statements.
+
+        Returns the raw message_data of the removed rows (newest first) and the
+        new updated_at of the conversation.
+        """
+        # Get the most recent messages
+        result = await (
+            self.supabase.table(self.messages_table)
+            .select("id")
+            .eq("session_id", self.session_id)
+            .eq("user_id", self.user_id)
+            .order("seq", desc=True)
+            .limit(count)
+            .execute()
+        )
+
+        if not result.data:
+            return [], None
+
+        # Delete them, keeping only the rows this call actually removed
+        deleted = await (
+            self.supabase.table(self.messages_table)
+            .delete()
+            .in_("id", [message["id"] for message in result.data])
+            .execute()
+        )
+        rows = sorted(deleted.data or [], key=lambda row: row["seq"], reverse=True)
+        if not rows:
+            return [], None
+
+        # Update session timestamp
+        updated_at = await self._touch_session()
+
+        return [row["message_data"] for row in rows], updated_at
 
     async def clear_session(self) -> None:
         """Clear all items for this session."""
         await self._ensure_initialized()
         try:
-            # Delete all messages for this session
-            await (
-                self.supabase.table(self.messages_table)
-                .delete()
-                .eq("session_id", self.session_id)
-                .eq("user_id", self.user_id)
-                .execute()
+            # Delete all messages and bump the session in one call
+            response = await self._call_rpc(
+                "clear_session_items",
+                {"p_session_id": self.session_id, "p_user_id": self.user_id},
             )
+            if response is not None:
+                updated_at = response.data
+            else:
+                updated_at = await self._clear_session_fallback()
+
+            self._history = []
+            self._summary = None
+            self._summary_seq = 0
+            cache = get_history_cache()
+            if cache is not None:
+                cache.reset(
+                    self.user_id, self.session_id, self._cache_version(updated_at)
+                )
+            self._updated_at = updated_at
+            invalidate_conversation_lists(self.user_id)
+
+        except Exception as e:
+            self._forget_history()
+            logger.error(f"Error clearing session: {e}", exc_info=True)
+
+    async def _clear_session_fallback(self) -> Optional[str]:
+        """Delete all messages and bump the session using separate statements.
+
+        Returns the new updated_at of the conversation.
+        """
+        # Delete all messages for this session
+        await (
+            self.supabase.table(self.messages_table)
+            .delete()
+            .eq("session_id", self.session_id)
+            .eq("user_id", self.user_id)
+            .execute()
+        )
 
-            # Update session timestamp
+        if self._summary is not None:
+            # Drop the summary of the deleted messages along with them
+            await self.store_summary(None, 0, self._summary_seq)
+
+        # Update session timestamp
+        return await self._touch_session()
+
+    async def update_tool_results(self, results: Dict[str, str]) -> int:
+        """Replace pending client tool outputs in place.
+
+        Args:
+            results: Result strings keyed by tool call id
+
+        Returns:
+            The number of stored items that were patched
+        """
+        if not results:
+            return 0
+
+        await self._ensure_initialized()
+        try:
+            # Patch only the affected rows and bump the session in one call
+            response = await self._call_rpc(
+                "patch_tool_results",
+                {
+                    "p_session_id": self.session_id,
+                    "p_user_id": self.user_id,
+                    "p_results": results,
+                },
+            )
+            if response is not None:
+                patched = (response.data or {}).get("patched", 0)
+                updated_at = (response.data or {}).get("updated_at")
+            else:
+                patched, updated_at = await self._update_tool_results_fallback(results)
+
+            if patched:
+                if self._history is not None:
+                    self._history = [
+                        patch_pending_tool_result(item, results) or item
+                        for item in self._history
+                    ]
+                cache = get_history_cache()
+                if cache is not None:
+                    cache.invalidate(self.user_id, self.session_id)
+                self._updated_at = updated_at
+                invalidate_conversation_lists(self.user_id)
+
+            return patched
+
+        except Exception as e:
+            self._forget_history()
+            logger.error(f"Error updating tool results: {e}", exc_info=True)
+            return 0
+
+    async def _update_tool_results_fallback(
+        self, results: Dict[str, str]
+    ) -> Tuple[int, Optional[str]]:
+        """Patch pending tool outputs using separate statements.
+
+        Returns the number of patched items and the new updated_at of the
+        conversation (None if nothing was patched).
+        """
+        pending = await (
+            self.supabase.table(self.messages_table)
+            .select("id, message_data")
+            .eq("session_id", self.session_id)
+            .eq("user_id", self.user_id)
+            .like("message_data", f"%{PENDING_CLIENT_EXECUTION}%")
+            .execute()
+        )
+
+        patched = 0
+        for row in pending.data or []:
+            try:
+                item = patch_pending_tool_result(
+                    json.loads(row["message_data"]), results
+                )
+            except (json.JSONDecodeError, TypeError):
+                continue
+            if item is None:
+                continue
+
+            # Stored plain, like patch_tool_results in schema.sql does
             await (
-                self.supabase.table(self.conversations_table)
-                .update({"updated_at": self._get_current_time()})
-                .eq("session_id", self.session_id)
-                .eq("user_id", self.user_id)
+                self.supabase.table(self.messages_table)
+                .update({"message_data": json.dumps(item)})
+                .eq("id", row["id"])
                 .execute()
             )
+            patched += 1
 
-        except Exception as e:
-            logger.error(f"Error clearing session: {e}", exc_info=True)
+        if not patched:
+            return 0, None
+
+        # Update session timestamp
+        return patched, await self._touch_session()
+
+    async def get_unsummarized_count(self) -> int:
+        """Upper bound on the number of items not covered by the summary.
+
+        Read from the conversation row alone (last_seq - summary_seq; popped
+        items leave gaps, so the real number can be lower).
+        """
+        await self._ensure_initialized()
+        result = await (
+            self.supabase.table(self.conversations_table)
+            .select("last_seq, summary_seq")
+            .eq("session_id", self.session_id)
+            .eq("user_id", self.user_id)
+            .execute()
+        )
+        if not result.data:
+            return 0
+        row = result.data[0]
+        return (row.get("last_seq") or 0) - (row.get("summary_seq") or 0)
+
+    async def get_compaction_state(self) -> CompactionState:
+        """Return the stored summary and the raw items it does not cover yet."""
+        await self._ensure_initialized()
+        if not self._session_loaded:
+            await self._load_session()
+
+        result = await (
+            self.supabase.table(self.messages_table)
+            .select("seq, message_data")
+            .eq("session_id", self.session_id)
+            .eq("user_id", self.user_id)
+            .gt("seq", self._summary_seq)
+            .order("seq", desc=False)
+            .execute()
+        )
+
+        items = []
+        for msg in result.data or []:
+            try:
+                items.append((msg["seq"], load_message_data(msg["message_data"])))
+            except (ValueError, TypeError):
+                # Skip invalid JSON entries
+                continue
+
+        return CompactionState(
+            summary=self._summary, summary_seq=self._summary_seq, items=items
+        )
+
+    async def store_summary(
+        self, summary: Optional[str], summary_seq: int, expected_summary_seq: int
+    ) -> bool:
+        """Store a new history summary covering messages up to `summary_seq`.
+
+        The write only applies if the stored summary_seq is still
+        `expected_summary_seq`, so concurrent compactions cannot overwrite a
+        newer summary. Returns whether the summary was stored.
+
+        updated_at is left alone, so compaction does not reorder the
+        conversation list (the schema.sql trigger skips summary-only updates).
+        """
+        await self._ensure_initialized()
+        result = await (
+            self.supabase.table(self.conversations_table)
+            .update({"summary": summary, "summary_seq": summary_seq})
+            .eq("session_id", self.session_id)
+            .eq("user_id", self.user_id)
+            .eq("summary_seq", expected_summary_seq)
+            .execute()
+        )
+        if not result.data:
+            return False
+
+        self._summary = summary
+        self._summary_seq = summary_seq
+        self._history = None
+        self._updated_at = result.data[0].get("updated_at")
+        cache = get_history_cache()
+        if cache is not None:
+            cache.invalidate(self.user_id, self.session_id)
+        return True
@@ -43,6 +43,10 @@ CREATE TABLE IF NOT EXISTS conversations (
     user_id VARCHAR(255) NOT NULL,
     is_archived BOOLEAN DEFAULT FALSE,
     is_starred BOOLEAN DEFAULT FALSE,
+    last_seq BIGINT NOT NULL DEFAULT 0,
+    -- Compacted history: summary of all messages with seq <= summary_seq
+    summary TEXT,
+    summary_seq BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -53,8 +57,21 @@ CREATE TABLE IF NOT EXISTS messages (
     session_id VARCHAR(255) NOT NULL,
     message_data TEXT NOT NULL,
     user_id VARCHAR(255) NOT NULL,
+    seq BIGINT NOT NULL,
+    -- Projected from message_data at insert time, so readers need not parse it
+    role VARCHAR(32),
+    item_type VARCHAR(64),
+    -- Text of user and assistant messages, extracted at insert time (the
+    -- stored message_data may be compressed), and its search vector
+    content_text TEXT,
+    content_tsv TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('english', COALESCE(content_text, ''))
+    ) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
+    -- Per-session position, assigned from conversations.last_seq
+    CONSTRAINT uq_messages_session_seq UNIQUE (session_id, seq),
+
     -- Foreign key constraint
     CONSTRAINT fk_messages_session 
         FOREIGN KEY (session_id) 
@@ -64,13 +81,21 @@ CREATE TABLE IF NOT EXISTS messages (
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_conversations_session_id ON conversations(session_id);
-CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id);
 CREATE INDEX IF NOT EXISTS idx_conversations_is_archived ON conversations(is_archived);
 CREATE INDEX IF NOT EXISTS idx_conversations_is_starred ON conversations(is_starred);
-CREATE INDEX IF NOT EXISTS idx_messages_session_id ON messages(session_id);
 CREATE INDEX IF NOT EXISTS idx_messages_user_id ON messages(user_id);
 CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages(created_at);
 
+-- Composite indexes matching the session and conversation list queries
+CREATE INDEX IF NOT EXISTS idx_messages_session_user_seq
+    ON messages(session_id, user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_conversations_user_archived_updated_id
+    ON conversations(user_id, is_archived, updated_at DESC, id DESC);
+
+-- Full-text index for message search
+CREATE INDEX IF NOT EXISTS idx_messages_content_tsv
+    ON messages USING GIN (content_tsv);
+
 -- Enable Row Level Security (RLS) for security
 ALTER TABLE conversations ENABLE ROW LEVEL SECURITY;
 ALTER TABLE messages ENABLE ROW LEVEL SECURITY;
@@ -92,11 +117,336 @@ BEGIN
 END;
 $$ language 'plpgsql';
 
+-- Bump a conversation's updated_at on every change except saving its
+-- history summary, which is not visible to the user and must not reorder
+-- the conversation list
+CREATE OR REPLACE FUNCTION update_conversation_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (NEW.summary, NEW.summary_seq) IS DISTINCT FROM (OLD.summary, OLD.summary_seq)
+       AND to_jsonb(NEW) - 'summary' - 'summary_seq' - 'updated_at'
+           = to_jsonb(OLD) - 'summary' - 'summary_seq' - 'updated_at' THEN
+        NEW.updated_at = OLD.updated_at;
+        RETURN NEW;
+    END IF;
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Create trigger to automatically update updated_at
 CREATE TRIGGER update_conversations_updated_at 
     BEFORE UPDATE ON conversations 
     FOR EACH ROW 
-    EXECUTE FUNCTION update_updated_at_column();
+    EXECUTE FUNCTION update_conversation_updated_at_column();
+
+-- Assign the next per-session sequence number to messages inserted without one.
+-- The row lock on the conversation serializes concurrent writers, so seq is
+-- strictly increasing within a session in commit order.
+CREATE OR REPLACE FUNCTION assign_message_seq()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.seq IS NULL THEN
+        UPDATE conversations
+        SET last_seq = last_seq + 1
+        WHERE session_id = NEW.session_id
+        RETURNING last_seq INTO NEW.seq;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER assign_messages_seq
+    BEFORE INSERT ON messages
+    FOR EACH ROW
+    EXECUTE FUNCTION assign_message_seq();
+
+-- Combined session write functions
+-- SupabaseSession calls these through RPC so each write is a single round trip
+-- and a single transaction. If they are not installed, the session falls back
+-- to separate PostgREST statements.
+
+-- Insert a batch of serialized items and bump the conversation timestamp.
+-- p_items is a JSON array of strings (each one the serialized message_data).
+-- p_meta is an optional parallel array of
+-- {"role": ..., "item_type": ..., "content_text": ...}.
+DROP FUNCTION IF EXISTS add_session_items(VARCHAR, VARCHAR, JSONB);
+CREATE OR REPLACE FUNCTION add_session_items(
+    p_session_id VARCHAR,
+    p_user_id VARCHAR,
+    p_items JSONB,
+    p_meta JSONB DEFAULT NULL
+)
+RETURNS TIMESTAMP WITH TIME ZONE AS $$
+DECLARE
+    v_count INTEGER := jsonb_array_length(p_items);
+    v_last_seq BIGINT;
+    v_updated_at TIMESTAMP WITH TIME ZONE;
+BEGIN
+    -- Create the conversation on first write (sessions may be created lazily)
+    INSERT INTO conversations (session_id, title, user_id)
+    VALUES (p_session_id, 'New Chat', p_user_id)
+    ON CONFLICT (session_id) DO NOTHING;
+
+    -- Reserve a block of sequence numbers and bump the conversation at once
+    UPDATE conversations
+    SET last_seq = last_seq + v_count, updated_at = NOW()
+    WHERE session_id = p_session_id AND user_id = p_user_id
+    RETURNING last_seq, updated_at INTO v_last_seq, v_updated_at;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Conversation % not found for user', p_session_id;
+    END IF;
+
+    INSERT INTO messages (
+        session_id, message_data, user_id, seq, created_at, role, item_type,
+        content_text
+    )
+    SELECT
+        p_session_id,
+        item.value #>> '{}',
+        p_user_id,
+        v_last_seq - v_count + item.ord,
+        clock_timestamp(),
+        meta.value->>'role',
+        meta.value->>'item_type',
+        meta.value->>'content_text'
+    FROM jsonb_array_elements(p_items) WITH ORDINALITY AS item(value, ord)
+    LEFT JOIN jsonb_array_elements(COALESCE(p_meta, '[]'::jsonb))
+        WITH ORDINALITY AS meta(value, ord) ON meta.ord = item.ord;
+
+    RETURN v_updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Delete and return the p_count most recent items, bumping the conversation timestamp.
+-- Returns {"message_data": [newest first, ...], "updated_at": ...}, or NULL if
+-- there was nothing to pop. Replaces the single-item pop_session_item.
+DROP FUNCTION IF EXISTS pop_session_item(VARCHAR, VARCHAR);
+CREATE OR REPLACE FUNCTION pop_session_items(
+    p_session_id VARCHAR,
+    p_user_id VARCHAR,
+    p_count INTEGER DEFAULT 1
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_items JSONB;
+    v_updated_at TIMESTAMP WITH TIME ZONE;
+BEGIN
+    -- Lock the conversation so concurrent writers to this session serialize
+    PERFORM 1 FROM conversations
+    WHERE session_id = p_session_id AND user_id = p_user_id
+    FOR UPDATE;
+
+    WITH popped AS (
+        DELETE FROM messages
+        WHERE id IN (
+            SELECT id FROM messages
+            WHERE session_id = p_session_id AND user_id = p_user_id
+            ORDER BY seq DESC
+            LIMIT p_count
+        )
+        RETURNING seq, message_data
+    )
+    SELECT jsonb_agg(to_jsonb(message_data) ORDER BY seq DESC)
+    INTO v_items
+    FROM popped;
+
+    IF v_items IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE conversations
+    SET updated_at = NOW()
+    WHERE session_id = p_session_id AND user_id = p_user_id
+    RETURNING updated_at INTO v_updated_at;
+
+    RETURN jsonb_build_object(
+        'message_data', v_items,
+        'updated_at', v_updated_at
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Delete all items of a session (and its summary) and bump the conversation timestamp.
+CREATE OR REPLACE FUNCTION clear_session_items(
+    p_session_id VARCHAR,
+    p_user_id VARCHAR
+)
+RETURNS TIMESTAMP WITH TIME ZONE AS $$
+DECLARE
+    v_updated_at TIMESTAMP WITH TIME ZONE;
+BEGIN
+    DELETE FROM messages
+    WHERE session_id = p_session_id AND user_id = p_user_id;
+
+    UPDATE conversations
+    SET summary = NULL, summary_seq = 0, updated_at = NOW()
+    WHERE session_id = p_session_id AND user_id = p_user_id
+    RETURNING updated_at INTO v_updated_at;
+
+    RETURN v_updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Replace pending client tool outputs in place and bump the conversation timestamp.
+-- p_results maps tool call ids to result strings. Matches function_call_output
+-- items by call_id (patching output) and tool messages by tool_call_id
+-- (patching content), as long as the output is still the pending placeholder.
+-- Returns {"patched": <row count>, "updated_at": ...}; updated_at is NULL
+-- when nothing was patched.
+CREATE OR REPLACE FUNCTION patch_tool_results(
+    p_session_id VARCHAR,
+    p_user_id VARCHAR,
+    p_results JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_patched INTEGER;
+    v_updated_at TIMESTAMP WITH TIME ZONE;
+BEGIN
+    WITH pending AS MATERIALIZED (
+        -- Cheap text prefilter before parsing any JSON
+        SELECT id, message_data::jsonb AS item
+        FROM messages
+        WHERE session_id = p_session_id
+          AND user_id = p_user_id
+          AND message_data LIKE '%PENDING_CLIENT_EXECUTION%'
+    ),
+    targets AS (
+        SELECT
+            id,
+            item,
+            CASE WHEN item->>'type' = 'function_call_output'
+                THEN 'output' ELSE 'content' END AS field,
+            CASE WHEN item->>'type' = 'function_call_output'
+                THEN item->>'call_id' ELSE item->>'tool_call_id' END AS call_id
+        FROM pending
+        WHERE item->>'type' = 'function_call_output' OR item->>'role' = 'tool'
+    )
+    -- Patched rows stay plain text, as in the session fallbacks
+    UPDATE messages
+    SET message_data = jsonb_set(
+        targets.item,
+        ARRAY[targets.field],
+        to_jsonb(p_results->>targets.call_id)
+    )::text
+    FROM targets
+    WHERE messages.id = targets.id
+      AND p_results ? targets.call_id
+      AND targets.item->>targets.field LIKE '%PENDING_CLIENT_EXECUTION%';
+
+    GET DIAGNOSTICS v_patched = ROW_COUNT;
+
+    IF v_patched > 0 THEN
+        UPDATE conversations
+        SET updated_at = NOW()
+        WHERE session_id = p_session_id AND user_id = p_user_id
+        RETURNING updated_at INTO v_updated_at;
+    END IF;
+
+    RETURN jsonb_build_object('patched', v_patched, 'updated_at', v_updated_at);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Combined read functions
+-- ChatService calls these through RPC (and PostgresChatService directly) so a
+-- chat opens in a single round trip. If they are not installed, the Supabase
+-- service falls back to separate PostgREST statements.
+
+-- One page of a conversation: the conversation row, up to p_limit messages
+-- newest first (before p_before_seq when given, otherwise skipping p_offset)
+-- and, when p_with_count, the total number of messages.
+-- Returns NULL if the conversation does not exist for the user.
+CREATE OR REPLACE FUNCTION get_conversation_page(
+    p_session_id VARCHAR,
+    p_user_id VARCHAR,
+    p_limit INTEGER,
+    p_offset INTEGER DEFAULT 0,
+    p_before_seq BIGINT DEFAULT NULL,
+    p_with_count BOOLEAN DEFAULT TRUE
+)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'conversation', jsonb_build_object(
+            'id', c.id,
+            'session_id', c.session_id,
+            'title', c.title,
+            'user_id', c.user_id,
+            'is_archived', c.is_archived,
+            'is_starred', c.is_starred,
+            'created_at', c.created_at,
+            'updated_at', c.updated_at
+        ),
+        'messages', COALESCE((
+            SELECT jsonb_agg(to_jsonb(page) ORDER BY page.seq DESC)
+            FROM (
+                SELECT id, session_id, message_data, user_id, created_at,
+                       seq, role, item_type
+                FROM messages
+                WHERE session_id = p_session_id AND user_id = p_user_id
+                  AND (p_before_seq IS NULL OR seq < p_before_seq)
+                ORDER BY seq DESC
+                LIMIT p_limit
+                OFFSET CASE WHEN p_before_seq IS NULL THEN p_offset ELSE 0 END
+            ) AS page
+        ), '[]'::jsonb),
+        'total_messages', CASE WHEN p_with_count THEN (
+            SELECT COUNT(*) FROM messages
+            WHERE session_id = p_session_id AND user_id = p_user_id
+        ) END
+    )
+    FROM conversations c
+    WHERE c.session_id = p_session_id AND c.user_id = p_user_id;
+$$ LANGUAGE sql STABLE;
+
+-- Full-text search over a user's messages, best matches first.
+-- p_query is free text in web search syntax ("quoted phrases", -excluded).
+-- Returns a JSON array of up to p_limit hits ordered by (rank, id)
+-- descending, after (p_before_rank, p_before_id) when given. Snippets are
+-- only built for the returned page, with matches wrapped in **.
+CREATE OR REPLACE FUNCTION search_messages(
+    p_user_id VARCHAR,
+    p_query TEXT,
+    p_limit INTEGER,
+    p_before_rank DOUBLE PRECISION DEFAULT NULL,
+    p_before_id UUID DEFAULT NULL
+)
+RETURNS JSONB AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', p_query) AS q
+    ),
+    page AS (
+        SELECT m.id, m.session_id, m.seq, m.role, m.created_at, m.content_text,
+               ts_rank(m.content_tsv, query.q)::DOUBLE PRECISION AS rank
+        FROM messages m, query
+        WHERE m.user_id = p_user_id
+          AND m.content_tsv @@ query.q
+          AND (
+              p_before_rank IS NULL
+              OR (ts_rank(m.content_tsv, query.q)::DOUBLE PRECISION, m.id)
+                  < (p_before_rank, p_before_id)
+          )
+        ORDER BY rank DESC, m.id DESC
+        LIMIT p_limit
+    )
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'id', page.id,
+        'session_id', page.session_id,
+        'title', c.title,
+        'seq', page.seq,
+        'role', page.role,
+        'created_at', page.created_at,
+        'rank', page.rank,
+        'snippet', ts_headline(
+            'english', page.content_text, query.q,
+            'StartSel=**, StopSel=**, MaxWords=24, MinWords=8, MaxFragments=2'
+        )
+    ) ORDER BY page.rank DESC, page.id DESC), '[]'::jsonb)
+    FROM page
+    JOIN conversations c ON c.session_id = page.session_id
+    CROSS JOIN query;
+$$ LANGUAGE sql STABLE;
 
 -- Create refresh_tokens table
 CREATE TABLE IF NOT EXISTS refresh_tokens (
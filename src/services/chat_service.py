@@ -1,10 +1,52 @@
+import asyncio
 from datetime import datetime
-from typing import Optional, List
+from typing import AsyncIterator, List, Literal, Optional, Tuple
 
+from postgrest.types import CountMethod, ReturnMethod
 from pydantic import BaseModel
-from supabase import acreate_client, AsyncClient
-
+from supabase import AsyncClient
+
+from src.config import get_config
+from src.openai_agents_extensions.conversation_list_cache import (
+    get_conversation_list_cache,
+    invalidate_conversation_lists,
+)
+from src.openai_agents_extensions.message_codec import decode_message_data
 from src.openai_agents_extensions.sessions_config import get_sessions_config
+from src.services.pagination import (
+    conversation_cursor,
+    decode_conversation_cursor,
+    decode_message_cursor,
+    decode_search_cursor,
+    message_cursor,
+    search_cursor,
+)
+from src.supabase_clients import call_function, get_supabase_client
+
+
+# How totals are counted: "exact" runs COUNT(*), "planned" uses the query
+# planner's row estimate and "estimated" is exact for small results and
+# planned beyond that (the PostgREST count modes)
+CountMode = Literal["exact", "planned", "estimated"]
+
+# Operations supported by run_batch_operation, and the column values set by
+# the update operations
+BatchOperation = Literal["archive", "star", "delete"]
+BATCH_UPDATE_VALUES = {"archive": {"is_archived": True}, "star": {"is_starred": True}}
+
+# Version of a user's conversation list: the latest updated_at (None when
+# the list is empty) and the number of conversations. Writes bump the first,
+# deletes and moves between the archived and active lists change the second
+ListVersion = Tuple[Optional[datetime], int]
+
+# Message columns returned by get_conversation
+MESSAGE_COLUMNS = (
+    "id, session_id, message_data, user_id, created_at, seq, role, item_type"
+)
+
+
+class SearchUnavailableError(RuntimeError):
+    """Raised when the storage backend has no message search index"""
 
 
 class ChatConversation(BaseModel):
@@ -28,13 +70,21 @@ class ChatMessage(BaseModel):
     message_data: str
     user_id: str
     created_at: datetime
+    seq: Optional[int] = None
+    # Projected from message_data at insert time (None for older rows)
+    role: Optional[str] = None
+    item_type: Optional[str] = None
 
 
 class ConversationListResult(BaseModel):
     """Result model for conversation list"""
 
     conversations: List[ChatConversation]
+    # All matching conversations when a count mode was requested, otherwise
+    # the number of conversations in this page
     total: int
+    # Cursor for the next page, None on the last page
+    next_cursor: Optional[str] = None
 
 
 class DeleteResult(BaseModel):
@@ -49,8 +99,35 @@ class ConversationResult(BaseModel):
 
     conversation: ChatConversation
     messages: List[ChatMessage]
-    total_messages: int
+    # None when the count was not requested
+    total_messages: Optional[int]
     has_more: bool
+    # Cursor for the next (older) page of messages, None on the last page
+    next_cursor: Optional[str] = None
+
+
+class MessageSearchHit(BaseModel):
+    """A message matching a search query"""
+
+    id: str
+    session_id: str
+    # Title of the conversation the message belongs to
+    title: str
+    seq: Optional[int] = None
+    role: Optional[str] = None
+    created_at: datetime
+    # Excerpt of the message text with the matches wrapped in **
+    snippet: str
+    # Relevance, higher is better (only comparable within one search)
+    rank: float
+
+
+class MessageSearchResult(BaseModel):
+    """Result model for search_messages"""
+
+    hits: List[MessageSearchHit]
+    # Cursor for the next page of hits, None on the last page
+    next_cursor: Optional[str] = None
 
 
 class ChatService:
@@ -60,34 +137,139 @@ class ChatService:
         self._client: Optional[AsyncClient] = None
 
     async def _get_client(self) -> AsyncClient:
-        """Get or create Supabase client"""
+        """Get the shared Supabase client"""
         if self._client is None:
             session_config = get_sessions_config()
-            self._client = await acreate_client(
+            self._client = await get_supabase_client(
                 session_config.supabase_url, session_config.supabase_key
             )
         return self._client
 
-    async def list_conversations(
-        self, user_id: str, is_archived: bool = False, limit: int = 20, offset: int = 0
-    ) -> ConversationListResult:
-        """List conversations for a user with optional filtering and pagination"""
+    async def _update_conversation(
+        self,
+        session_id: str,
+        user_id: str,
+        values: dict,
+        conditions: Optional[dict] = None,
+    ) -> None:
+        """Update an owned conversation, raising ValueError if it doesn't exist.
+
+        `conditions` are extra column values the row must still have.
+        """
         client = await self._get_client()
 
-        # Query conversations from database with filtering and pagination
+        # The ownership check and the update are one request; the updated
+        # rows are returned, so an empty result means nothing matched
+        query = (
+            client.table("conversations")
+            .update(values)
+            .eq("session_id", session_id)
+            .eq("user_id", user_id)
+        )
+        for column, value in (conditions or {}).items():
+            query = query.eq(column, value)
+        result = await query.execute()
+
+        if not result.data:
+            raise ValueError("Conversation not found or access denied")
+        invalidate_conversation_lists(user_id)
+
+    async def list_conversations_cached(
+        self,
+        user_id: str,
+        is_archived: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountMode] = None,
+    ) -> ConversationListResult:
+        """list_conversations, served from the in-process list cache when enabled"""
+        cache = get_conversation_list_cache()
+        if cache is None:
+            return await self.list_conversations(
+                user_id, is_archived, limit, offset, cursor, count
+            )
+
+        query = (is_archived, limit, offset, cursor, count)
+        result = cache.get(user_id, query)
+        if result is None:
+            generation = cache.generation
+            result = await self.list_conversations(
+                user_id, is_archived, limit, offset, cursor, count
+            )
+            cache.put(user_id, query, result, generation)
+        return result
+
+    async def get_conversation_list_version(
+        self, user_id: str, is_archived: bool = False
+    ) -> ListVersion:
+        """Read the version of a user's conversation list without loading it.
+
+        See ListVersion; both values come from one query on the list index.
+        """
+        client = await self._get_client()
         result = (
             await client.table("conversations")
-            .select("*")
+            .select("updated_at", count="exact")
             .eq("user_id", user_id)
             .eq("is_archived", is_archived)
             .order("updated_at", desc=True)
-            .limit(limit)
-            .offset(offset)
+            .limit(1)
+            .execute()
+        )
+        if not result.data:
+            return None, 0
+        return datetime.fromisoformat(result.data[0]["updated_at"]), result.count
+
+    async def list_conversations(
+        self,
+        user_id: str,
+        is_archived: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountMode] = None,
+    ) -> ConversationListResult:
+        """List conversations for a user with optional filtering and pagination.
+
+        A `cursor` from a previous page takes precedence over `offset`. With
+        a `count` mode, `total` is the number of all matching conversations.
+        """
+        client = await self._get_client()
+        count_method = CountMethod(count) if count else None
+
+        # Query conversations from database with filtering and pagination.
+        # The count covers the filters but not limit/offset, so it can ride
+        # along with the page unless a cursor narrows the rows.
+        query = (
+            client.table("conversations")
+            .select("*", count=None if cursor else count_method)
+            .eq("user_id", user_id)
+            .eq("is_archived", is_archived)
+        )
+        if cursor:
+            # Seek past the last conversation of the previous page
+            updated_at, conversation_id = decode_conversation_cursor(cursor)
+            query = query.or_(
+                f'updated_at.lt."{updated_at}",'
+                f'and(updated_at.eq."{updated_at}",id.lt.{conversation_id})'
+            )
+        elif offset:
+            query = query.offset(offset)
+
+        # One extra row tells whether there is a next page
+        result = (
+            await query.order("updated_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
             .execute()
         )
+        rows = result.data or []
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
         conversations = []
-        for row in result.data or []:
+        for row in rows:
             conversations.append(
                 ChatConversation(
                     id=row["id"],
@@ -101,34 +283,47 @@ class ChatService:
                 )
             )
 
+        next_cursor = None
+        if has_more:
+            next_cursor = conversation_cursor(rows[-1]["updated_at"], rows[-1]["id"])
+
+        total = len(conversations)
+        if count_method is not None:
+            if cursor:
+                count_result = (
+                    await client.table("conversations")
+                    .select("id", count=count_method, head=True)
+                    .eq("user_id", user_id)
+                    .eq("is_archived", is_archived)
+                    .execute()
+                )
+                total = count_result.count or 0
+            else:
+                total = result.count or 0
+
         return ConversationListResult(
-            conversations=conversations, total=len(conversations)
+            conversations=conversations,
+            total=total,
+            next_cursor=next_cursor,
         )
 
     async def delete_conversation(self, session_id: str, user_id: str) -> DeleteResult:
         """Delete a specific conversation"""
         client = await self._get_client()
 
-        # First, verify the conversation exists and belongs to the user
-        conversation_result = (
-            await client.table("conversations")
-            .select("id")
+        # Delete only if owned by the user (messages will be deleted
+        # automatically due to CASCADE); only the affected count is returned
+        result = await (
+            client.table("conversations")
+            .delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
             .eq("session_id", session_id)
             .eq("user_id", user_id)
             .execute()
         )
 
-        if not conversation_result.data:
+        if not result.count:
             raise ValueError("Conversation not found or access denied")
-
-        # Delete the conversation (messages will be deleted automatically due to CASCADE)
-        await (
-            client.table("conversations")
-            .delete()
-            .eq("session_id", session_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
+        invalidate_conversation_lists(user_id)
 
         return DeleteResult(message=f"Conversation {session_id} deleted successfully")
 
@@ -136,24 +331,22 @@ class ChatService:
         """Delete all conversations for a user"""
         client = await self._get_client()
 
-        # First, get count of conversations to be deleted
-        count_result = (
-            await client.table("conversations")
-            .select("id")
+        # Delete all conversations for the user (messages will be deleted
+        # automatically due to CASCADE); the delete reports how many matched
+        result = await (
+            client.table("conversations")
+            .delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
             .eq("user_id", user_id)
             .execute()
         )
 
-        conversation_count = len(count_result.data) if count_result.data else 0
-
+        conversation_count = result.count or 0
+        invalidate_conversation_lists(user_id)
         if conversation_count == 0:
             return DeleteResult(
                 message="No conversations found to delete", deleted_count=0
             )
 
-        # Delete all conversations for the user (messages will be deleted automatically due to CASCADE)
-        await client.table("conversations").delete().eq("user_id", user_id).execute()
-
         return DeleteResult(
             message="Successfully deleted all conversations",
             deleted_count=conversation_count,
@@ -161,162 +354,377 @@ class ChatService:
 
     async def archive_conversation(self, session_id: str, user_id: str) -> DeleteResult:
         """Archive a specific conversation"""
+        await self._update_conversation(session_id, user_id, {"is_archived": True})
+        return DeleteResult(message=f"Conversation {session_id} archived successfully")
+
+    async def star_conversation(self, session_id: str, user_id: str) -> DeleteResult:
+        """Star a specific conversation"""
+        await self._update_conversation(session_id, user_id, {"is_starred": True})
+        return DeleteResult(message=f"Conversation {session_id} starred successfully")
+
+    async def run_batch_operation(
+        self, user_id: str, session_ids: List[str], operation: BatchOperation
+    ) -> List[str]:
+        """Archive, star or delete many of a user's conversations at once.
+
+        Runs as one statement filtered on the user and the session ids.
+        Returns the session ids it applied to; ids that don't exist or
+        belong to another user are left out.
+        """
         client = await self._get_client()
 
-        # First, verify the conversation exists and belongs to the user
-        conversation_result = (
-            await client.table("conversations")
-            .select("id")
-            .eq("session_id", session_id)
-            .eq("user_id", user_id)
-            .execute()
+        if operation == "delete":
+            # Messages are deleted automatically due to CASCADE
+            query = client.table("conversations").delete()
+        else:
+            query = client.table("conversations").update(BATCH_UPDATE_VALUES[operation])
+        result = (
+            await query.eq("user_id", user_id).in_("session_id", session_ids).execute()
         )
 
-        if not conversation_result.data:
-            raise ValueError("Conversation not found or access denied")
-
-        # Archive the conversation
-        await (
-            client.table("conversations")
-            .update({"is_archived": True})
-            .eq("session_id", session_id)
-            .eq("user_id", user_id)
-            .execute()
+        applied = [row["session_id"] for row in result.data or []]
+        if applied:
+            invalidate_conversation_lists(user_id)
+        return applied
+
+    @staticmethod
+    def _message_from_row(row: dict) -> ChatMessage:
+        """Build a ChatMessage from a message row, decompressing its data"""
+        return ChatMessage(
+            id=str(row["id"]),
+            session_id=row["session_id"],
+            message_data=decode_message_data(row["message_data"]),
+            user_id=row["user_id"],
+            created_at=row["created_at"],
+            seq=row.get("seq"),
+            role=row.get("role"),
+            item_type=row.get("item_type"),
         )
 
-        return DeleteResult(message=f"Conversation {session_id} archived successfully")
+    @staticmethod
+    def _conversation_result(page: dict, limit: int) -> ConversationResult:
+        """Build a ConversationResult from a conversation page: the
+        conversation row, up to `limit` + 1 message rows newest first and
+        the message count (or None)"""
+        conversation_row = page["conversation"]
+        rows = page["messages"]
+        # One extra row tells whether there are older messages
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
-    async def star_conversation(self, session_id: str, user_id: str) -> DeleteResult:
-        """Star a specific conversation"""
-        client = await self._get_client()
+        # Reverse the messages to display them in chronological order
+        messages = [ChatService._message_from_row(row) for row in reversed(rows)]
 
-        # First, verify the conversation exists and belongs to the user
-        conversation_result = (
-            await client.table("conversations")
-            .select("id")
-            .eq("session_id", session_id)
-            .eq("user_id", user_id)
-            .execute()
+        return ConversationResult(
+            conversation=ChatConversation(
+                id=str(conversation_row["id"]),
+                session_id=conversation_row["session_id"],
+                title=conversation_row["title"],
+                user_id=conversation_row["user_id"],
+                is_archived=conversation_row.get("is_archived", False),
+                is_starred=conversation_row.get("is_starred", False),
+                created_at=conversation_row["created_at"],
+                updated_at=conversation_row["updated_at"],
+            ),
+            messages=messages,
+            total_messages=page["total_messages"],
+            has_more=has_more,
+            next_cursor=message_cursor(rows[-1]["seq"]) if has_more else None,
         )
 
-        if not conversation_result.data:
-            raise ValueError("Conversation not found or access denied")
+    async def get_conversation_version(
+        self, session_id: str, user_id: str
+    ) -> Optional[datetime]:
+        """Read a conversation's updated_at without loading its messages.
 
-        # Star the conversation
-        await (
-            client.table("conversations")
-            .update({"is_starred": True})
+        Every message write and conversation update bumps it. Returns None
+        if the conversation does not exist for the user.
+        """
+        client = await self._get_client()
+        result = (
+            await client.table("conversations")
+            .select("updated_at")
             .eq("session_id", session_id)
             .eq("user_id", user_id)
             .execute()
         )
-
-        return DeleteResult(message=f"Conversation {session_id} starred successfully")
+        if not result.data:
+            return None
+        return datetime.fromisoformat(result.data[0]["updated_at"])
 
     async def get_conversation(
-        self, session_id: str, user_id: str, limit: int = 10, offset: int = 0
+        self,
+        session_id: str,
+        user_id: str,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> ConversationResult:
-        """Get a specific conversation with paginated messages (reverse pagination - last N messages)"""
+        """Get a specific conversation with paginated messages (reverse pagination - last N messages).
+
+        A `cursor` from a previous page takes precedence over `offset`.
+        Counting all messages scans the whole conversation, so it can be
+        skipped with `include_total=False` (`total_messages` is then None).
+        """
+        before_seq = decode_message_cursor(cursor) if cursor else None
         client = await self._get_client()
 
-        # First, get the conversation details
-        conversation_result = (
-            await client.table("conversations")
+        page = None
+        if get_config().sessions_use_rpc:
+            # Conversation, message page and count in one round trip
+            result = await call_function(
+                client,
+                get_sessions_config().supabase_url,
+                "get_conversation_page",
+                {
+                    "p_session_id": session_id,
+                    "p_user_id": user_id,
+                    "p_limit": limit + 1,
+                    "p_offset": offset,
+                    "p_before_seq": before_seq,
+                    "p_with_count": include_total,
+                },
+            )
+            if result is not None:
+                if not result.data:
+                    raise ValueError("Conversation not found or access denied")
+                page = result.data
+
+        if page is None:
+            page = await self._get_conversation_page_fallback(
+                client,
+                session_id,
+                user_id,
+                limit + 1,
+                offset,
+                before_seq,
+                include_total,
+            )
+
+        return self._conversation_result(page, limit)
+
+    async def _get_conversation_page_fallback(
+        self,
+        client: AsyncClient,
+        session_id: str,
+        user_id: str,
+        limit: int,
+        offset: int,
+        before_seq: Optional[int],
+        include_total: bool,
+    ) -> dict:
+        """Load a conversation page with separate (concurrent) statements,
+        for databases without the get_conversation_page function"""
+        conversation_query = (
+            client.table("conversations")
             .select("*")
             .eq("session_id", session_id)
             .eq("user_id", user_id)
             .execute()
         )
 
-        if not conversation_result.data:
+        # Get messages with reverse pagination (last N messages)
+        # Order by seq DESC to get the most recent messages first
+        messages_query = (
+            client.table("messages")
+            .select(MESSAGE_COLUMNS)
+            .eq("session_id", session_id)
+            .eq("user_id", user_id)
+        )
+        if before_seq is not None:
+            messages_query = messages_query.lt("seq", before_seq)
+        elif offset:
+            messages_query = messages_query.offset(offset)
+        messages_query = messages_query.order("seq", desc=True).limit(limit).execute()
+
+        # Messages are filtered on user_id too, so they can be read before
+        # the conversation's ownership is confirmed
+        queries = [conversation_query, messages_query]
+        if include_total:
+            queries.append(
+                client.table("messages")
+                .select("id", count=CountMethod.exact, head=True)
+                .eq("session_id", session_id)
+                .eq("user_id", user_id)
+                .execute()
+            )
+        results = await asyncio.gather(*queries)
+
+        if not results[0].data:
             raise ValueError("Conversation not found or access denied")
 
-        conversation_data = conversation_result.data[0]
-        conversation = ChatConversation(
-            id=conversation_data["id"],
-            session_id=conversation_data["session_id"],
-            title=conversation_data["title"],
-            user_id=conversation_data["user_id"],
-            is_archived=conversation_data.get("is_archived", False),
-            is_starred=conversation_data.get("is_starred", False),
-            created_at=conversation_data["created_at"],
-            updated_at=conversation_data["updated_at"],
+        return {
+            "conversation": results[0].data[0],
+            "messages": results[1].data or [],
+            "total_messages": (results[2].count or 0) if include_total else None,
+        }
+
+    @staticmethod
+    def _search_result(rows: List[dict], limit: int) -> MessageSearchResult:
+        """Build a MessageSearchResult from up to `limit` + 1 hit rows,
+        best match first"""
+        # One extra row tells whether there are more hits
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return MessageSearchResult(
+            hits=[
+                MessageSearchHit(
+                    id=str(row["id"]),
+                    session_id=row["session_id"],
+                    title=row["title"],
+                    seq=row.get("seq"),
+                    role=row.get("role"),
+                    created_at=row["created_at"],
+                    snippet=row["snippet"],
+                    rank=row["rank"],
+                )
+                for row in rows
+            ],
+            next_cursor=(
+                search_cursor(rows[-1]["rank"], rows[-1]["id"]) if has_more else None
+            ),
         )
 
-        # Get total count of messages for this conversation
-        total_count_result = (
-            await client.table("messages")
-            .select("id", count="exact")
-            .eq("session_id", session_id)
-            .eq("user_id", user_id)
-            .execute()
+    async def search_messages(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> MessageSearchResult:
+        """Full-text search over the text of a user's messages.
+
+        Served by the search_messages database function (the GIN index on
+        messages.content_tsv); hits are ranked best match first and paged
+        with `cursor`.
+        """
+        before_rank, before_id = (
+            decode_search_cursor(cursor) if cursor else (None, None)
         )
+        client = await self._get_client()
 
-        total_messages = total_count_result.count or 0
+        result = await call_function(
+            client,
+            get_sessions_config().supabase_url,
+            "search_messages",
+            {
+                "p_user_id": user_id,
+                "p_query": query,
+                "p_limit": limit + 1,
+                "p_before_rank": before_rank,
+                "p_before_id": before_id,
+            },
+        )
+        if result is None:
+            # There is no PostgREST equivalent of the ranked, highlighted search
+            raise SearchUnavailableError(
+                "Message search needs the search_messages function "
+                "(see src/migrations/005_message_search.sql)"
+            )
 
-        # Get messages with reverse pagination (last N messages)
-        # Order by created_at DESC to get the most recent messages first
-        messages_result = (
+        return self._search_result(result.data or [], limit)
+
+    async def _message_chunk(
+        self, session_id: str, user_id: str, after_seq: int, limit: int
+    ) -> List[ChatMessage]:
+        """Up to `limit` messages of a conversation after `after_seq`, in order"""
+        client = await self._get_client()
+        result = (
             await client.table("messages")
-            .select("*")
+            .select(MESSAGE_COLUMNS)
             .eq("session_id", session_id)
             .eq("user_id", user_id)
-            .order("created_at", desc=True)
+            .gt("seq", after_seq)
+            .order("seq")
             .limit(limit)
-            .offset(offset)
             .execute()
         )
+        return [self._message_from_row(row) for row in result.data or []]
 
-        messages = []
-        for row in messages_result.data or []:
-            messages.append(
-                ChatMessage(
-                    id=row["id"],
-                    session_id=row["session_id"],
-                    message_data=row["message_data"],
-                    user_id=row["user_id"],
-                    created_at=row["created_at"],
-                )
+    async def _conversation_chunk(
+        self, user_id: str, after_id: Optional[str], limit: int
+    ) -> List[ChatConversation]:
+        """Up to `limit` of a user's conversations after `after_id`, by id"""
+        client = await self._get_client()
+        query = client.table("conversations").select("*").eq("user_id", user_id)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        result = await query.order("id").limit(limit).execute()
+        return [
+            ChatConversation(
+                id=row["id"],
+                session_id=row["session_id"],
+                title=row["title"],
+                user_id=row["user_id"],
+                is_archived=row.get("is_archived", False),
+                is_starred=row.get("is_starred", False),
+                created_at=row["created_at"],
+                updated_at=row["updated_at"],
             )
-
-        # Reverse the messages to display them in chronological order
-        messages.reverse()
-
-        # Calculate if there are more messages
-        has_more = (offset + limit) < total_messages
-
-        return ConversationResult(
-            conversation=conversation,
-            messages=messages,
-            total_messages=total_messages,
-            has_more=has_more,
-        )
+            for row in result.data or []
+        ]
+
+    async def iter_messages(
+        self, session_id: str, user_id: str, chunk_size: int = 500
+    ) -> AsyncIterator[List[ChatMessage]]:
+        """Walk all messages of a conversation in order, `chunk_size` at a time.
+
+        Each chunk is one keyset query on (session_id, seq), so only one
+        chunk is held in memory and nothing is counted or re-read.
+        """
+        after_seq = 0
+        while True:
+            chunk = await self._message_chunk(
+                session_id, user_id, after_seq, chunk_size
+            )
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after_seq = chunk[-1].seq
+
+    async def iter_conversations(
+        self, user_id: str, chunk_size: int = 100
+    ) -> AsyncIterator[List[ChatConversation]]:
+        """Walk all of a user's conversations (archived too), `chunk_size` at a time"""
+        after_id = None
+        while True:
+            chunk = await self._conversation_chunk(user_id, after_id, chunk_size)
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after_id = chunk[-1].id
 
     async def update_conversation_title(
-        self, session_id: str, user_id: str, new_title: str
+        self,
+        session_id: str,
+        user_id: str,
+        new_title: str,
+        expected_title: Optional[str] = None,
     ) -> DeleteResult:
-        """Update the title of a specific conversation"""
-        client = await self._get_client()
-
-        # First, verify the conversation exists and belongs to the user
-        conversation_result = (
-            await client.table("conversations")
-            .select("id")
-            .eq("session_id", session_id)
-            .eq("user_id", user_id)
-            .execute()
+        """Update the title of a specific conversation.
+
+        With `expected_title`, the title is only replaced if it is unchanged
+        (ValueError otherwise), so a concurrent rename is not overwritten.
+        """
+        conditions = {"title": expected_title} if expected_title is not None else None
+        await self._update_conversation(
+            session_id, user_id, {"title": new_title}, conditions
         )
+        return DeleteResult(message=f"Conversation title updated to: {new_title}")
 
-        if not conversation_result.data:
-            raise ValueError("Conversation not found or access denied")
 
-        # Update the conversation title
-        await (
-            client.table("conversations")
-            .update({"title": new_title})
-            .eq("session_id", session_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
+def get_chat_service() -> ChatService:
+    """Create a chat service for the configured session storage backend"""
+    sessions_backend = get_config().sessions_backend
+    if sessions_backend == "sqlite":
+        from src.services.sqlite_chat_service import SqliteChatService
 
-        return DeleteResult(message=f"Conversation title updated to: {new_title}")
+        return SqliteChatService()
+    if sessions_backend == "postgres":
+        from src.services.postgres_chat_service import PostgresChatService
+
+        return PostgresChatService()
+    return ChatService()
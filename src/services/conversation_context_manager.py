@@ -12,8 +12,12 @@ class ConversationContextManager:
         return self._session
 
     async def get_message_with_context(self, current_message, memories=None):
+        """Merge conversation context with memories for agents
+
+        The session memoizes the full history for the rest of the request, so
+        the Runner reuses this fetch instead of downloading it again.
+        """
         conversation = await self._session.get_items()
-        """Merge conversation context with memories for agents"""
         if memories is None:
             memories = []
 
@@ -0,0 +1,52 @@
+"""Streaming NDJSON export of conversations.
+
+The export is a sequence of JSON lines: a ``conversation`` record followed
+by the ``message`` records of that conversation in order, then the next
+conversation. Messages are read in seq-ordered chunks and written as they
+arrive, so memory stays bounded by one chunk however long the history is.
+"""
+
+import json
+from typing import AsyncIterator
+
+from src.services.chat_service import ChatConversation, ChatMessage, ChatService
+
+# Messages read (and written) per database round trip
+EXPORT_CHUNK_SIZE = 500
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _conversation_line(conversation: ChatConversation) -> str:
+    record = conversation.model_dump(mode="json")
+    return json.dumps({"type": "conversation", **record}) + "\n"
+
+
+def _message_line(message: ChatMessage) -> str:
+    record = message.model_dump(mode="json", exclude={"message_data"})
+    try:
+        item = json.loads(message.message_data)
+    except ValueError:
+        item = message.message_data
+    return json.dumps({"type": "message", **record, "item": item}) + "\n"
+
+
+async def export_conversation(
+    chat_service: ChatService, conversation: ChatConversation
+) -> AsyncIterator[bytes]:
+    """Stream one conversation and all of its messages as NDJSON."""
+    yield _conversation_line(conversation).encode()
+    async for messages in chat_service.iter_messages(
+        conversation.session_id, conversation.user_id, EXPORT_CHUNK_SIZE
+    ):
+        yield "".join(_message_line(message) for message in messages).encode()
+
+
+async def export_all_conversations(
+    chat_service: ChatService, user_id: str
+) -> AsyncIterator[bytes]:
+    """Stream all of a user's conversations, archived ones too, as NDJSON."""
+    async for conversations in chat_service.iter_conversations(user_id):
+        for conversation in conversations:
+            async for data in export_conversation(chat_service, conversation):
+                yield data
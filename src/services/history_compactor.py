@@ -0,0 +1,94 @@
+from agents import Runner
+
+from src.config import get_config
+from src.core.agent_factory import get_agent_by_key
+from src.core.agent_key import AgentKey
+from src.logging_config import get_logger
+from src.openai_agents_extensions.compaction import (
+    may_need_compaction,
+    render_items_for_summary,
+    select_compaction_seq,
+)
+from src.openai_agents_extensions.session_factory import get_session_factory
+
+logger = get_logger(__name__)
+
+
+class HistoryCompactor:
+    """Service for folding older conversation turns into a stored summary"""
+
+    @staticmethod
+    async def compact_in_background(session_id: str, user_id: str):
+        """
+        Background task function to compact a conversation's history.
+        Does nothing until the unsummarized history passes the configured
+        item or token threshold.
+        """
+        try:
+            config = get_config()
+            session = await get_session_factory().create_session(session_id, user_id)
+
+            # Only load the items when the conversation can be over a threshold
+            if not may_need_compaction(
+                await session.get_unsummarized_count(),
+                max_items=config.sessions_compaction_max_items,
+                max_tokens=config.sessions_compaction_max_tokens,
+                keep_items=config.sessions_compaction_keep_items,
+            ):
+                return
+
+            state = await session.get_compaction_state()
+
+            summary_seq = select_compaction_seq(
+                state.items,
+                max_items=config.sessions_compaction_max_items,
+                max_tokens=config.sessions_compaction_max_tokens,
+                keep_items=config.sessions_compaction_keep_items,
+            )
+            if summary_seq is None:
+                return
+
+            items_to_fold = [item for seq, item in state.items if seq <= summary_seq]
+            transcript = render_items_for_summary(items_to_fold)
+
+            # Create prompt for the updated summary
+            previous_summary = (
+                f"Summary of the conversation so far:\n{state.summary}\n\n"
+                if state.summary
+                else ""
+            )
+            summary_prompt = f"""{previous_summary}Newer messages:
+{transcript}
+
+Write an updated summary of the whole conversation. Generate only the summary, nothing else."""
+
+            compactor_agent = await get_agent_by_key(AgentKey.HISTORY_COMPACTOR)
+            result = await Runner.run(
+                starting_agent=compactor_agent,
+                input=summary_prompt,
+                context=None,
+                session=None,
+                max_turns=1,
+            )
+
+            summary = result.final_output.strip()
+            if not summary:
+                logger.warning(f"No summary generated for conversation {session_id}")
+                return
+
+            # Only applies if no other compaction finished in the meantime
+            if await session.store_summary(summary, summary_seq, state.summary_seq):
+                logger.info(
+                    f"Compacted {len(items_to_fold)} items of conversation "
+                    f"{session_id} (summary_seq {summary_seq})"
+                )
+            else:
+                logger.info(
+                    f"Conversation {session_id} was compacted concurrently, "
+                    "discarding summary"
+                )
+
+        except Exception as e:
+            logger.error(
+                f"Failed to compact history for {session_id}: {str(e)}", exc_info=True
+            )
@@ -0,0 +1,102 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor is the URL-safe base64 of a JSON array holding the sort key of the
+last row of a page: ``[updated_at, id]`` for conversations (newest first),
+``[seq]`` for messages (newest first) and ``[rank, id]`` for message search
+hits (best match first). The next page starts strictly after that key, so
+the database seeks through the index instead of scanning and discarding
+``offset`` rows.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(*values) -> str:
+    """Encode sort key values into an opaque cursor."""
+    payload = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List:
+    """Decode an opaque cursor back into its sort key values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+    if not isinstance(values, list):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return values
+
+
+def conversation_cursor(updated_at, conversation_id) -> str:
+    """Cursor after a conversation, from its stored updated_at and id."""
+    if isinstance(updated_at, datetime):
+        updated_at = updated_at.isoformat()
+    return encode_cursor(updated_at, str(conversation_id))
+
+
+def decode_conversation_cursor(cursor: str) -> Tuple[str, str]:
+    """Return the (updated_at, id) key of a conversation cursor.
+
+    Both values are validated, as they end up in database filters.
+    """
+    values = decode_cursor(cursor)
+    try:
+        updated_at, conversation_id = values
+        datetime.fromisoformat(updated_at)
+        uuid.UUID(conversation_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid conversation cursor") from e
+    return updated_at, conversation_id
+
+
+def message_cursor(seq: int) -> str:
+    """Cursor before a message, from its sequence number."""
+    return encode_cursor(seq)
+
+
+def decode_message_cursor(cursor: str) -> int:
+    """Return the seq of a message cursor."""
+    values = decode_cursor(cursor)
+    if len(values) != 1 or type(values[0]) is not int:
+        raise InvalidCursorError("Invalid message cursor")
+    return values[0]
+
+
+def decode_seq_cursor(cursor: Optional[str]) -> int:
+    """Return the seq of a session ``get_items_since`` cursor.
+
+    These cursors are the plain last seen seq; None starts from the beginning.
+    """
+    if cursor is None:
+        return 0
+    if not cursor.isascii() or not cursor.isdigit():
+        raise InvalidCursorError("Invalid items cursor")
+    return int(cursor)
+
+
+def search_cursor(rank: float, message_id) -> str:
+    """Cursor after a message search hit, from its rank and id."""
+    return encode_cursor(rank, str(message_id))
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, str]:
+    """Return the (rank, id) key of a message search cursor."""
+    values = decode_cursor(cursor)
+    try:
+        rank, message_id = values
+        if type(rank) not in (int, float):
+            raise TypeError("rank must be a number")
+        uuid.UUID(message_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid search cursor") from e
+    return float(rank), message_id
@@ -0,0 +1,367 @@
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
+
+from src.openai_agents_extensions.conversation_list_cache import (
+    invalidate_conversation_lists,
+)
+from src.openai_agents_extensions.postgres_database import get_postgres_pool
+from src.services.chat_service import (
+    MESSAGE_COLUMNS,
+    BATCH_UPDATE_VALUES,
+    BatchOperation,
+    ChatConversation,
+    ChatMessage,
+    ChatService,
+    ConversationListResult,
+    CountMode,
+    ConversationResult,
+    ListVersion,
+    DeleteResult,
+    MessageSearchResult,
+)
+from src.services.pagination import (
+    conversation_cursor,
+    decode_conversation_cursor,
+    decode_message_cursor,
+    decode_search_cursor,
+)
+
+if TYPE_CHECKING:
+    import asyncpg
+
+# "estimated" counts switch from an exact count to the planner estimate
+# above this many rows
+ESTIMATED_COUNT_EXACT_LIMIT = 1000
+
+
+class PostgresChatService(ChatService):
+    """Chat operations over a direct Postgres connection pool"""
+
+    def __init__(self, pool: Optional["asyncpg.Pool"] = None):
+        super().__init__()
+        self._pool = pool
+
+    async def _get_pool(self) -> "asyncpg.Pool":
+        """Get the shared Postgres connection pool"""
+        if self._pool is None:
+            self._pool = await get_postgres_pool()
+        return self._pool
+
+    @staticmethod
+    def _conversation_from_row(row: "asyncpg.Record") -> ChatConversation:
+        return ChatConversation(
+            id=str(row["id"]),
+            session_id=row["session_id"],
+            title=row["title"],
+            user_id=row["user_id"],
+            is_archived=bool(row["is_archived"]),
+            is_starred=bool(row["is_starred"]),
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    async def _update_conversation(
+        self,
+        session_id: str,
+        user_id: str,
+        values: dict,
+        conditions: Optional[dict] = None,
+    ) -> None:
+        """Update an owned conversation, raising ValueError if it doesn't exist"""
+        conditions = conditions or {}
+        params = [*values.values(), *conditions.values()]
+        assignments = ", ".join(
+            f"{column} = ${index}" for index, column in enumerate(values, start=3)
+        )
+        extra_filters = "".join(
+            f" AND {column} = ${index}"
+            for index, column in enumerate(conditions, start=3 + len(values))
+        )
+
+        pool = await self._get_pool()
+        # The ownership check and the update are one statement
+        updated = await pool.fetchval(
+            f"UPDATE conversations SET {assignments} "
+            f"WHERE session_id = $1 AND user_id = $2{extra_filters} RETURNING 1",
+            session_id,
+            user_id,
+            *params,
+        )
+        if updated is None:
+            raise ValueError("Conversation not found or access denied")
+        invalidate_conversation_lists(user_id)
+
+    async def _count_conversations(
+        self, user_id: str, is_archived: bool, count: CountMode
+    ) -> int:
+        """Count a user's conversations with the given count mode"""
+        pool = await self._get_pool()
+        where = "FROM conversations WHERE user_id = $1 AND is_archived = $2"
+
+        if count != "exact":
+            plan = await pool.fetchval(
+                f"EXPLAIN (FORMAT JSON) SELECT 1 {where}", user_id, is_archived
+            )
+            planned = json.loads(plan)[0]["Plan"]["Plan Rows"]
+            if count == "planned" or planned > ESTIMATED_COUNT_EXACT_LIMIT:
+                return planned
+
+        return await pool.fetchval(f"SELECT COUNT(*) {where}", user_id, is_archived)
+
+    async def get_conversation_list_version(
+        self, user_id: str, is_archived: bool = False
+    ) -> ListVersion:
+        """Read the version of a user's conversation list without loading it"""
+        pool = await self._get_pool()
+        # Answered from idx_conversations_user_archived_updated_id
+        row = await pool.fetchrow(
+            "SELECT MAX(updated_at), COUNT(*) FROM conversations "
+            "WHERE user_id = $1 AND is_archived = $2",
+            user_id,
+            is_archived,
+        )
+        return row[0], row[1]
+
+    async def list_conversations(
+        self,
+        user_id: str,
+        is_archived: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountMode] = None,
+    ) -> ConversationListResult:
+        """List conversations for a user with optional filtering and pagination.
+
+        A `cursor` from a previous page takes precedence over `offset`. With
+        a `count` mode, `total` is the number of all matching conversations.
+        """
+        pool = await self._get_pool()
+        # One extra row tells whether there is a next page
+        if cursor:
+            # Seek past the last conversation of the previous page
+            updated_at, conversation_id = decode_conversation_cursor(cursor)
+            rows = await pool.fetch(
+                "SELECT * FROM conversations WHERE user_id = $1 AND is_archived = $2 "
+                "AND (updated_at, id) < ($3, $4::uuid) "
+                "ORDER BY updated_at DESC, id DESC LIMIT $5",
+                user_id,
+                is_archived,
+                datetime.fromisoformat(updated_at),
+                conversation_id,
+                limit + 1,
+            )
+        else:
+            rows = await pool.fetch(
+                "SELECT * FROM conversations WHERE user_id = $1 AND is_archived = $2 "
+                "ORDER BY updated_at DESC, id DESC LIMIT $3 OFFSET $4",
+                user_id,
+                is_archived,
+                limit + 1,
+                offset,
+            )
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        conversations = [self._conversation_from_row(row) for row in rows]
+
+        next_cursor = None
+        if has_more:
+            next_cursor = conversation_cursor(rows[-1]["updated_at"], rows[-1]["id"])
+
+        return ConversationListResult(
+            conversations=conversations,
+            total=(
+                await self._count_conversations(user_id, is_archived, count)
+                if count
+                else len(conversations)
+            ),
+            next_cursor=next_cursor,
+        )
+
+    async def delete_conversation(self, session_id: str, user_id: str) -> DeleteResult:
+        """Delete a specific conversation"""
+        pool = await self._get_pool()
+        # Messages are deleted by the ON DELETE CASCADE foreign key
+        deleted = await pool.fetchval(
+            "DELETE FROM conversations WHERE session_id = $1 AND user_id = $2 "
+            "RETURNING 1",
+            session_id,
+            user_id,
+        )
+        if deleted is None:
+            raise ValueError("Conversation not found or access denied")
+        invalidate_conversation_lists(user_id)
+
+        return DeleteResult(message=f"Conversation {session_id} deleted successfully")
+
+    async def delete_all_conversations(self, user_id: str) -> DeleteResult:
+        """Delete all conversations for a user"""
+        pool = await self._get_pool()
+        conversation_count = await pool.fetchval(
+            "WITH deleted AS ("
+            "DELETE FROM conversations WHERE user_id = $1 RETURNING 1"
+            ") SELECT COUNT(*) FROM deleted",
+            user_id,
+        )
+        invalidate_conversation_lists(user_id)
+        if conversation_count == 0:
+            return DeleteResult(
+                message="No conversations found to delete", deleted_count=0
+            )
+
+        return DeleteResult(
+            message="Successfully deleted all conversations",
+            deleted_count=conversation_count,
+        )
+
+    async def archive_conversation(self, session_id: str, user_id: str) -> DeleteResult:
+        """Archive a specific conversation"""
+        await self._update_conversation(session_id, user_id, {"is_archived": True})
+        return DeleteResult(message=f"Conversation {session_id} archived successfully")
+
+    async def star_conversation(self, session_id: str, user_id: str) -> DeleteResult:
+        """Star a specific conversation"""
+        await self._update_conversation(session_id, user_id, {"is_starred": True})
+        return DeleteResult(message=f"Conversation {session_id} starred successfully")
+
+    async def run_batch_operation(
+        self, user_id: str, session_ids: List[str], operation: BatchOperation
+    ) -> List[str]:
+        """Archive, star or delete many of a user's conversations at once"""
+        where = "WHERE user_id = $1 AND session_id = ANY($2::varchar[])"
+        if operation == "delete":
+            # Messages are deleted by the ON DELETE CASCADE foreign key
+            statement = f"DELETE FROM conversations {where} RETURNING session_id"
+            values = {}
+        else:
+            values = BATCH_UPDATE_VALUES[operation]
+            assignments = ", ".join(
+                f"{column} = ${index}" for index, column in enumerate(values, start=3)
+            )
+            statement = (
+                f"UPDATE conversations SET {assignments} {where} RETURNING session_id"
+            )
+
+        pool = await self._get_pool()
+        rows = await pool.fetch(statement, user_id, session_ids, *values.values())
+
+        applied = [row["session_id"] for row in rows]
+        if applied:
+            invalidate_conversation_lists(user_id)
+        return applied
+
+    async def get_conversation_version(
+        self, session_id: str, user_id: str
+    ) -> Optional[datetime]:
+        """Read a conversation's updated_at without loading its messages"""
+        pool = await self._get_pool()
+        return await pool.fetchval(
+            "SELECT updated_at FROM conversations "
+            "WHERE session_id = $1 AND user_id = $2",
+            session_id,
+            user_id,
+        )
+
+    async def get_conversation(
+        self,
+        session_id: str,
+        user_id: str,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> ConversationResult:
+        """Get a specific conversation with paginated messages (reverse pagination - last N messages).
+
+        A `cursor` from a previous page takes precedence over `offset`.
+        Counting all messages scans the whole conversation, so it can be
+        skipped with `include_total=False` (`total_messages` is then None).
+        """
+        before_seq = decode_message_cursor(cursor) if cursor else None
+        pool = await self._get_pool()
+        # Conversation, message page and count in one statement; one extra
+        # message tells whether there are older ones
+        page = await pool.fetchval(
+            "SELECT get_conversation_page($1, $2, $3, $4, $5, $6)",
+            session_id,
+            user_id,
+            limit + 1,
+            offset,
+            before_seq,
+            include_total,
+        )
+        if page is None:
+            raise ValueError("Conversation not found or access denied")
+
+        return self._conversation_result(json.loads(page), limit)
+
+    async def _message_chunk(
+        self, session_id: str, user_id: str, after_seq: int, limit: int
+    ) -> List[ChatMessage]:
+        """Up to `limit` messages of a conversation after `after_seq`, in order"""
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            f"SELECT {MESSAGE_COLUMNS} FROM messages "
+            "WHERE session_id = $1 AND user_id = $2 AND seq > $3 "
+            "ORDER BY seq LIMIT $4",
+            session_id,
+            user_id,
+            after_seq,
+            limit,
+        )
+        return [self._message_from_row(dict(row)) for row in rows]
+
+    async def _conversation_chunk(
+        self, user_id: str, after_id: Optional[str], limit: int
+    ) -> List[ChatConversation]:
+        """Up to `limit` of a user's conversations after `after_id`, by id"""
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            "SELECT * FROM conversations "
+            "WHERE user_id = $1 AND ($2::uuid IS NULL OR id > $2::uuid) "
+            "ORDER BY id LIMIT $3",
+            user_id,
+            after_id,
+            limit,
+        )
+        return [self._conversation_from_row(row) for row in rows]
+
+    async def search_messages(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> MessageSearchResult:
+        """Full-text search over the text of a user's messages"""
+        before_rank, before_id = (
+            decode_search_cursor(cursor) if cursor else (None, None)
+        )
+        pool = await self._get_pool()
+        # One extra hit tells whether there is a next page
+        hits = await pool.fetchval(
+            "SELECT search_messages($1, $2, $3, $4, $5::uuid)",
+            user_id,
+            query,
+            limit + 1,
+            before_rank,
+            before_id,
+        )
+        return self._search_result(json.loads(hits), limit)
+
+    async def update_conversation_title(
+        self,
+        session_id: str,
+        user_id: str,
+        new_title: str,
+        expected_title: Optional[str] = None,
+    ) -> DeleteResult:
+        """Update the title of a specific conversation (only if it is still
+        `expected_title`, when given)"""
+        conditions = {"title": expected_title} if expected_title is not None else None
+        await self._update_conversation(
+            session_id, user_id, {"title": new_title}, conditions
+        )
+        return DeleteResult(message=f"Conversation title updated to: {new_title}")
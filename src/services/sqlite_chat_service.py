@@ -0,0 +1,399 @@
+import re
+import sqlite3
+from datetime import datetime
+from typing import List, Optional
+
+from src.openai_agents_extensions.conversation_list_cache import (
+    invalidate_conversation_lists,
+)
+from src.openai_agents_extensions.session_utils import get_current_time
+from src.openai_agents_extensions.sqlite_database import (
+    SqliteDatabase,
+    get_sqlite_database,
+)
+from src.services.chat_service import (
+    BATCH_UPDATE_VALUES,
+    MESSAGE_COLUMNS,
+    BatchOperation,
+    ChatConversation,
+    ChatMessage,
+    ChatService,
+    ConversationListResult,
+    CountMode,
+    ConversationResult,
+    ListVersion,
+    DeleteResult,
+    MessageSearchResult,
+    SearchUnavailableError,
+)
+from src.services.pagination import (
+    conversation_cursor,
+    decode_conversation_cursor,
+    decode_message_cursor,
+    decode_search_cursor,
+    message_cursor,
+)
+
+
+class SqliteChatService(ChatService):
+    """Chat operations over the local SQLite session database"""
+
+    def __init__(self, database: Optional[SqliteDatabase] = None):
+        super().__init__()
+        self.database = database or get_sqlite_database()
+
+    @staticmethod
+    def _conversation_from_row(row: sqlite3.Row) -> ChatConversation:
+        return ChatConversation(
+            id=row["id"],
+            session_id=row["session_id"],
+            title=row["title"],
+            user_id=row["user_id"],
+            is_archived=bool(row["is_archived"]),
+            is_starred=bool(row["is_starred"]),
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    async def _update_conversation(
+        self,
+        session_id: str,
+        user_id: str,
+        values: dict,
+        conditions: Optional[dict] = None,
+    ) -> None:
+        """Update an owned conversation, raising ValueError if it doesn't exist"""
+        conditions = conditions or {}
+        # Mirror the updated_at trigger of the Postgres schema
+        values = {**values, "updated_at": get_current_time()}
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        extra_filters = "".join(f" AND {column} = ?" for column in conditions)
+
+        def _update(connection: sqlite3.Connection) -> int:
+            return connection.execute(
+                f"UPDATE conversations SET {assignments} "
+                f"WHERE session_id = ? AND user_id = ?{extra_filters}",
+                (*values.values(), session_id, user_id, *conditions.values()),
+            ).rowcount
+
+        if await self.database.run(_update) == 0:
+            raise ValueError("Conversation not found or access denied")
+        invalidate_conversation_lists(user_id)
+
+    async def get_conversation_list_version(
+        self, user_id: str, is_archived: bool = False
+    ) -> ListVersion:
+        """Read the version of a user's conversation list without loading it"""
+
+        def _select(connection: sqlite3.Connection):
+            return connection.execute(
+                "SELECT MAX(updated_at), COUNT(*) FROM conversations "
+                "WHERE user_id = ? AND is_archived = ?",
+                (user_id, int(is_archived)),
+            ).fetchone()
+
+        latest, total = await self.database.run(_select)
+        return (datetime.fromisoformat(latest) if latest else None), total
+
+    async def list_conversations(
+        self,
+        user_id: str,
+        is_archived: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountMode] = None,
+    ) -> ConversationListResult:
+        """List conversations for a user with optional filtering and pagination.
+
+        A `cursor` from a previous page takes precedence over `offset`. With
+        a `count` mode, `total` is the number of all matching conversations
+        (SQLite has no planner estimates, so every mode counts exactly).
+        """
+        if cursor:
+            # Seek past the last conversation of the previous page
+            updated_at, conversation_id = decode_conversation_cursor(cursor)
+            page_filter = "AND (updated_at, id) < (?, ?) "
+            params = (updated_at, conversation_id, limit + 1, 0)
+        else:
+            page_filter = ""
+            params = (limit + 1, offset)
+
+        def _select(connection: sqlite3.Connection):
+            # One extra row tells whether there is a next page
+            rows = connection.execute(
+                "SELECT * FROM conversations WHERE user_id = ? AND is_archived = ? "
+                f"{page_filter}ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?",
+                (user_id, int(is_archived), *params),
+            ).fetchall()
+            total = None
+            if count:
+                total = connection.execute(
+                    "SELECT COUNT(*) FROM conversations "
+                    "WHERE user_id = ? AND is_archived = ?",
+                    (user_id, int(is_archived)),
+                ).fetchone()[0]
+            return rows, total
+
+        rows, total = await self.database.run(_select)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        conversations = [self._conversation_from_row(row) for row in rows]
+
+        next_cursor = None
+        if has_more:
+            next_cursor = conversation_cursor(rows[-1]["updated_at"], rows[-1]["id"])
+
+        return ConversationListResult(
+            conversations=conversations,
+            total=len(conversations) if total is None else total,
+            next_cursor=next_cursor,
+        )
+
+    async def delete_conversation(self, session_id: str, user_id: str) -> DeleteResult:
+        """Delete a specific conversation"""
+
+        def _delete(connection: sqlite3.Connection) -> int:
+            # Messages are deleted by the ON DELETE CASCADE foreign key
+            return connection.execute(
+                "DELETE FROM conversations WHERE session_id = ? AND user_id = ?",
+                (session_id, user_id),
+            ).rowcount
+
+        if await self.database.run(_delete) == 0:
+            raise ValueError("Conversation not found or access denied")
+        invalidate_conversation_lists(user_id)
+
+        return DeleteResult(message=f"Conversation {session_id} deleted successfully")
+
+    async def delete_all_conversations(self, user_id: str) -> DeleteResult:
+        """Delete all conversations for a user"""
+
+        def _delete(connection: sqlite3.Connection) -> int:
+            return connection.execute(
+                "DELETE FROM conversations WHERE user_id = ?", (user_id,)
+            ).rowcount
+
+        conversation_count = await self.database.run(_delete)
+        invalidate_conversation_lists(user_id)
+        if conversation_count == 0:
+            return DeleteResult(
+                message="No conversations found to delete", deleted_count=0
+            )
+
+        return DeleteResult(
+            message="Successfully deleted all conversations",
+            deleted_count=conversation_count,
+        )
+
+    async def archive_conversation(self, session_id: str, user_id: str) -> DeleteResult:
+        """Archive a specific conversation"""
+        await self._update_conversation(session_id, user_id, {"is_archived": 1})
+        return DeleteResult(message=f"Conversation {session_id} archived successfully")
+
+    async def star_conversation(self, session_id: str, user_id: str) -> DeleteResult:
+        """Star a specific conversation"""
+        await self._update_conversation(session_id, user_id, {"is_starred": 1})
+        return DeleteResult(message=f"Conversation {session_id} starred successfully")
+
+    async def run_batch_operation(
+        self, user_id: str, session_ids: List[str], operation: BatchOperation
+    ) -> List[str]:
+        """Archive, star or delete many of a user's conversations at once"""
+        placeholders = ", ".join("?" for _ in session_ids)
+        where = f"WHERE user_id = ? AND session_id IN ({placeholders})"
+
+        if operation == "delete":
+            # Messages are deleted by the ON DELETE CASCADE foreign key
+            statement = f"DELETE FROM conversations {where} RETURNING session_id"
+            params = (user_id, *session_ids)
+        else:
+            # Mirror the updated_at trigger of the Postgres schema
+            values = {
+                **BATCH_UPDATE_VALUES[operation],
+                "updated_at": get_current_time(),
+            }
+            assignments = ", ".join(f"{column} = ?" for column in values)
+            statement = (
+                f"UPDATE conversations SET {assignments} {where} RETURNING session_id"
+            )
+            params = (*values.values(), user_id, *session_ids)
+
+        def _run(connection: sqlite3.Connection) -> List[str]:
+            rows = connection.execute(statement, params).fetchall()
+            return [row["session_id"] for row in rows]
+
+        applied = await self.database.run(_run)
+        if applied:
+            invalidate_conversation_lists(user_id)
+        return applied
+
+    async def get_conversation_version(
+        self, session_id: str, user_id: str
+    ) -> Optional[datetime]:
+        """Read a conversation's updated_at without loading its messages"""
+
+        def _select(connection: sqlite3.Connection):
+            return connection.execute(
+                "SELECT updated_at FROM conversations "
+                "WHERE session_id = ? AND user_id = ?",
+                (session_id, user_id),
+            ).fetchone()
+
+        row = await self.database.run(_select)
+        return datetime.fromisoformat(row["updated_at"]) if row else None
+
+    async def get_conversation(
+        self,
+        session_id: str,
+        user_id: str,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> ConversationResult:
+        """Get a specific conversation with paginated messages (reverse pagination - last N messages).
+
+        A `cursor` from a previous page takes precedence over `offset`.
+        Counting all messages scans the whole conversation, so it can be
+        skipped with `include_total=False` (`total_messages` is then None).
+        """
+        if cursor:
+            page_filter = "AND seq < ? "
+            params = (decode_message_cursor(cursor), limit + 1, 0)
+        else:
+            page_filter = ""
+            params = (limit + 1, offset)
+
+        def _select(connection: sqlite3.Connection):
+            conversation_row = connection.execute(
+                "SELECT * FROM conversations WHERE session_id = ? AND user_id = ?",
+                (session_id, user_id),
+            ).fetchone()
+            if conversation_row is None:
+                return None, 0, []
+
+            total = None
+            if include_total:
+                total = connection.execute(
+                    "SELECT COUNT(*) FROM messages "
+                    "WHERE session_id = ? AND user_id = ?",
+                    (session_id, user_id),
+                ).fetchone()[0]
+            # One extra row tells whether there are older messages
+            message_rows = connection.execute(
+                f"SELECT {MESSAGE_COLUMNS} FROM messages "
+                f"WHERE session_id = ? AND user_id = ? {page_filter}"
+                "ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (session_id, user_id, *params),
+            ).fetchall()
+            return conversation_row, total, message_rows
+
+        conversation_row, total_messages, message_rows = await self.database.run(
+            _select
+        )
+        if conversation_row is None:
+            raise ValueError("Conversation not found or access denied")
+
+        has_more = len(message_rows) > limit
+        message_rows = message_rows[:limit]
+
+        # Reverse the messages to display them in chronological order
+        messages = [self._message_from_row(dict(row)) for row in reversed(message_rows)]
+
+        return ConversationResult(
+            conversation=self._conversation_from_row(conversation_row),
+            messages=messages,
+            total_messages=total_messages,
+            has_more=has_more,
+            next_cursor=message_cursor(message_rows[-1]["seq"]) if has_more else None,
+        )
+
+    async def _message_chunk(
+        self, session_id: str, user_id: str, after_seq: int, limit: int
+    ) -> List[ChatMessage]:
+        """Up to `limit` messages of a conversation after `after_seq`, in order"""
+
+        def _select(connection: sqlite3.Connection):
+            return connection.execute(
+                f"SELECT {MESSAGE_COLUMNS} FROM messages "
+                "WHERE session_id = ? AND user_id = ? AND seq > ? "
+                "ORDER BY seq LIMIT ?",
+                (session_id, user_id, after_seq, limit),
+            ).fetchall()
+
+        rows = await self.database.run(_select)
+        return [self._message_from_row(dict(row)) for row in rows]
+
+    async def _conversation_chunk(
+        self, user_id: str, after_id: Optional[str], limit: int
+    ) -> List[ChatConversation]:
+        """Up to `limit` of a user's conversations after `after_id`, by id"""
+
+        def _select(connection: sqlite3.Connection):
+            return connection.execute(
+                "SELECT * FROM conversations WHERE user_id = ? AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (user_id, after_id or "", limit),
+            ).fetchall()
+
+        rows = await self.database.run(_select)
+        return [self._conversation_from_row(row) for row in rows]
+
+    async def search_messages(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> MessageSearchResult:
+        """Full-text search over the text of a user's messages (FTS5)"""
+        if not self.database.has_fts:
+            raise SearchUnavailableError("Message search needs SQLite with FTS5")
+
+        # Match all words of the query; quoting keeps FTS5 syntax characters
+        # in user input from being parsed as query operators
+        match = " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+        if not match:
+            return MessageSearchResult(hits=[])
+
+        if cursor:
+            rank, message_id = decode_search_cursor(cursor)
+            page_filter = "AND (-bm25(messages_fts), m.id) < (?, ?) "
+            params = (match, user_id, rank, message_id, limit + 1)
+        else:
+            page_filter = ""
+            params = (match, user_id, limit + 1)
+
+        def _select(connection: sqlite3.Connection):
+            # bm25 is lower for better matches; it is negated so that, as in
+            # Postgres, a higher rank is better
+            return connection.execute(
+                "SELECT m.id, m.session_id, c.title, m.seq, m.role, m.created_at, "
+                "-bm25(messages_fts) AS rank, "
+                "snippet(messages_fts, 0, '**', '**', '…', 24) AS snippet "
+                "FROM messages_fts "
+                "JOIN messages m ON m.rowid = messages_fts.rowid "
+                "JOIN conversations c ON c.session_id = m.session_id "
+                f"WHERE messages_fts MATCH ? AND m.user_id = ? {page_filter}"
+                "ORDER BY -bm25(messages_fts) DESC, m.id DESC LIMIT ?",
+                params,
+            ).fetchall()
+
+        rows = await self.database.run(_select)
+        return self._search_result([dict(row) for row in rows], limit)
+
+    async def update_conversation_title(
+        self,
+        session_id: str,
+        user_id: str,
+        new_title: str,
+        expected_title: Optional[str] = None,
+    ) -> DeleteResult:
+        """Update the title of a specific conversation (only if it is still
+        `expected_title`, when given)"""
+        conditions = {"title": expected_title} if expected_title is not None else None
+        await self._update_conversation(
+            session_id, user_id, {"title": new_title}, conditions
+        )
+        return DeleteResult(message=f"Conversation title updated to: {new_title}")
@@ -1,6 +1,6 @@
 from agents import Runner
 
-from src.services.chat_service import ChatService
+from src.services.chat_service import get_chat_service
 from src.core.agent_factory import get_agent_by_key
 from src.core.agent_key import AgentKey
 from src.logging_config import get_logger
@@ -19,11 +19,15 @@ class ChatTitleRenamer:
         """
         try:
             # Create fresh instances for the background task
-            chat_service_bg = ChatService()
+            chat_service_bg = get_chat_service()
 
             # Get the first 2-3 messages from the conversation
             conversation_result = await chat_service_bg.get_conversation(
-                session_id=session_id, user_id=user_id, limit=3, offset=0
+                session_id=session_id,
+                user_id=user_id,
+                limit=3,
+                offset=0,
+                include_total=False,
             )
 
             # Check if conversation exists and has messages
@@ -81,10 +85,17 @@ Generate only the title, nothing else."""
                 logger.info(
                     f"Successfully generated title '{new_title}' for conversation {session_id}"
                 )
-                # Update the conversation title in the database
-                await chat_service_bg.update_conversation_title(
-                    session_id, user_id, new_title
-                )
+                # Update the conversation title in the database, unless the
+                # user renamed it while the title was being generated
+                try:
+                    await chat_service_bg.update_conversation_title(
+                        session_id, user_id, new_title, expected_title=current_title
+                    )
+                except ValueError:
+                    logger.info(
+                        f"Conversation {session_id} was renamed or deleted, "
+                        "keeping its current title"
+                    )
             else:
                 logger.warning(f"No title generated for conversation {session_id}")
 
@@ -0,0 +1,91 @@
+"""App-wide registry of shared Supabase async clients.
+
+Sessions, the chat service and the auth database all get their client from
+here, so each (url, key) pair has exactly one client and one HTTP connection
+pool for the lifetime of the process. Keep-alive connections are reused
+across requests instead of paying client construction and a TLS handshake
+on the request path.
+"""
+
+from typing import Dict, Optional, Set, Tuple
+
+from postgrest import APIResponse
+from postgrest.exceptions import APIError
+from supabase import AsyncClient, acreate_client
+
+from src.config import get_config
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Shared clients, one per (supabase_url, supabase_key)
+_clients: Dict[Tuple[str, str], AsyncClient] = {}
+
+# (supabase_url, function_name) pairs whose schema.sql function is not
+# installed; callers use their multi-statement fallback instead
+_missing_functions: Set[Tuple[str, str]] = set()
+
+# PostgREST / Postgres error codes raised when a function does not exist
+MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
+
+
+async def get_supabase_client(supabase_url: str, supabase_key: str) -> AsyncClient:
+    """Get the shared client for a Supabase project, creating it on first use."""
+    pool_key = (supabase_url, supabase_key)
+    client = _clients.get(pool_key)
+    if client is None:
+        client = await acreate_client(supabase_url, supabase_key)
+        # Another caller may have created one while this one was awaited
+        client = _clients.setdefault(pool_key, client)
+        logger.debug(f"Created shared Supabase client for {supabase_url}")
+    return client
+
+
+async def call_function(
+    client: AsyncClient, supabase_url: str, function_name: str, params: dict
+) -> Optional[APIResponse]:
+    """Call a database function from schema.sql through RPC.
+
+    Returns the response, or None when the function is not installed and the
+    caller should use its fallback instead.
+    """
+    function_key = (supabase_url, function_name)
+    if function_key in _missing_functions:
+        return None
+
+    try:
+        return await client.rpc(function_name, params).execute()
+    except APIError as e:
+        if e.code not in MISSING_FUNCTION_CODES:
+            raise
+        logger.warning(
+            f"Database function {function_name} is not installed, "
+            "falling back to separate statements"
+        )
+        _missing_functions.add(function_key)
+        return None
+
+
+async def init_supabase_clients() -> None:
+    """Create the clients for the configured projects (at app startup)."""
+    config = get_config()
+    projects = {
+        (config.sessions_url, config.sessions_key),
+        (config.auth_supabase_url, config.auth_supabase_key),
+    }
+    for supabase_url, supabase_key in projects:
+        if supabase_url and supabase_key:
+            await get_supabase_client(supabase_url, supabase_key)
+    logger.info(f"{len(_clients)} shared Supabase client(s) ready")
+
+
+async def close_supabase_clients() -> None:
+    """Close the HTTP connection pools of all shared clients (at app shutdown)."""
+    for (supabase_url, _), client in _clients.items():
+        try:
+            await client.postgrest.aclose()
+            await client.auth.close()
+        except Exception as e:
+            logger.warning(f"Error closing Supabase client for {supabase_url}: {e}")
+    _clients.clear()
+    logger.info("Shared Supabase clients closed")
@@ -4,6 +4,7 @@ from unittest.mock import patch
 import os
 
 from src.api.api import app
+from src.openai_agents_extensions.sqlite_database import SqliteDatabase
 
 
 @pytest.fixture(scope="session")
@@ -33,6 +34,14 @@ def test_config():
         yield
 
 
+@pytest.fixture
+def database(tmp_path):
+    """SQLite session database in a temporary directory."""
+    database = SqliteDatabase(str(tmp_path / "sessions.db"))
+    yield database
+    database.close()
+
+
 @pytest.fixture
 def client(test_config):
     """Create a test client with test configuration."""
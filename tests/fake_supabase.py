@@ -0,0 +1,149 @@
+"""In-memory stand-in for the Supabase async client used by the session tests.
+
+Supports the PostgREST query builder calls the sessions make (select,
+insert, upsert, update, delete with eq/gt/like/in_ filters, order and
+limit) and RPC calls to functions registered on the client. Calling a
+function that is not registered fails the way PostgREST does, with a
+PGRST202 APIError.
+"""
+
+import fnmatch
+import uuid
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from postgrest.exceptions import APIError
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabaseClient", table: str):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.payload: Any = None
+        self.upsert_options: Dict[str, Any] = {}
+        self.filters: List[Callable[[dict], bool]] = []
+        self.order_by: Optional[tuple] = None
+        self.row_limit: Optional[int] = None
+
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self.operation = "select"
+        return self
+
+    def insert(self, payload):
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "", ignore_duplicates=False):
+        self.operation, self.payload = "upsert", payload
+        self.upsert_options = {"on_conflict": on_conflict, "ignore": ignore_duplicates}
+        return self
+
+    def update(self, payload):
+        self.operation, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) > value)
+        return self
+
+    def like(self, column, pattern):
+        glob = pattern.replace("%", "*")
+        self.filters.append(lambda row: fnmatch.fnmatchcase(row.get(column), glob))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    async def execute(self):
+        self.client.calls.append((self.table, self.operation))
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.operation in ("insert", "upsert"):
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            return SimpleNamespace(data=self._insert(rows, payload), count=None)
+
+        matched = [row for row in rows if all(match(row) for match in self.filters)]
+        if self.order_by is not None:
+            column, desc = self.order_by
+            matched.sort(key=lambda row: row[column], reverse=desc)
+        if self.row_limit is not None:
+            matched = matched[: self.row_limit]
+
+        if self.operation == "update":
+            for row in matched:
+                row.update(self.payload)
+        elif self.operation == "delete":
+            self.client.tables[self.table] = [row for row in rows if row not in matched]
+        return SimpleNamespace(data=[dict(row) for row in matched], count=len(matched))
+
+    def _insert(self, rows: List[dict], payload: List[dict]) -> List[dict]:
+        inserted = []
+        key = self.upsert_options.get("on_conflict")
+        for values in payload:
+            if key and any(row.get(key) == values.get(key) for row in rows):
+                if self.upsert_options["ignore"]:
+                    continue
+            row = {"id": str(uuid.uuid4()), **values}
+            if self.table == "conversations":
+                row = {"summary": None, "summary_seq": 0, **row}
+            if self.table == "messages":
+                self.client.last_seq += 1
+                row.setdefault("seq", self.client.last_seq)
+            rows.append(row)
+            inserted.append(dict(row))
+        return inserted
+
+
+class FakeRpc:
+    def __init__(self, client: "FakeSupabaseClient", name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    async def execute(self):
+        self.client.calls.append(("rpc", self.name))
+        function = self.client.functions.get(self.name)
+        if function is None:
+            raise APIError(
+                {
+                    "code": "PGRST202",
+                    "message": f"Could not find the function public.{self.name}",
+                }
+            )
+        return SimpleNamespace(data=function(self.client, **self.params), count=None)
+
+
+class FakeSupabaseClient:
+    """Async Supabase client backed by in-memory tables."""
+
+    def __init__(self, functions: Optional[Dict[str, Callable]] = None):
+        self.tables: Dict[str, List[dict]] = {"conversations": [], "messages": []}
+        self.functions = dict(functions or {})
+        self.calls: List[tuple] = []
+        self.last_seq = 0
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def messages(self) -> List[dict]:
+        return sorted(self.tables["messages"], key=lambda row: row["seq"])
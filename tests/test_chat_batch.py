@@ -0,0 +1,28 @@
+"""Tests for batch conversation operations."""
+
+import pytest
+
+from src.openai_agents_extensions.sqlite_session import SqliteSession
+from src.services.sqlite_chat_service import SqliteChatService
+
+
+@pytest.mark.asyncio
+async def test_chat_service_batch_operation(database):
+    """A batch operation applies only to the user's own conversations."""
+    for index, user_id in enumerate(["user_1", "user_1", "user_2"]):
+        session = SqliteSession(f"session_{index}", user_id, database)
+        await session.add_items([{"role": "user", "content": "Hello"}])
+    chat_service = SqliteChatService(database)
+
+    applied = await chat_service.run_batch_operation(
+        "user_1", ["session_0", "session_2", "missing"], "archive"
+    )
+    assert applied == ["session_0"]
+    archived = await chat_service.list_conversations("user_1", is_archived=True)
+    assert [c.session_id for c in archived.conversations] == ["session_0"]
+
+    applied = await chat_service.run_batch_operation(
+        "user_1", ["session_0", "session_1"], "delete"
+    )
+    assert sorted(applied) == ["session_0", "session_1"]
+    assert (await chat_service.list_conversations("user_2")).total == 1
@@ -0,0 +1,86 @@
+"""Tests for conditional GET of the conversation endpoints."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.api import app
+from src.api.auth.dependencies import get_user_id
+from src.openai_agents_extensions.sqlite_database import SqliteDatabase
+from src.openai_agents_extensions.sqlite_session import SqliteSession
+from src.services.sqlite_chat_service import SqliteChatService
+
+
+@pytest.fixture
+def session(client: TestClient, tmp_path, monkeypatch):
+    database = SqliteDatabase(str(tmp_path / "sessions.db"))
+    monkeypatch.setattr(
+        "src.api.routers.chat.get_chat_service",
+        lambda: SqliteChatService(database),
+    )
+    app.dependency_overrides[get_user_id] = lambda: "user_1"
+    session = SqliteSession("session_1", "user_1", database)
+    asyncio.run(session.add_items([{"role": "user", "content": "Hello"}]))
+    yield session
+    app.dependency_overrides.pop(get_user_id)
+    database.close()
+
+
+@pytest.mark.parametrize("path", ["/chat", "/chat/session_1"])
+def test_not_modified_until_conversation_changes(client, session, path):
+    """A matching If-None-Match gets 304 until the conversation is written."""
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert (
+        client.get(path + "?limit=5", headers={"If-None-Match": etag}).status_code
+        == 200
+    )
+
+    asyncio.run(session.add_items([{"role": "user", "content": "Again"}]))
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_unconditional_list_does_not_read_version(client, session, monkeypatch):
+    """Without If-None-Match the first page's ETag comes from the page itself."""
+
+    async def fail(*args):
+        raise AssertionError("version read for an unconditional request")
+
+    monkeypatch.setattr(SqliteChatService, "get_conversation_list_version", fail)
+    response = client.get("/chat")
+    assert response.status_code == 200
+    assert response.headers["etag"]
+
+
+@pytest.mark.parametrize("limit", [20, 1])
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda client: client.delete("/chat/session_1"),
+        lambda client: client.post(
+            "/chat/batch", json={"operation": "delete", "session_ids": ["session_1"]}
+        ),
+        lambda client: client.post("/chat/session_1/archive"),
+    ],
+    ids=["delete", "batch_delete", "archive"],
+)
+def test_list_etag_changes_when_older_conversation_leaves(
+    client, session, change, limit
+):
+    """Removing a conversation that is not the newest changes the list ETag."""
+    newer = SqliteSession("session_2", "user_1", session.database)
+    asyncio.run(newer.add_items([{"role": "user", "content": "Newer"}]))
+    etag = client.get(f"/chat?limit={limit}").headers["etag"]
+
+    assert change(client).status_code == 200
+    response = client.get(f"/chat?limit={limit}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
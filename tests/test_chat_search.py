@@ -0,0 +1,47 @@
+"""Tests for full-text search over conversation messages."""
+
+import pytest
+
+from src.openai_agents_extensions.sqlite_session import SqliteSession
+from src.services.chat_service import SearchUnavailableError
+from src.services.sqlite_chat_service import SqliteChatService
+
+
+@pytest.mark.asyncio
+async def test_chat_service_search_messages(database):
+    """Search finds the user's message text, ranked and paged by cursor."""
+    session = SqliteSession("session_1", "user_1", database)
+    await session.add_items(
+        [
+            {"role": "user", "content": "How did Apple stock trade today?"},
+            {
+                "type": "message",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": "Apple stock rose 2%."}],
+            },
+            {"type": "function_call_output", "call_id": "c1", "output": "apple"},
+            {"role": "user", "content": "And Microsoft?"},
+        ]
+    )
+    other = SqliteSession("session_2", "user_2", database)
+    await other.add_items([{"role": "user", "content": "Apple stock"}])
+    chat_service = SqliteChatService(database)
+
+    first = await chat_service.search_messages("user_1", "apple stocks", limit=1)
+    second = await chat_service.search_messages(
+        "user_1", "apple stocks", limit=1, cursor=first.next_cursor
+    )
+    hits = first.hits + second.hits
+    assert sorted(hit.seq for hit in hits) == [1, 2]
+    assert {hit.session_id for hit in hits} == {"session_1"}
+    assert "**Apple**" in hits[0].snippet
+    assert second.next_cursor is None
+
+    assert (await chat_service.search_messages("user_1", '"(*')).hits == []
+
+    database.has_fts = False
+    with pytest.raises(SearchUnavailableError):
+        await chat_service.search_messages("user_1", "apple")
+    database.has_fts = True
+    await session.clear_session()
+    assert (await chat_service.search_messages("user_1", "apple")).hits == []
@@ -0,0 +1,97 @@
+"""Tests for the history compaction helpers."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config import Config
+from src.openai_agents_extensions.compaction import (
+    may_need_compaction,
+    render_items_for_summary,
+    select_compaction_seq,
+    with_summary,
+)
+from src.services import history_compactor
+from src.services.history_compactor import HistoryCompactor
+
+
+def _messages(count):
+    return [
+        (seq, {"role": "user", "content": f"m{seq}"}) for seq in range(1, count + 1)
+    ]
+
+
+def test_no_compaction_below_thresholds():
+    """Nothing is compacted until a threshold is passed, and 0 disables."""
+    items = _messages(5)
+    assert select_compaction_seq(items, max_items=5, max_tokens=0, keep_items=2) is None
+    assert select_compaction_seq(items, max_items=0, max_tokens=0, keep_items=2) is None
+
+
+def test_may_need_compaction_from_item_count():
+    """Items are only loaded when the count could pass a threshold."""
+    assert not may_need_compaction(8, max_items=8, max_tokens=0, keep_items=3)
+    assert may_need_compaction(9, max_items=8, max_tokens=0, keep_items=3)
+    # The token threshold needs the items, unless all of them are kept anyway
+    assert may_need_compaction(4, max_items=8, max_tokens=100, keep_items=3)
+    assert not may_need_compaction(3, max_items=0, max_tokens=100, keep_items=3)
+    assert not may_need_compaction(50, max_items=0, max_tokens=0, keep_items=3)
+
+
+def test_compaction_keeps_recent_items():
+    """Everything but the last keep_items items is folded."""
+    items = _messages(10)
+    assert select_compaction_seq(items, max_items=8, max_tokens=0, keep_items=3) == 7
+    assert select_compaction_seq(items, max_items=0, max_tokens=10, keep_items=4) == 6
+    assert (
+        select_compaction_seq(items, max_items=8, max_tokens=0, keep_items=10) is None
+    )
+
+
+def test_compaction_keeps_tool_output_with_its_call():
+    """The kept tail never starts with a tool output."""
+    items = [
+        (1, {"role": "user", "content": "Weather?"}),
+        (2, {"type": "function_call", "call_id": "c1", "name": "get_weather"}),
+        (3, {"type": "function_call_output", "call_id": "c1", "output": "Sunny"}),
+        (4, {"role": "assistant", "content": "It is sunny"}),
+    ]
+    assert select_compaction_seq(items, max_items=3, max_tokens=0, keep_items=2) == 1
+
+
+def test_summary_rendering():
+    """The summary item is prepended and transcripts are plain text."""
+    assert with_summary(None, [{"role": "user", "content": "Hi"}]) == [
+        {"role": "user", "content": "Hi"}
+    ]
+    assert with_summary("Earlier", [])[0]["role"] == "system"
+
+    transcript = render_items_for_summary(
+        [
+            {"role": "user", "content": [{"type": "input_text", "text": "Hi"}]},
+            {"type": "function_call", "name": "calc", "arguments": '{"x": 1}'},
+            {"type": "function_call_output", "output": "2"},
+        ]
+    )
+    assert transcript == 'user: Hi\ntool call: calc({"x": 1})\ntool result: 2'
+
+
+@pytest.mark.asyncio
+async def test_compactor_skips_loading_short_histories(monkeypatch):
+    """Below the thresholds the compactor reads only the item count."""
+    session = MagicMock()
+    session.get_unsummarized_count = AsyncMock(return_value=5)
+    session.get_compaction_state = AsyncMock()
+    factory = MagicMock()
+    factory.create_session = AsyncMock(return_value=session)
+    monkeypatch.setattr(history_compactor, "get_session_factory", lambda: factory)
+    monkeypatch.setattr(
+        history_compactor,
+        "get_config",
+        lambda: Config(sessions_compaction_max_items=10),
+    )
+
+    await HistoryCompactor.compact_in_background("session_1", "user_1")
+
+    session.get_unsummarized_count.assert_awaited_once()
+    session.get_compaction_state.assert_not_awaited()
@@ -0,0 +1,32 @@
+"""Tests for streaming conversation exports."""
+
+import json
+
+import pytest
+
+from src.openai_agents_extensions.sqlite_session import SqliteSession
+from src.services.conversation_export import export_all_conversations
+from src.services.sqlite_chat_service import SqliteChatService
+
+
+@pytest.mark.asyncio
+async def test_export_streams_conversations(database, monkeypatch):
+    """The export writes every conversation and message in seq order."""
+    monkeypatch.setattr("src.services.conversation_export.EXPORT_CHUNK_SIZE", 2)
+    for index in range(2):
+        session = SqliteSession(f"session_{index}", "user_1", database)
+        await session.add_items(
+            [{"role": "user", "content": f"Message {n}"} for n in range(5)]
+        )
+    chat_service = SqliteChatService(database)
+
+    chunks = [chunk async for chunk in export_all_conversations(chat_service, "user_1")]
+    records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [record["type"] for record in records] == (
+        ["conversation"] + ["message"] * 5
+    ) * 2
+    messages = [r for r in records if r["type"] == "message"]
+    assert [m["seq"] for m in messages] == [1, 2, 3, 4, 5] * 2
+    assert records[1]["item"] == {"role": "user", "content": "Message 0"}
+    # One chunk for the conversation line plus three message chunks
+    assert len(chunks) == 8
@@ -0,0 +1,55 @@
+"""Tests for the in-process conversation list cache."""
+
+from src.openai_agents_extensions import conversation_list_cache
+from src.openai_agents_extensions.conversation_list_cache import ConversationListCache
+
+
+def test_get_hits_until_ttl_expires(monkeypatch):
+    """A cached page is served until its TTL runs out."""
+    now = [100.0]
+    monkeypatch.setattr(conversation_list_cache.time, "monotonic", lambda: now[0])
+    cache = ConversationListCache(max_entries=10, ttl_seconds=5)
+    cache.put("user", (False, 20), "page", cache.generation)
+
+    assert cache.get("user", (False, 20)) == "page"
+    assert cache.get("user", (True, 20)) is None
+    now[0] += 5
+    assert cache.get("user", (False, 20)) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidate_user_drops_only_that_user():
+    """Writes drop every page of the writing user and nothing else."""
+    cache = ConversationListCache(max_entries=10, ttl_seconds=60)
+    cache.put("alice", (False, 20), "alice-active", cache.generation)
+    cache.put("alice", (True, 20), "alice-archived", cache.generation)
+    cache.put("bob", (False, 20), "bob-active", cache.generation)
+
+    cache.invalidate_user("alice")
+    assert cache.get("alice", (False, 20)) is None
+    assert cache.get("alice", (True, 20)) is None
+    assert cache.get("bob", (False, 20)) == "bob-active"
+
+
+def test_put_after_invalidation_is_dropped():
+    """A page read before a write finished is not cached after it."""
+    cache = ConversationListCache(max_entries=10, ttl_seconds=60)
+    generation = cache.generation
+    cache.invalidate_user("alice")
+    cache.put("alice", (False, 20), "stale", generation)
+
+    assert cache.get("alice", (False, 20)) is None
+
+
+def test_evicts_least_recently_used():
+    """The cache holds at most max_entries pages."""
+    cache = ConversationListCache(max_entries=2, ttl_seconds=60)
+    cache.put("user", 1, "one", cache.generation)
+    cache.put("user", 2, "two", cache.generation)
+    cache.get("user", 1)
+    cache.put("user", 3, "three", cache.generation)
+
+    assert cache.get("user", 2) is None
+    assert cache.get("user", 1) == "one"
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,36 @@
+"""Tests for the stream event encoders."""
+
+import json
+
+import pytest
+
+from src.core.event_encoder import EventEncoder, create_event_encoder
+
+EVENTS = [
+    {"type": "text_delta", "data": 'Say "hi"\n\tto 東京 🌸'},
+    {"type": "text_delta", "data": ""},
+    {"type": "text_delta", "data": "\ud83d"},  # Half of a surrogate pair
+    {
+        "type": "tool_call",
+        "call_id": "call_1",
+        "data": {"tool_name": "get_weather", "arguments": {"city": "Zürich"}},
+    },
+    {"type": "done", "data": None},
+]
+
+
+@pytest.fixture(params=["json", "orjson"])
+def encoder(request) -> EventEncoder:
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    return create_event_encoder(request.param)
+
+
+@pytest.mark.parametrize("event", EVENTS)
+def test_encodes_one_ndjson_line(encoder, event):
+    """Every event is one newline-terminated line of the same JSON value."""
+    line = encoder.encode(event)
+
+    assert isinstance(line, bytes)
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert json.loads(line) == event
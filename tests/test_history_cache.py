@@ -0,0 +1,77 @@
+"""Tests for the in-process session history cache."""
+
+from src.openai_agents_extensions.history_cache import HistoryCache
+
+
+def _item(text: str) -> dict:
+    return {"role": "user", "content": text}
+
+
+def test_get_only_hits_matching_version():
+    """A cached history is only served while the conversation version matches."""
+    cache = HistoryCache(max_bytes=1000)
+    cache.put("user", "session", "v1", [_item("hi")], [10])
+
+    assert cache.get("user", "session", "v1") == [_item("hi")]
+    assert cache.get("user", "session", "v2") is None
+    assert cache.get("user", "session", None) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_append_pop_and_reset_track_versions():
+    """Writes update the entry in place and move it to the new version."""
+    cache = HistoryCache(max_bytes=1000)
+    cache.put("user", "session", "v1", [_item("a")], [10])
+
+    cache.append("user", "session", "v1", "v2", [_item("b")], [20])
+    assert cache.get("user", "session", "v2") == [_item("a"), _item("b")]
+    assert cache.stats()["bytes"] == 30
+
+    cache.pop("user", "session", "v2", "v3")
+    assert cache.get("user", "session", "v3") == [_item("a")]
+    assert cache.stats()["bytes"] == 10
+
+    cache.append("user", "session", "v3", "v3b", [_item("c"), _item("d")], [5, 5])
+    cache.pop("user", "session", "v3b", "v3c", count=2)
+    assert cache.get("user", "session", "v3c") == [_item("a")]
+    assert cache.stats()["bytes"] == 10
+
+    cache.reset("user", "session", "v4")
+    assert cache.get("user", "session", "v4") == []
+    assert cache.stats()["bytes"] == 0
+
+
+def test_write_from_stale_version_drops_entry():
+    """An append based on an outdated version invalidates instead of merging."""
+    cache = HistoryCache(max_bytes=1000)
+    cache.put("user", "session", "v2", [_item("a")], [10])
+
+    cache.append("user", "session", "v1", "v3", [_item("b")], [10])
+
+    assert cache.get("user", "session", "v2") is None
+    assert cache.get("user", "session", "v3") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used_by_bytes():
+    """Entries are evicted oldest-first once the byte budget is exceeded."""
+    cache = HistoryCache(max_bytes=100)
+    cache.put("user", "a", "v1", [_item("a")], [40])
+    cache.put("user", "b", "v1", [_item("b")], [40])
+    cache.get("user", "a", "v1")
+    cache.put("user", "c", "v1", [_item("c")], [40])
+
+    assert cache.get("user", "a", "v1") is not None
+    assert cache.get("user", "b", "v1") is None
+    assert cache.get("user", "c", "v1") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entry_larger_than_budget_is_not_stored():
+    """A single history bigger than the whole budget is never cached."""
+    cache = HistoryCache(max_bytes=10)
+    cache.put("user", "session", "v1", [_item("big")], [50])
+
+    assert cache.get("user", "session", "v1") is None
+    assert cache.stats()["bytes"] == 0
@@ -0,0 +1,35 @@
+"""Tests for stored message compression."""
+
+import json
+
+import pytest
+
+from src.openai_agents_extensions.message_codec import (
+    decode_message_data,
+    encode_message_data,
+    is_compressed,
+)
+
+
+def test_small_payloads_stay_plain():
+    """Payloads below the threshold, or with compression disabled, are unchanged."""
+    data = json.dumps({"role": "user", "content": "Hi"})
+    assert encode_message_data(data, threshold=1024) == data
+    assert encode_message_data(data * 100, threshold=0) == data * 100
+    assert decode_message_data(data) == data
+
+
+def test_large_payloads_roundtrip():
+    """Large payloads are compressed behind a marker and decode to the original."""
+    data = json.dumps({"role": "assistant", "content": "All good. " * 500})
+    stored = encode_message_data(data, threshold=256)
+
+    assert is_compressed(stored)
+    assert len(stored) < len(data)
+    assert decode_message_data(stored) == data
+
+
+def test_corrupted_payload_raises_value_error():
+    """Corrupted compressed values raise ValueError like invalid JSON does."""
+    with pytest.raises(ValueError):
+        decode_message_data("~zlib:bm90IHpsaWI=")
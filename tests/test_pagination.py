@@ -0,0 +1,98 @@
+"""Tests for keyset pagination cursors and paged listing."""
+
+import pytest
+
+from src.openai_agents_extensions.sqlite_session import SqliteSession
+from src.services.pagination import (
+    InvalidCursorError,
+    conversation_cursor,
+    decode_conversation_cursor,
+    decode_message_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    message_cursor,
+    search_cursor,
+)
+from src.services.sqlite_chat_service import SqliteChatService
+
+
+@pytest.mark.asyncio
+async def test_chat_service_cursor_pagination(database):
+    """Cursors walk conversations and messages page by page without overlap."""
+    for index in range(3):
+        session = SqliteSession(f"session_{index}", "user_1", database)
+        await session.add_items(
+            [{"role": "user", "content": f"Message {n}"} for n in range(5)]
+        )
+    chat_service = SqliteChatService(database)
+
+    first = await chat_service.list_conversations("user_1", limit=2)
+    second = await chat_service.list_conversations(
+        "user_1", limit=2, cursor=first.next_cursor
+    )
+    assert [c.session_id for c in first.conversations + second.conversations] == [
+        "session_2",
+        "session_1",
+        "session_0",
+    ]
+    assert second.next_cursor is None
+    assert second.total == 1
+    counted = await chat_service.list_conversations("user_1", limit=2, count="exact")
+    assert counted.total == 3
+
+    page = await chat_service.get_conversation("session_0", "user_1", limit=3)
+    assert [m.seq for m in page.messages] == [3, 4, 5]
+    page = await chat_service.get_conversation(
+        "session_0", "user_1", limit=3, cursor=page.next_cursor
+    )
+    assert [m.seq for m in page.messages] == [1, 2]
+    assert (page.has_more, page.next_cursor) == (False, None)
+    assert page.total_messages == 5
+    page = await chat_service.get_conversation(
+        "session_0", "user_1", limit=3, include_total=False
+    )
+    assert (page.total_messages, page.has_more) == (None, True)
+
+    with pytest.raises(InvalidCursorError):
+        await chat_service.list_conversations("user_1", cursor="not-a-cursor")
+
+
+def test_cursors_roundtrip():
+    """Each cursor kind decodes back to the key it was made from."""
+    conversation_id = "6f1c0d6e-3d0b-4a63-9a7e-0f6a2f3b9c11"
+    updated_at = "2026-01-02T03:04:05.678901+00:00"
+
+    assert decode_conversation_cursor(
+        conversation_cursor(updated_at, conversation_id)
+    ) == (updated_at, conversation_id)
+    assert decode_message_cursor(message_cursor(42)) == 42
+    assert decode_search_cursor(search_cursor(0.25, conversation_id)) == (
+        0.25,
+        conversation_id,
+    )
+
+
+@pytest.mark.parametrize(
+    "decode, cursor",
+    [
+        (decode_message_cursor, "not-a-cursor"),
+        (decode_message_cursor, "!!!!"),
+        (decode_message_cursor, message_cursor(42)[:-2]),  # Truncated
+        (decode_message_cursor, encode_cursor("42")),
+        (decode_message_cursor, encode_cursor(4.2)),
+        (decode_message_cursor, encode_cursor(True)),
+        (decode_message_cursor, encode_cursor(1, 2)),
+        (decode_conversation_cursor, encode_cursor("yesterday", "not-a-uuid")),
+        (decode_conversation_cursor, encode_cursor(1, 2)),
+        (decode_conversation_cursor, message_cursor(42)),
+        (
+            decode_search_cursor,
+            encode_cursor("0.5", "6f1c0d6e-3d0b-4a63-9a7e-0f6a2f3b9c11"),
+        ),
+        (decode_search_cursor, encode_cursor(0.5, "x' OR 1=1 --")),
+    ],
+)
+def test_malformed_cursors_are_rejected(decode, cursor):
+    """Undecodable, tampered or wrong-kind cursors raise InvalidCursorError."""
+    with pytest.raises(InvalidCursorError):
+        decode(cursor)
@@ -0,0 +1,178 @@
+"""Tests for the local SQLite session backend."""
+
+import json
+
+import pytest
+
+from src.config import Config
+from src.openai_agents_extensions.message_codec import is_compressed
+from src.openai_agents_extensions.sqlite_session import SqliteSession
+from src.services.pagination import InvalidCursorError
+from src.services.sqlite_chat_service import SqliteChatService
+
+
+@pytest.mark.asyncio
+async def test_session_roundtrip(database):
+    """Items are stored in order, popped from the end and cleared."""
+    session = SqliteSession("session_1", "user_1", database)
+    await session.add_items(
+        [
+            {"role": "user", "content": "Hello"},
+            {"role": "user", "content": "   "},
+            {"role": "assistant", "content": "Hi there"},
+        ]
+    )
+    await session.add_items([{"role": "user", "content": "Bye"}])
+
+    assert await session.get_items() == [
+        {"role": "user", "content": "Hello"},
+        {"role": "assistant", "content": "Hi there"},
+        {"role": "user", "content": "Bye"},
+    ]
+    assert await session.get_items(limit=1) == [{"role": "user", "content": "Bye"}]
+
+    items, cursor = await session.get_items_since("1")
+    assert [item["content"] for item in items] == ["Hi there", "Bye"]
+    assert await session.get_items_since(cursor) == ([], cursor)
+    with pytest.raises(InvalidCursorError):
+        await session.get_items_since("not-a-seq")
+
+    assert await session.pop_item() == {"role": "user", "content": "Bye"}
+    assert await session.pop_items(5) == [
+        {"role": "assistant", "content": "Hi there"},
+        {"role": "user", "content": "Hello"},
+    ]
+    assert await session.pop_items(1) == []
+    await session.add_items([{"role": "user", "content": "Again"}])
+    await session.clear_session()
+    assert await session.get_items() == []
+
+
+@pytest.mark.asyncio
+async def test_chat_service_reads_session_writes(database):
+    """The SQLite chat service sees conversations written by sessions."""
+    session = SqliteSession("session_1", "user_1", database)
+    await session.add_items([{"role": "user", "content": "Hello"}])
+    chat_service = SqliteChatService(database)
+
+    listed = await chat_service.list_conversations("user_1")
+    assert [c.session_id for c in listed.conversations] == ["session_1"]
+
+    result = await chat_service.get_conversation("session_1", "user_1")
+    assert result.total_messages == 1
+    assert result.messages[0].seq == 1
+    assert (result.messages[0].role, result.messages[0].item_type) == (
+        "user",
+        "message",
+    )
+
+    await chat_service.update_conversation_title(
+        "session_1", "user_1", "Greetings", expected_title="New Chat"
+    )
+    with pytest.raises(ValueError):
+        await chat_service.update_conversation_title(
+            "session_1", "user_1", "Other", expected_title="New Chat"
+        )
+    with pytest.raises(ValueError):
+        await chat_service.star_conversation("session_1", "other_user")
+
+    await chat_service.archive_conversation("session_1", "user_1")
+    listed = await chat_service.list_conversations("user_1")
+    assert listed.conversations == []
+
+    with pytest.raises(ValueError):
+        await chat_service.get_conversation("session_1", "other_user")
+
+    await chat_service.delete_conversation("session_1", "user_1")
+    assert await session.get_items() == []
+
+
+@pytest.mark.asyncio
+async def test_update_tool_results_patches_pending_outputs(database):
+    """Only pending tool outputs for the given call ids are replaced."""
+    pending = '{"status": "PENDING_CLIENT_EXECUTION", "tool_name": "get_location"}'
+    session = SqliteSession("session_1", "user_1", database)
+    await session.add_items(
+        [
+            {"role": "user", "content": "Where am I?"},
+            {"type": "function_call_output", "call_id": "call_1", "output": pending},
+            {"role": "tool", "tool_call_id": "call_2", "content": pending},
+            {"type": "function_call_output", "call_id": "call_3", "output": pending},
+        ]
+    )
+
+    patched = await session.update_tool_results(
+        {"call_1": "Berlin", "call_2": "Paris", "call_4": "Rome"}
+    )
+
+    assert patched == 2
+    items = await session.get_items()
+    assert items[0] == {"role": "user", "content": "Where am I?"}
+    assert items[1]["output"] == "Berlin"
+    assert items[2]["content"] == "Paris"
+    assert items[3]["output"] == pending
+    assert await session.update_tool_results({"call_1": "Madrid"}) == 0
+
+
+@pytest.mark.asyncio
+async def test_patched_tool_results_are_stored_plain(database, monkeypatch):
+    """Patched outputs are written back as plain JSON, even when compressing."""
+    monkeypatch.setattr(
+        "src.openai_agents_extensions.session_utils.get_config",
+        lambda: Config(sessions_compression_threshold=1),
+    )
+    pending = '{"status": "PENDING_CLIENT_EXECUTION", "tool_name": "get_location"}'
+    session = SqliteSession("session_1", "user_1", database)
+    await session.add_items(
+        [
+            {"role": "user", "content": "Where am I? " * 50},
+            {"type": "function_call_output", "call_id": "call_1", "output": pending},
+        ]
+    )
+
+    assert await session.update_tool_results({"call_1": "Berlin"}) == 1
+    stored = await database.run(
+        lambda connection: [
+            row["message_data"]
+            for row in connection.execute(
+                "SELECT message_data FROM messages ORDER BY seq"
+            )
+        ]
+    )
+    assert is_compressed(stored[0])
+    assert json.loads(stored[1])["output"] == "Berlin"
+
+
+@pytest.mark.asyncio
+async def test_summary_replaces_compacted_items(database):
+    """Sessions using summaries return the summary and the uncovered tail."""
+    session = SqliteSession("session_1", "user_1", database, use_summary=True)
+    await session.add_items(
+        [{"role": "user", "content": f"m{number}"} for number in range(1, 5)]
+    )
+
+    state = await session.get_compaction_state()
+    assert (state.summary, state.summary_seq, len(state.items)) == (None, 0, 4)
+    assert await session.get_unsummarized_count() == 4
+
+    def updated_at(connection):
+        return connection.execute("SELECT updated_at FROM conversations").fetchone()[0]
+
+    before = await database.run(updated_at)
+    assert await session.store_summary("m1 and m2", 2, expected_summary_seq=0)
+    assert not await session.store_summary("stale", 3, expected_summary_seq=0)
+    # Compaction does not move the conversation in the list
+    assert await database.run(updated_at) == before
+    assert await session.get_unsummarized_count() == 2
+
+    items = await session.get_items()
+    assert items[0]["role"] == "system" and "m1 and m2" in items[0]["content"]
+    assert [item["content"] for item in items[1:]] == ["m3", "m4"]
+    assert await session.get_items(limit=1) == [{"role": "user", "content": "m4"}]
+
+    # The raw rows stay available to the chat service
+    result = await SqliteChatService(database).get_conversation("session_1", "user_1")
+    assert result.total_messages == 4
+
+    await session.clear_session()
+    assert await session.get_items() == []
@@ -0,0 +1,71 @@
+"""Tests for merging text_delta stream events."""
+
+import asyncio
+
+import pytest
+
+from src.core.stream_coalescer import TextDeltaCoalescer
+
+
+def delta(text):
+    return {"type": "text_delta", "data": text}
+
+
+async def source(*steps):
+    """Yield events, sleeping for the number of seconds given between them."""
+    for step in steps:
+        if isinstance(step, dict):
+            yield step
+        else:
+            await asyncio.sleep(step)
+
+
+async def collect(coalescer, events):
+    return [event async for event in coalescer.coalesce(events)]
+
+
+@pytest.mark.asyncio
+async def test_merges_deltas_and_keeps_other_events_in_order():
+    """Deltas merge into one frame; other events flush them first."""
+    coalescer = TextDeltaCoalescer(window_seconds=1, max_bytes=1024)
+    tool_call = {"type": "tool_call", "data": {"tool_name": "get_weather"}}
+    done = {"type": "done"}
+
+    events = await collect(
+        coalescer,
+        source(
+            delta("The"), delta(" result"), tool_call, delta(" is"), delta(" 3"), done
+        ),
+    )
+
+    assert events == [delta("The result"), tool_call, delta(" is 3"), done]
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_window_and_byte_budget():
+    """A frame is sent once the window passes or the byte budget is reached."""
+    coalescer = TextDeltaCoalescer(window_seconds=0.02, max_bytes=6)
+
+    events = await collect(
+        coalescer,
+        source(delta("a"), delta("b"), 0.1, delta("c"), delta("defgh"), delta("i")),
+    )
+
+    # "ab" is sent after the window even though the source is still waiting
+    assert events == [delta("ab"), delta("cdefgh"), delta("i")]
+
+
+@pytest.mark.asyncio
+async def test_source_errors_are_raised_after_pending_text():
+    """Text received before a failure is still sent before the error."""
+    coalescer = TextDeltaCoalescer(window_seconds=1, max_bytes=1024)
+
+    async def failing():
+        yield delta("partial")
+        raise RuntimeError("model error")
+
+    received = []
+    with pytest.raises(RuntimeError, match="model error"):
+        async for event in coalescer.coalesce(failing()):
+            received.append(event)
+    assert received == [delta("partial")]
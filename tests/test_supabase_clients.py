@@ -0,0 +1,50 @@
+"""Tests for the shared Supabase client registry."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src import supabase_clients
+from src.supabase_clients import close_supabase_clients, get_supabase_client
+
+
+@pytest.fixture
+def created(monkeypatch):
+    """Replace client construction, recording every client made."""
+    clients = []
+
+    async def acreate_client(supabase_url, supabase_key):
+        client = MagicMock()
+        client.postgrest.aclose = AsyncMock()
+        client.auth.close = AsyncMock()
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(supabase_clients, "acreate_client", acreate_client)
+    monkeypatch.setattr(supabase_clients, "_clients", {})
+    return clients
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_per_project(created):
+    """Each (url, key) pair gets one client, reused on later calls."""
+    first = await get_supabase_client("http://a.test", "key")
+
+    assert await get_supabase_client("http://a.test", "key") is first
+    assert await get_supabase_client("http://b.test", "key") is not first
+    assert len(created) == 2
+
+
+@pytest.mark.asyncio
+async def test_close_releases_and_forgets_clients(created):
+    """Closing shuts every pool, survives errors and empties the registry."""
+    first = await get_supabase_client("http://a.test", "key")
+    second = await get_supabase_client("http://b.test", "key")
+    first.postgrest.aclose.side_effect = RuntimeError("already closed")
+
+    await close_supabase_clients()
+
+    second.postgrest.aclose.assert_awaited_once()
+    second.auth.close.assert_awaited_once()
+    assert await get_supabase_client("http://a.test", "key") is not first
+    assert len(created) == 3
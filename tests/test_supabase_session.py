@@ -0,0 +1,187 @@
+"""Tests for SupabaseSession against an in-memory Supabase client."""
+
+import pytest
+from postgrest.exceptions import APIError
+
+from src import supabase_clients
+from src.openai_agents_extensions import supabase_session
+from src.openai_agents_extensions.history_cache import HistoryCache
+from src.openai_agents_extensions.supabase_session import SupabaseSession
+from src.supabase_clients import call_function
+from tests.fake_supabase import FakeSupabaseClient
+
+SUPABASE_URL = "http://supabase.test"
+
+
+@pytest.fixture(autouse=True)
+def reset_missing_functions(monkeypatch):
+    monkeypatch.setattr(supabase_clients, "_missing_functions", set())
+
+
+async def open_session(client, **kwargs) -> SupabaseSession:
+    session = SupabaseSession("session_1", SUPABASE_URL, "key", "user_1", **kwargs)
+    session.supabase = client
+    await session._ensure_initialized()
+    return session
+
+
+def add_session_items(client, p_session_id, p_user_id, p_items, p_meta):
+    """Python version of the add_session_items function in schema.sql."""
+    conversations = client.tables["conversations"]
+    if not any(row["session_id"] == p_session_id for row in conversations):
+        conversations.append({"session_id": p_session_id, "user_id": p_user_id})
+    for data, meta in zip(p_items, p_meta):
+        client.last_seq += 1
+        client.tables["messages"].append(
+            {
+                "session_id": p_session_id,
+                "user_id": p_user_id,
+                "seq": client.last_seq,
+                "message_data": data,
+                **meta,
+            }
+        )
+    return "rpc"
+
+
+@pytest.mark.asyncio
+async def test_add_items_uses_the_write_function():
+    """Writes are one RPC call when the function is installed."""
+    client = FakeSupabaseClient({"add_session_items": add_session_items})
+    session = await open_session(client, lazy_create=True)
+
+    await session.add_items([{"role": "user", "content": "Hello"}])
+
+    assert client.calls == [("rpc", "add_session_items")]
+    assert [row["seq"] for row in client.messages()] == [1]
+    assert session._updated_at == "rpc"
+
+
+@pytest.mark.asyncio
+async def test_missing_write_function_falls_back_to_statements():
+    """A missing function is remembered and the separate statements are used."""
+    client = FakeSupabaseClient()
+    session = await open_session(client, lazy_create=True)
+
+    await session.add_items([{"role": "user", "content": "Hello"}])
+    await session.add_items([{"role": "assistant", "content": "Hi"}])
+
+    assert client.calls.count(("rpc", "add_session_items")) == 1
+    assert ("messages", "insert") in client.calls
+    assert [row["seq"] for row in client.messages()] == [1, 2]
+    assert await session.get_items() == [
+        {"role": "user", "content": "Hello"},
+        {"role": "assistant", "content": "Hi"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_call_function_raises_other_errors():
+    """Only a missing function means fallback; other errors propagate."""
+
+    def failing(client, **params):
+        raise APIError({"code": "23505", "message": "duplicate key"})
+
+    client = FakeSupabaseClient({"add_session_items": failing})
+
+    with pytest.raises(APIError):
+        await call_function(client, SUPABASE_URL, "add_session_items", {})
+    assert await call_function(client, SUPABASE_URL, "pop_session_items", {}) is None
+    assert await call_function(client, SUPABASE_URL, "pop_session_items", {}) is None
+    assert client.calls == [("rpc", "add_session_items"), ("rpc", "pop_session_items")]
+
+
+@pytest.mark.asyncio
+async def test_history_snapshot_follows_writes():
+    """The snapshot is read once and kept equal to the stored history."""
+    client = FakeSupabaseClient()
+    session = await open_session(client)
+    await session.add_items([{"role": "user", "content": "Hello"}])
+
+    assert await session.get_items() == [{"role": "user", "content": "Hello"}]
+    reads = client.calls.count(("messages", "select"))
+
+    await session.add_items(
+        [{"role": "assistant", "content": "Hi"}, {"role": "user", "content": "Bye"}]
+    )
+    assert await session.pop_items(1) == [{"role": "user", "content": "Bye"}]
+    expected = [
+        {"role": "user", "content": "Hello"},
+        {"role": "assistant", "content": "Hi"},
+    ]
+    assert await session.get_items() == expected
+    assert await session.get_items(limit=1) == expected[-1:]
+    assert await (await open_session(client)).get_items() == expected
+
+    await session.clear_session()
+    assert await session.get_items() == []
+    assert await (await open_session(client)).get_items() == []
+
+    # Reads after the first were served from the snapshot; the pop fallback
+    # selects the rows it deletes
+    assert client.calls.count(("messages", "select")) == reads + 3
+
+
+@pytest.mark.asyncio
+async def test_get_items_since_advances_cursor():
+    """Each call returns only newer items; with none the cursor stays put."""
+    client = FakeSupabaseClient()
+    session = await open_session(client)
+    await session.add_items(
+        [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]
+    )
+
+    items, cursor = await session.get_items_since(None, limit=1)
+    assert (items, cursor) == ([{"role": "user", "content": "a"}], "1")
+    items, cursor = await session.get_items_since(cursor)
+    assert (items, cursor) == ([{"role": "assistant", "content": "b"}], "2")
+    assert await session.get_items_since(cursor) == ([], "2")
+
+    await session.add_items([{"role": "user", "content": "c"}])
+    assert await session.get_items_since(cursor) == (
+        [{"role": "user", "content": "c"}],
+        "3",
+    )
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_creates_conversation_on_first_write():
+    """A lazy session makes no calls until written, then upserts its row once."""
+    client = FakeSupabaseClient()
+    session = await open_session(client, lazy_create=True)
+    assert client.calls == []
+
+    await session.add_items([{"role": "user", "content": "Hello"}])
+    await session.add_items([{"role": "user", "content": "Again"}])
+
+    assert client.calls.count(("conversations", "upsert")) == 1
+    assert [row["session_id"] for row in client.tables["conversations"]] == [
+        "session_1"
+    ]
+    assert await session.get_title() == "New Chat"
+
+
+@pytest.mark.asyncio
+async def test_summary_keeps_updated_at_and_replaces_cached_history(monkeypatch):
+    """Storing a summary keeps updated_at but retires histories cached before it."""
+    cache = HistoryCache(max_bytes=100_000)
+    monkeypatch.setattr(supabase_session, "get_history_cache", lambda: cache)
+    client = FakeSupabaseClient()
+    writer = await open_session(client, use_summary=True)
+    await writer.add_items(
+        [{"role": "user", "content": f"m{number}"} for number in range(1, 4)]
+    )
+    reader = await open_session(client, use_summary=True)
+    history = await reader.get_items()
+    version = reader._cache_version(reader._updated_at)
+    updated_at = client.tables["conversations"][0]["updated_at"]
+
+    compactor = await open_session(client, use_summary=True)
+    assert await compactor.store_summary("m1 and m2", 2, expected_summary_seq=0)
+    # Another process still holds the history it cached before the summary
+    cache.put("user_1", "session_1", version, history, [10] * len(history))
+
+    assert client.tables["conversations"][0]["updated_at"] == updated_at
+    items = await (await open_session(client, use_summary=True)).get_items()
+    assert "m1 and m2" in items[0]["content"]
+    assert [item["content"] for item in items[1:]] == ["m3"]